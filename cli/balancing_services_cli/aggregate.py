@@ -0,0 +1,178 @@
+"""Resample and aggregate flattened rows with Arrow compute kernels.
+
+``aggregate_table`` reduces a table of flattened rows (see ``flatten.iter_rows``)
+to one row per group and time bucket::
+
+    spec = AggregationSpec(resample=parse_resample("1h"), aggregations=parse_aggregations("price:mean,price:max"))
+    hourly = aggregate_table(pa.Table.from_pylist(rows), IMBALANCE_PRICES, spec)
+
+Buckets are aligned to UTC. The output has the group-by columns, the bucket's
+``periodStartAt``/``periodEndAt`` and one ``<column>_<function>`` column per
+aggregation. All work runs in Arrow's vectorized kernels on whole columns.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from balancing_services_cli.flatten import EndpointConfig
+from balancing_services_cli.output import require_pyarrow
+
+FUNCTIONS = ("sum", "mean", "min", "max", "first", "last", "wmean")
+
+_UNITS = {"min": "minute", "h": "hour", "d": "day"}
+_RESAMPLE = re.compile(r"^(\d+)(min|h|d)$")
+
+# Hidden columns used while aggregating.
+_START = "__start"
+_BUCKET = "__bucket"
+
+
+@dataclass(frozen=True)
+class Aggregation:
+    """One output column: ``function`` applied to ``column``.
+
+    ``wmean`` is the mean of ``column`` weighted by the ``weight`` column (e.g. a
+    volume-weighted price); rows where either is null are ignored.
+    """
+
+    column: str
+    function: str
+    weight: str | None = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.column}_{self.function}"
+
+
+@dataclass(frozen=True)
+class AggregationSpec:
+    """What to aggregate.
+
+    Attributes:
+        resample: bucket width as ``(multiple, unit)`` with unit "minute", "hour" or "day";
+            None aggregates the whole queried window.
+        group_by: columns identifying a group; None uses the endpoint's group fields.
+        aggregations: output columns; empty means the mean of every numeric column.
+    """
+
+    resample: tuple[int, str] | None = None
+    group_by: tuple[str, ...] | None = None
+    aggregations: tuple[Aggregation, ...] = ()
+
+
+def parse_resample(value: str | None) -> tuple[int, str] | None:
+    """Parse a ``--resample`` value such as ``15min``, ``1h`` or ``1d``."""
+    if not value:
+        return None
+    match = _RESAMPLE.match(value.strip())
+    if not match or int(match.group(1)) == 0:
+        raise SystemExit(f"Invalid --resample value {value!r}; use e.g. 15min, 1h or 1d.")
+    return int(match.group(1)), _UNITS[match.group(2)]
+
+
+def parse_group_by(value: str | None) -> tuple[str, ...] | None:
+    """Split a comma-separated ``--group-by`` value into column names; None if not given."""
+    if not value:
+        return None
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+def parse_aggregations(value: str | None) -> tuple[Aggregation, ...]:
+    """Parse a comma-separated ``--agg`` value of ``COLUMN:FUNCTION`` or ``COLUMN:wmean:WEIGHT`` items."""
+    if not value:
+        return ()
+    aggregations = []
+    for item in value.split(","):
+        parts = [part.strip() for part in item.split(":")]
+        if len(parts) not in (2, 3) or parts[1] not in FUNCTIONS or (len(parts) == 3) != (parts[1] == "wmean"):
+            raise SystemExit(
+                f"Invalid --agg item {item.strip()!r}; use COLUMN:FUNCTION ({', '.join(FUNCTIONS[:-1])}) "
+                "or COLUMN:wmean:WEIGHT."
+            )
+        aggregations.append(Aggregation(*parts))
+    return tuple(aggregations)
+
+
+def _bucket_end(pa: Any, pc: Any, buckets: Any, resample: tuple[int, str]) -> Any:
+    multiple, unit = resample
+    if unit == "day":
+        # Calendar arithmetic is not needed for whole days in UTC.
+        multiple, unit = multiple * 24, "hour"
+    step = pa.scalar(multiple * {"minute": 60, "hour": 3600}[unit] * 10**6, pa.duration("us"))
+    return pc.add(buckets, step)
+
+
+def _isoformat(pa: Any, pc: Any, timestamps: Any) -> Any:
+    """Format UTC timestamps like ``datetime.isoformat`` does for the flattened rows."""
+    text = pc.strftime(pc.cast(timestamps, pa.timestamp("s", "UTC")), format="%Y-%m-%dT%H:%M:%S")
+    return pc.binary_join_element_wise(text, "+00:00", "")
+
+
+def aggregate_table(table: Any, config: EndpointConfig, spec: AggregationSpec) -> Any:
+    """Aggregate a ``pyarrow.Table`` of flattened rows according to ``spec``.
+
+    Raises:
+        SystemExit: if a named column does not exist or is not numeric.
+    """
+    pa = require_pyarrow("--resample/--group-by")
+    import pyarrow.compute as pc
+
+    group_by = config.group_fields if spec.group_by is None else spec.group_by
+    aggregations = spec.aggregations
+    if not aggregations:
+        numeric = [f.name for f in table.schema if pa.types.is_floating(f.type) or pa.types.is_integer(f.type)]
+        aggregations = tuple(Aggregation(name, "mean") for name in numeric if name not in group_by)
+    names = {*group_by, *(a.column for a in aggregations), *(a.weight for a in aggregations if a.weight)}
+    missing = sorted(name for name in names if name not in table.column_names)
+    if table.num_rows and missing:
+        raise SystemExit(f"Unknown column(s) for aggregation: {', '.join(missing)}.")
+    if table.num_rows == 0:
+        return pa.table({})
+
+    starts = pc.cast(table["periodStartAt"], pa.timestamp("us", "UTC"))
+    table = table.append_column(_START, starts).sort_by(_START)
+    keys = list(group_by)
+    if spec.resample is not None:
+        multiple, unit = spec.resample
+        table = table.append_column(_BUCKET, pc.floor_temporal(table[_START], multiple=multiple, unit=unit))
+        keys.append(_BUCKET)
+    else:
+        table = table.append_column("__end", pc.cast(table["periodEndAt"], pa.timestamp("us", "UTC")))
+
+    requested: list[tuple[str, str]] = []
+    for i, agg in enumerate(aggregations):
+        if agg.function == "wmean":
+            value, weight = table[agg.column], table[agg.weight]
+            valid = pc.and_(pc.is_valid(value), pc.is_valid(weight))
+            table = table.append_column(f"__wv{i}", pc.if_else(valid, pc.multiply(value, weight), None))
+            table = table.append_column(f"__w{i}", pc.if_else(valid, weight, None))
+            requested += [(f"__wv{i}", "sum"), (f"__w{i}", "sum")]
+        else:
+            requested.append((agg.column, agg.function))
+    if spec.resample is None:
+        requested += [(_START, "min"), ("__end", "max")]
+
+    try:
+        grouped = table.group_by(keys, use_threads=False).aggregate(requested)
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise SystemExit(f"Cannot aggregate: {e}")
+
+    columns: dict[str, Any] = {name: grouped[name] for name in group_by}
+    if spec.resample is not None:
+        columns["periodStartAt"] = _isoformat(pa, pc, grouped[_BUCKET])
+        columns["periodEndAt"] = _isoformat(pa, pc, _bucket_end(pa, pc, grouped[_BUCKET], spec.resample))
+    else:
+        columns["periodStartAt"] = _isoformat(pa, pc, grouped[f"{_START}_min"])
+        columns["periodEndAt"] = _isoformat(pa, pc, grouped["__end_max"])
+    for i, agg in enumerate(aggregations):
+        if agg.function == "wmean":
+            columns[agg.name] = pc.divide(
+                pc.cast(grouped[f"__wv{i}_sum"], pa.float64()), pc.cast(grouped[f"__w{i}_sum"], pa.float64())
+            )
+        else:
+            columns[agg.name] = grouped[agg.name]
+    result = pa.table(columns)
+    return result.sort_by([(name, "ascending") for name in (*group_by, "periodStartAt")])
@@ -0,0 +1,448 @@
+"""Sharded backfills processed by any number of workers from a shared queue.
+
+A backfill is split into shards of endpoint x area x reserve type x time window
+(``plan_shards``) and stored in a ``ShardQueue``, a SQLite file that every
+worker process, on this or other hosts sharing the filesystem, opens directly.
+Workers lease one shard at a time, fetch it with the regular client (following
+all pages of the bids endpoints) and write it to its own file::
+
+    OUTPUT/energy-bids/EE/aFRR/20250101T000000Z.parquet
+
+Files are written under a temporary name and renamed into place, so a shard
+processed twice (e.g. after its lease expired) is simply overwritten with the
+same data, and marking it done is a no-op the second time. Leases are renewed
+while a shard is being fetched; shards whose worker died are picked up again
+once the lease expires. Failed shards are retried with exponential backoff up
+to ``max_attempts`` times::
+
+    queue = ShardQueue("backfill.sqlite")
+    queue.add(plan_shards(["energy-bids"], ["EE", "LV"], ["aFRR"], start, end, timedelta(days=1)))
+    run_worker(queue, client, "out", "parquet")
+
+SQLite needs a filesystem with working file locks (local disks and most
+cluster filesystems; not every NFS setup).
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from balancing_services.api.default import (
+    get_balancing_capacity_bids,
+    get_balancing_energy_bids,
+    get_cross_zonal_capacity_allocation,
+)
+from balancing_services.models import Area, ReserveType
+
+from balancing_services_cli import flatten
+from balancing_services_cli.flatten import iter_rows
+from balancing_services_cli.join import JOINABLE, JoinSource
+from balancing_services_cli.output import format_api_error, write_rows
+from balancing_services_cli.pagination import fetch_all_pages
+
+log = logging.getLogger(__name__)
+
+SOURCES: dict[str, JoinSource] = {
+    **JOINABLE,
+    "energy-bids": JoinSource(get_balancing_energy_bids, flatten.ENERGY_BIDS, True),
+    "capacity-bids": JoinSource(get_balancing_capacity_bids, flatten.CAPACITY_BIDS, True),
+    "capacity-cross-zonal": JoinSource(get_cross_zonal_capacity_allocation, flatten.CAPACITY_CROSS_ZONAL, True),
+}
+
+PAGINATED = frozenset({"energy-bids", "capacity-bids"})
+
+# Output formats written one file per shard.
+SHARD_FORMATS = ("parquet", "csv", "jsonl", "json", "arrow")
+
+STATES = ("pending", "leased", "done", "failed")
+
+_SHARD = re.compile(r"^(\d+)(h|d)$")
+_SHARD_UNITS = {"h": timedelta(hours=1), "d": timedelta(days=1)}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    area TEXT NOT NULL,
+    reserve_type TEXT NOT NULL,
+    start_at TEXT NOT NULL,
+    end_at TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    rows INTEGER,
+    error TEXT,
+    UNIQUE (endpoint, area, reserve_type, start_at, end_at)
+);
+"""
+
+_COLUMNS = "id, endpoint, area, reserve_type, start_at, end_at, attempts"
+
+
+def parse_shard(value: str) -> timedelta:
+    """Parse a shard width such as ``6h`` or ``1d``."""
+    match = _SHARD.match(value.strip())
+    if not match or int(match.group(1)) == 0:
+        raise SystemExit(f"Invalid --shard value {value!r}; use e.g. 6h or 1d.")
+    return int(match.group(1)) * _SHARD_UNITS[match.group(2)]
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One unit of work: an endpoint queried for one area, reserve type and window.
+
+    ``reserve_type`` is ``""`` for endpoints without one; ``attempts`` counts leases so far.
+    """
+
+    endpoint: str
+    area: str
+    reserve_type: str
+    start: datetime
+    end: datetime
+    id: int | None = None
+    attempts: int = 0
+
+    def path(self, root: str, fmt: str) -> str:
+        """Output file of this shard under ``root``."""
+        parts = [root, self.endpoint, self.area, *([self.reserve_type] if self.reserve_type else [])]
+        return os.path.join(*parts, f"{self.start.strftime('%Y%m%dT%H%M%SZ')}.{fmt}")
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def plan_shards(
+    endpoints: Iterable[str],
+    areas: Iterable[str],
+    reserve_types: Iterable[str],
+    start: datetime,
+    end: datetime,
+    width: timedelta,
+) -> list[Shard]:
+    """Split a backfill into shards, with windows aligned to multiples of ``width`` since the epoch (UTC).
+
+    Endpoints without a reserve type get one shard per area and window, ignoring ``reserve_types``.
+    """
+    start, end = _utc(start), _utc(end)
+    if end <= start:
+        raise ValueError("end must be after start")
+    windows = []
+    boundary = _EPOCH + (start - _EPOCH) // width * width
+    while boundary < end:
+        windows.append((max(boundary, start), min(boundary + width, end)))
+        boundary += width
+    reserve_types = tuple(reserve_types)
+    shards = []
+    for endpoint in endpoints:
+        types = reserve_types if SOURCES[endpoint].needs_reserve_type else ("",)
+        for area, reserve_type, (window_start, window_end) in itertools.product(areas, types, windows):
+            shards.append(Shard(endpoint, area, reserve_type, window_start, window_end))
+    return shards
+
+
+class ShardQueue:
+    """Shards of a backfill and their state, in a SQLite file shared by all workers.
+
+    Args:
+        path: database file; created if missing.
+        clock: wall-clock time in seconds (compared between hosts), replaceable in tests.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def add(self, shards: Iterable[Shard]) -> int:
+        """Queue ``shards``, skipping any already queued; return the number added."""
+        rows = [(s.endpoint, s.area, s.reserve_type, s.start.isoformat(), s.end.isoformat()) for s in shards]
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO shards (endpoint, area, reserve_type, start_at, end_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return db.total_changes - before
+
+    def lease(self, owner: str, duration: float, max_attempts: int) -> Shard | None:
+        """Take the next available shard for ``duration`` seconds, or None if none is available now.
+
+        Expired leases of shards that already had ``max_attempts`` attempts fail the shard.
+        """
+        with self._transaction() as db:
+            now = self._clock()
+            db.execute(
+                "UPDATE shards SET state = 'failed', owner = NULL, error = 'lease expired'"
+                " WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, max_attempts),
+            )
+            row = db.execute(
+                f"SELECT {_COLUMNS} FROM shards"
+                " WHERE (state = 'pending' AND available_at <= ?) OR (state = 'leased' AND lease_expires < ?)"
+                " ORDER BY id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE shards SET state = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                (owner, now + duration, row[0]),
+            )
+        shard_id, endpoint, area, reserve_type, start_at, end_at, attempts = row
+        return Shard(
+            endpoint,
+            area,
+            reserve_type,
+            datetime.fromisoformat(start_at),
+            datetime.fromisoformat(end_at),
+            shard_id,
+            attempts + 1,
+        )
+
+    def renew(self, shard: Shard, owner: str, duration: float) -> bool:
+        """Extend ``owner``'s lease on ``shard``; False if the lease was lost."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE shards SET lease_expires = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                (self._clock() + duration, shard.id, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, shard: Shard, rows: int) -> bool:
+        """Mark ``shard`` done with ``rows`` written; False if it already was."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE shards SET state = 'done', owner = NULL, rows = ?, error = NULL"
+                " WHERE id = ? AND state != 'done'",
+                (rows, shard.id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, shard: Shard, owner: str, error: str, max_attempts: int, retry_delay: float) -> None:
+        """Record a failed attempt: retry after ``retry_delay * 2**(attempts - 1)`` seconds, or give up."""
+        with self._transaction() as db:
+            if shard.attempts >= max_attempts:
+                db.execute(
+                    "UPDATE shards SET state = 'failed', owner = NULL, error = ? WHERE id = ? AND owner = ?"
+                    " AND state = 'leased'",
+                    (error, shard.id, owner),
+                )
+            else:
+                db.execute(
+                    "UPDATE shards SET state = 'pending', owner = NULL, error = ?, available_at = ?"
+                    " WHERE id = ? AND owner = ? AND state = 'leased'",
+                    (error, self._clock() + retry_delay * 2 ** (shard.attempts - 1), shard.id, owner),
+                )
+
+    def retry_failed(self) -> int:
+        """Make failed shards pending again with their attempts reset; return how many."""
+        with self._transaction() as db:
+            return db.execute(
+                "UPDATE shards SET state = 'pending', attempts = 0, available_at = 0 WHERE state = 'failed'"
+            ).rowcount
+
+    def counts(self) -> Counter[str]:
+        """Number of shards per state."""
+        with self._lock:
+            return Counter(dict(self._db.execute("SELECT state, COUNT(*) FROM shards GROUP BY state").fetchall()))
+
+    def errors(self) -> list[tuple[Shard, str]]:
+        """Failed shards with their last error."""
+        with self._lock:
+            rows = self._db.execute(f"SELECT {_COLUMNS}, error FROM shards WHERE state = 'failed' ORDER BY id")
+            return [
+                (Shard(e, a, r, datetime.fromisoformat(s), datetime.fromisoformat(t), i, n), error)
+                for i, e, a, r, s, t, n, error in rows.fetchall()
+            ]
+
+    def next_available(self) -> float | None:
+        """Seconds until a pending shard becomes available or a lease expires; None if nothing is left to do."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(CASE state WHEN 'pending' THEN available_at ELSE lease_expires END)"
+                " FROM shards WHERE state IN ('pending', 'leased')"
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - self._clock())
+
+
+def fetch_shard(client: Any, shard: Shard) -> list[Any]:
+    """Fetch all groups of ``shard``, following every page of the bids endpoints.
+
+    Raises:
+        SystemExit: the API answered with an error.
+    """
+    source = SOURCES[shard.endpoint]
+    kwargs: dict[str, Any] = {
+        "client": client,
+        "area": Area(shard.area),
+        "period_start_at": shard.start,
+        "period_end_at": shard.end,
+    }
+    if source.needs_reserve_type:
+        kwargs["reserve_type"] = ReserveType(shard.reserve_type)
+    if shard.endpoint in PAGINATED:
+        return fetch_all_pages(source.endpoint.sync_detailed, **kwargs)
+    response = source.endpoint.sync_detailed(**kwargs)
+    if response.status_code != 200:
+        raise SystemExit(format_api_error(response))
+    return response.parsed.data
+
+
+def write_shard(data: list[Any], shard: Shard, root: str, fmt: str, owner: str) -> int:
+    """Write ``shard``'s rows to its file, replacing any earlier copy atomically; return the row count.
+
+    Shards without rows write no file.
+    """
+    config = SOURCES[shard.endpoint].config
+    path = shard.path(root, fmt)
+    rows = iter_rows(data, config)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    count = 0
+
+    def counted() -> Iterator[dict[str, Any]]:
+        nonlocal count
+        for row in itertools.chain([first], rows):
+            count += 1
+            yield row
+
+    tmp = f"{path}.{owner.replace(os.sep, '_')}.tmp"
+    try:
+        write_rows(counted(), tmp, fmt)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return count
+
+
+@contextmanager
+def _renewing(queue: ShardQueue, shard: Shard, owner: str, duration: float) -> Iterator[None]:
+    """Renew the lease on ``shard`` every third of ``duration`` until the block exits."""
+    stop = threading.Event()
+
+    def renew() -> None:
+        while not stop.wait(duration / 3):
+            if not queue.renew(shard, owner, duration):
+                log.warning("Lost the lease on shard %d; another worker may process it too", shard.id)
+                return
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def default_owner() -> str:
+    """Worker identity: host name, process id and thread id."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_worker(
+    queue: ShardQueue,
+    client: Any,
+    root: str,
+    fmt: str,
+    *,
+    owner: str | None = None,
+    lease: float = 300.0,
+    max_attempts: int = 5,
+    retry_delay: float = 30.0,
+    max_shards: int | None = None,
+    poll_interval: float = 5.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Counter[str]:
+    """Process shards until none is left (or ``max_shards`` were processed).
+
+    While other workers hold leases or failed shards wait for their retry, the
+    worker polls every ``poll_interval`` seconds at most, since those shards may
+    come back to the queue.
+
+    Returns:
+        ``Counter`` of shards ``done`` and ``failed`` attempts, and ``rows`` written, by this worker.
+    """
+    owner = owner or default_owner()
+    stats: Counter[str] = Counter()
+    while max_shards is None or stats["done"] + stats["failed"] < max_shards:
+        shard = queue.lease(owner, lease, max_attempts)
+        if shard is None:
+            wait = queue.next_available()
+            if wait is None:
+                break
+            sleep(min(max(wait, 0.01), poll_interval))
+            continue
+        log.debug(
+            "Shard %d: %s %s %s %s..%s (attempt %d)",
+            shard.id,
+            shard.endpoint,
+            shard.area,
+            shard.reserve_type,
+            shard.start,
+            shard.end,
+            shard.attempts,
+        )
+        try:
+            with _renewing(queue, shard, owner, lease):
+                rows = write_shard(fetch_shard(client, shard), shard, root, fmt, owner)
+        except (SystemExit, Exception) as e:  # any failure is the shard's, not the worker's
+            error = str(e) or type(e).__name__
+            log.warning("Shard %d failed (attempt %d): %s", shard.id, shard.attempts, error)
+            queue.fail(shard, owner, error, max_attempts, retry_delay)
+            stats["failed"] += 1
+            continue
+        queue.complete(shard, rows)
+        stats["done"] += 1
+        stats["rows"] += rows
+    return stats
+
+
+def run_workers(queue: ShardQueue, client: Any, root: str, fmt: str, workers: int, **kwargs: Any) -> Counter[str]:
+    """Run ``workers`` workers on a thread pool sharing ``client``'s connection pool; return their combined stats."""
+    # Create the pooled httpx client up front; lazy creation from several threads could race.
+    client.get_httpx_client()
+    totals: Counter[str] = Counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for stats in pool.map(lambda _: run_worker(queue, client, root, fmt, **kwargs), range(workers)):
+            totals.update(stats)
+    return totals
@@ -0,0 +1,93 @@
+"""Parallel batches of API calls for synchronous callers.
+
+``fetch_many`` runs generated endpoint calls on a thread pool that shares one
+client and therefore one connection pool::
+
+    calls = [EndpointCall(get_imbalance_prices, {"area": area, "period_start_at": start, "period_end_at": end})
+             for area in (Area.EE, Area.LV, Area.LT)]
+    for result in fetch_many(client, calls, max_workers=8):
+        if result.ok:
+            rows = flatten_response(result.response.parsed.data, IMBALANCE_PRICES)
+
+The client's ``httpx.Client`` is built once before any worker starts, so the
+lazy construction in ``get_httpx_client`` never races. httpx's connection pool
+is safe to use from several threads; it keeps up to 20 idle connections by
+default, so for more workers pass ``httpx_args={"limits": httpx.Limits(...)}``
+when creating the client.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any
+
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class EndpointCall:
+    """One call of a generated endpoint module's ``sync_detailed``, without the client."""
+
+    endpoint: ModuleType
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class CallResult:
+    """Outcome of one call in a batch.
+
+    Attributes:
+        index: position of the call in the submitted batch.
+        call: the call itself.
+        response: the endpoint's ``Response`` (any HTTP status), or None if the call raised.
+        error: the exception raised by the call (e.g. a connection error), if any.
+    """
+
+    index: int
+    call: EndpointCall
+    response: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        """True for calls that returned an HTTP 200 response."""
+        return self.error is None and self.response is not None and self.response.status_code == 200
+
+
+def _run(client: Any, index: int, call: EndpointCall) -> CallResult:
+    try:
+        return CallResult(index, call, response=call.endpoint.sync_detailed(client=client, **call.kwargs))
+    except Exception as e:
+        return CallResult(index, call, error=e)
+
+
+def fetch_many(
+    client: Any,
+    calls: Iterable[EndpointCall],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True,
+) -> Iterator[CallResult]:
+    """Execute ``calls`` on a thread pool, yielding one ``CallResult`` per call.
+
+    Exceptions raised by a call are captured in its result and do not affect the
+    others. Stopping the iteration early cancels the calls that have not started.
+
+    Args:
+        client: ``Client`` or ``AuthenticatedClient`` shared by all workers.
+        calls: endpoint calls to run.
+        max_workers: number of concurrent requests.
+        ordered: yield results in submission order; if False, as they complete.
+    """
+    client.get_httpx_client()
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bs-fetch")
+    try:
+        futures: list[Future[CallResult]] = [
+            pool.submit(_run, client, index, call) for index, call in enumerate(calls)
+        ]
+        for future in futures if ordered else as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
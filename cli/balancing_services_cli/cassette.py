@@ -0,0 +1,175 @@
+"""Record/replay httpx transports for deterministic, offline performance tests.
+
+A cassette is a gzip-compressed JSON Lines file with one recorded interaction per
+line: request method and path (with query string), response status, headers and
+decoded body, the observed latency and the offset from the start of recording.
+Hosts and request headers are not stored, so cassettes contain no credentials and
+can be replayed against any base URL.
+
+Both transports implement the sync and async httpx transport interfaces and plug
+into the generated client through ``httpx_args``::
+
+    client = AuthenticatedClient(
+        base_url=..., token=..., httpx_args={"transport": ReplayTransport("prices.jsonl.gz")}
+    )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+# Headers describing the wire encoding of a response body, which no longer apply
+# once the body has been read and decoded (e.g. to store or replay it).
+WIRE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class CassetteMissError(LookupError):
+    """Raised by ``ReplayTransport`` when no unused recorded interaction matches a request."""
+
+
+def request_key(method: str, url: httpx.URL) -> str:
+    """Normalized identity of a request: method, path and sorted query parameters."""
+    query = urlencode(sorted(parse_qsl(url.query.decode(), keep_blank_values=True)))
+    return f"{method.upper()} {url.path}{'?' + query if query else ''}"
+
+
+def _encode_body(body: bytes) -> dict[str, str]:
+    try:
+        return {"body": body.decode()}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode()}
+
+
+def _decode_body(record: dict[str, Any]) -> bytes:
+    if "body_b64" in record:
+        return base64.b64decode(record["body_b64"])
+    return record.get("body", "").encode()
+
+
+def load_cassette(path: str) -> list[dict[str, Any]]:
+    """Read all recorded interactions from a cassette file."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Forwards requests to a real transport and appends every interaction to a cassette.
+
+    Args:
+        path: cassette file to (over)write.
+        transport: sync transport to forward to; default ``httpx.HTTPTransport()``.
+        async_transport: async transport to forward to; default ``httpx.AsyncHTTPTransport()``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._transport = transport or httpx.HTTPTransport()
+        self._async_transport = async_transport or httpx.AsyncHTTPTransport()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def _record(self, request: httpx.Request, response: httpx.Response, sent: float, latency: float) -> httpx.Response:
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in WIRE_HEADERS]
+        record = {
+            "method": request.method,
+            "url": request_key(request.method, request.url).split(" ", 1)[1],
+            "status": response.status_code,
+            "headers": headers,
+            "latency": round(latency, 6),
+            "offset": round(sent - self._started, 6),
+            **_encode_body(response.content),
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+        return httpx.Response(response.status_code, headers=headers, content=response.content, request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        sent = time.monotonic()
+        response = self._transport.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        return self._record(request, response, sent, time.monotonic() - sent)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        sent = time.monotonic()
+        response = await self._async_transport.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        return self._record(request, response, sent, time.monotonic() - sent)
+
+    def close(self) -> None:
+        self._transport.close()
+        with self._lock:
+            self._file.close()
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Serves responses from a cassette without touching the network.
+
+    Requests are matched on method, path and query parameters (order-insensitive);
+    repeated identical requests receive the recorded responses in order.
+
+    Args:
+        path: cassette file to read.
+        latency_scale: multiplier applied to each recorded latency before responding;
+            0 (the default) replays instantly, 1 at the original speed.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 0.0) -> None:
+        self.latency_scale = latency_scale
+        self._queues: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        for record in load_cassette(path):
+            self._queues[f"{record['method'].upper()} {record['url']}"].append(record)
+        self._lock = threading.Lock()
+
+    def _next(self, request: httpx.Request) -> dict[str, Any]:
+        key = request_key(request.method, request.url)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise CassetteMissError(f"No recorded response left for {key}")
+            return queue.popleft()
+
+    @staticmethod
+    def _response(request: httpx.Request, record: dict[str, Any]) -> httpx.Response:
+        return httpx.Response(
+            record["status"], headers=record["headers"], content=_decode_body(record), request=request
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        record = self._next(request)
+        if self.latency_scale:
+            time.sleep(record["latency"] * self.latency_scale)
+        return self._response(request, record)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        record = self._next(request)
+        if self.latency_scale:
+            await asyncio.sleep(record["latency"] * self.latency_scale)
+        return self._response(request, record)
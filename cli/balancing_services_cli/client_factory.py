@@ -3,20 +3,62 @@
 from __future__ import annotations
 
 import logging
+import sqlite3
 import sys
+from typing import Any
 
 import click
+import httpx
 from balancing_services import AuthenticatedClient
 
+from balancing_services_cli.cassette import RecordingTransport, ReplayTransport
+from balancing_services_cli.profiling import ProfilingTransport
+from balancing_services_cli.rate_limit import RateLimitedTransport, SharedRateLimiter
+
 log = logging.getLogger(__name__)
 
 
+def _httpx_args(ctx: click.Context) -> dict[str, Any]:
+    """Transport for --record/--replay/--profile/--rate-limit; it is closed when the command finishes."""
+    record_path: str | None = ctx.obj.get("record_path")
+    replay_path: str | None = ctx.obj.get("replay_path")
+    transport: httpx.BaseTransport | None = None
+    if replay_path:
+        log.debug("Replaying responses from %s", replay_path)
+        try:
+            transport = ReplayTransport(replay_path, latency_scale=ctx.obj.get("replay_latency_scale", 0.0))
+        except OSError as e:
+            raise SystemExit(f"Cannot read cassette {replay_path}: {e}")
+    elif record_path:
+        log.debug("Recording responses to %s", record_path)
+        transport = RecordingTransport(record_path)
+        ctx.call_on_close(transport.close)
+    profiler = ctx.obj.get("profiler")
+    if profiler is not None:
+        transport = ProfilingTransport(profiler, transport)
+    rate_limit: float | None = ctx.obj.get("rate_limit")
+    if rate_limit and not replay_path:
+        # Outermost, so --profile does not count time spent waiting for the shared budget as request latency.
+        path = ctx.obj["rate_limit_file"]
+        log.debug("Limiting requests to %s/s shared through %s", rate_limit, path)
+        try:
+            limiter = SharedRateLimiter(path, rate=rate_limit, burst=ctx.obj["rate_limit_burst"])
+        except sqlite3.Error as e:
+            raise SystemExit(f"Cannot open rate limit file {path}: {e}")
+        ctx.call_on_close(limiter.close)
+        transport = RateLimitedTransport(limiter, transport)
+    return {"transport": transport} if transport is not None else {}
+
+
 def make_client(ctx: click.Context) -> AuthenticatedClient:
     """Build an AuthenticatedClient from the Click context's global options."""
     token: str | None = ctx.obj.get("token")
+    if not token and ctx.obj.get("replay_path"):
+        # Cassettes hold no credentials, so replay works without a token.
+        token = "replay"
     if not token:
         click.echo("Error: API token is required. Use --token.", err=True)
         sys.exit(1)
     base_url: str = ctx.obj["base_url"]
     log.debug("Creating client for %s", base_url)
-    return AuthenticatedClient(base_url=base_url, token=token)
+    return AuthenticatedClient(base_url=base_url, token=token, httpx_args=_httpx_args(ctx))
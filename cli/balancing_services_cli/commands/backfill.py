@@ -0,0 +1,180 @@
+"""Backfill subcommands: plan a sharded backfill, work on it from any number of processes, show its status."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+import click
+from balancing_services.models import Area, ReserveType
+
+from balancing_services_cli.backfill import (
+    SHARD_FORMATS,
+    SOURCES,
+    STATES,
+    ShardQueue,
+    parse_shard,
+    plan_shards,
+    run_workers,
+)
+from balancing_services_cli.client_factory import make_client
+from balancing_services_cli.output import detect_format
+from balancing_services_cli.types import ISO8601
+
+log = logging.getLogger(__name__)
+
+AREA_CHOICES = [a.value for a in Area]
+RESERVE_TYPE_CHOICES = [r.value for r in ReserveType]
+
+
+def _parse_list(value: str, choices: list[str], option: str) -> list[str]:
+    """Split a comma-separated value (or ``all``) into canonical choices."""
+    if value.strip().lower() == "all":
+        return list(choices)
+    canonical = {choice.lower(): choice for choice in choices}
+    items = [part.strip() for part in value.split(",") if part.strip()]
+    unknown = [item for item in items if item.lower() not in canonical]
+    if unknown or not items:
+        raise click.BadParameter(f"use 'all' or a comma-separated list of: {', '.join(choices)}.", param_hint=option)
+    return [canonical[item.lower()] for item in items]
+
+
+@click.group("backfill")
+def backfill() -> None:
+    """Split long backfills into shards that several processes or hosts work on from a shared queue."""
+
+
+@backfill.command("plan")
+@click.argument("queue_path", metavar="QUEUE")
+@click.option(
+    "--endpoint",
+    "endpoints",
+    multiple=True,
+    required=True,
+    type=click.Choice(list(SOURCES)),
+    help="Endpoint to backfill (repeatable).",
+)
+@click.option("--area", required=True, help="Comma-separated area codes, or 'all'.")
+@click.option(
+    "--reserve-type",
+    default=None,
+    help="Comma-separated reserve types, or 'all' (required for energy and capacity endpoints).",
+)
+@click.option("--start", required=True, type=ISO8601, help="Period start (ISO 8601).")
+@click.option("--end", required=True, type=ISO8601, help="Period end (ISO 8601).")
+@click.option(
+    "--shard",
+    default="1d",
+    show_default=True,
+    help="Time window of one shard (e.g. 6h, 1d, 7d; aligned to UTC).",
+)
+def plan(
+    queue_path: str,
+    endpoints: tuple[str, ...],
+    area: str,
+    reserve_type: str | None,
+    start: datetime,
+    end: datetime,
+    shard: str,
+) -> None:
+    """Add the shards of a backfill to the QUEUE file (created if missing).
+
+    Planning is idempotent: shards already in the queue are left as they are.
+    """
+    if end <= start:
+        raise click.UsageError("--end must be after --start.")
+    if reserve_type is None and any(SOURCES[endpoint].needs_reserve_type for endpoint in endpoints):
+        raise click.UsageError("--reserve-type is required for energy and capacity endpoints.")
+    areas = _parse_list(area, AREA_CHOICES, "--area")
+    reserve_types = _parse_list(reserve_type, RESERVE_TYPE_CHOICES, "--reserve-type") if reserve_type else []
+    shards = plan_shards(endpoints, areas, reserve_types, start, end, parse_shard(shard))
+    queue = ShardQueue(queue_path)
+    try:
+        added = queue.add(shards)
+    finally:
+        queue.close()
+    click.echo(f"Planned {len(shards)} shard(s), {added} new, in {queue_path}", err=True)
+
+
+@backfill.command("work")
+@click.argument("queue_path", metavar="QUEUE")
+@click.option("--workers", default=1, show_default=True, help="Shards processed concurrently by this process.")
+@click.option("--lease", default=300.0, show_default=True, help="Seconds a shard stays leased without renewal.")
+@click.option("--max-attempts", default=5, show_default=True, help="Attempts per shard before it is marked failed.")
+@click.option(
+    "--retry-delay",
+    default=30.0,
+    show_default=True,
+    help="Seconds before the first retry of a failed shard; doubles with every attempt.",
+)
+@click.option("--max-shards", default=None, type=int, help="Stop after this many shards per worker.")
+@click.pass_context
+def work(
+    ctx: click.Context,
+    queue_path: str,
+    workers: int,
+    lease: float,
+    max_attempts: int,
+    retry_delay: float,
+    max_shards: int | None,
+) -> None:
+    """Process shards from QUEUE until none is left, writing one file per shard under --output.
+
+    Run it from as many processes and hosts as the API budget allows (see --rate-limit);
+    they share the queue and output directory through the filesystem.
+    """
+    root = ctx.obj["output"]
+    if not root:
+        raise click.UsageError("backfill work requires an output directory. Use --output/-o to specify one.")
+    if ctx.obj["nested"] or ctx.obj["partition_by"] or ctx.obj.get("aggregation"):
+        raise click.UsageError("backfill cannot be combined with --nested, --partition-by or aggregation.")
+    fmt = ctx.obj["fmt"] or "parquet"
+    if detect_format(None, fmt) not in SHARD_FORMATS:
+        raise click.UsageError(f"backfill writes one file per shard; use one of: {', '.join(SHARD_FORMATS)}.")
+    if workers < 1 or lease <= 0 or max_attempts < 1:
+        raise click.UsageError("--workers, --lease and --max-attempts must be positive.")
+    client = make_client(ctx)
+    queue = ShardQueue(queue_path)
+    try:
+        stats = run_workers(
+            queue,
+            client,
+            root,
+            fmt,
+            workers,
+            lease=lease,
+            max_attempts=max_attempts,
+            retry_delay=retry_delay,
+            max_shards=max_shards,
+        )
+        counts = queue.counts()
+    finally:
+        queue.close()
+    click.echo(
+        f"Processed {stats['done']} shard(s), {stats['rows']} row(s), {stats['failed']} failed attempt(s); "
+        f"queue: {', '.join(f'{counts[state]} {state}' for state in STATES)}",
+        err=True,
+    )
+    if counts["failed"]:
+        raise SystemExit(f"{counts['failed']} shard(s) failed; see 'bs-cli backfill status {queue_path}'.")
+
+
+@backfill.command("status")
+@click.argument("queue_path", metavar="QUEUE")
+@click.option("--retry-failed", is_flag=True, default=False, help="Queue failed shards again with fresh attempts.")
+def status(queue_path: str, retry_failed: bool) -> None:
+    """Show the number of shards per state in QUEUE and the errors of failed shards."""
+    queue = ShardQueue(queue_path)
+    try:
+        for shard, error in queue.errors():
+            click.echo(
+                f"failed: {shard.endpoint} {shard.area} {shard.reserve_type or '-'} "
+                f"{shard.start.isoformat()}..{shard.end.isoformat()} after {shard.attempts} attempt(s): {error}"
+            )
+        if retry_failed:
+            click.echo(f"Requeued {queue.retry_failed()} failed shard(s)", err=True)
+        counts = queue.counts()
+    finally:
+        queue.close()
+    for state in STATES:
+        click.echo(f"{state}: {counts[state]}")
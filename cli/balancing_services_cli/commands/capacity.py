@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
+from typing import Any
 
 import click
 from balancing_services.api.default import (
@@ -12,18 +13,22 @@ from balancing_services.api.default import (
     get_balancing_capacity_procured_volumes,
     get_cross_zonal_capacity_allocation,
 )
-from balancing_services.models import Area, ReserveType
+from balancing_services.models import Area, BalancingCapacityBidsResponse, ReserveType
 
 from balancing_services_cli.client_factory import make_client
+from balancing_services_cli.cross_zonal import CrossZonalMatrix, deduplicate, fetch_cross_zonal
 from balancing_services_cli.flatten import (
     CAPACITY_BIDS,
     CAPACITY_CROSS_ZONAL,
     CAPACITY_PRICES,
     CAPACITY_PROCURED,
-    flatten_response,
+    EndpointConfig,
 )
-from balancing_services_cli.output import format_api_error, write_rows
-from balancing_services_cli.pagination import fetch_all_pages, fetch_first_page
+from balancing_services_cli.merit_order import parse_merit_order
+from balancing_services_cli.offload import fetch_all_pages_to_arrow
+from balancing_services_cli.output import format_api_error, write_response, write_rows, write_table
+from balancing_services_cli.pagination import export_all_pages, fetch_all_pages, fetch_first_page
+from balancing_services_cli.procurement import PROCUREMENT_MODES, procurement_rows, reduce_procurements
 from balancing_services_cli.types import ISO8601
 
 log = logging.getLogger(__name__)
@@ -32,6 +37,24 @@ AREA_CHOICES = [a.value for a in Area]
 RESERVE_TYPE_CHOICES = [r.value for r in ReserveType]
 
 
+def _write_procurements(
+    data: list[Any], config: EndpointConfig, procurement: str | None, options: dict[str, Any]
+) -> None:
+    """Write capacity groups after the ``--procurement`` reduction, if any."""
+    if procurement == "columns":
+        if options["nested"] or options["partition_by"] or options.get("aggregation"):
+            raise click.UsageError(
+                "--procurement columns cannot be combined with --nested, --partition-by or aggregation."
+            )
+        write_rows(procurement_rows(data, config), options["output"], options["fmt"])
+        return
+    if procurement is not None:
+        reduced = reduce_procurements(data, config, procurement)
+        log.debug("Kept %d of %d group(s) with the %s procurement per period", len(reduced), len(data), procurement)
+        data = reduced
+    write_response(data, config, options)
+
+
 @click.command("capacity-bids")
 @click.option(
     "--area",
@@ -48,18 +71,84 @@ RESERVE_TYPE_CHOICES = [r.value for r in ReserveType]
     help="Reserve type.",
 )
 @click.option("--all/--first-page", "fetch_all", default=None, help="Fetch all pages or only the first page.")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Decode and flatten pages in this many worker processes (with --all; requires pyarrow).",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Write pages as they arrive, checkpointing after each, and continue an interrupted export "
+    "(with --all; CSV or JSON Lines --output).",
+)
+@click.option(
+    "--merit-order",
+    "merit_order",
+    default=None,
+    help="Write merit-order curves instead of the bids: curve, price-at:VOLUME[,...], volume-at:PRICE[,...] "
+    "or top:N (requires pyarrow).",
+)
 @click.pass_context
 def capacity_bids(
-    ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str, fetch_all: bool | None,
+    ctx: click.Context,
+    area: str,
+    start: datetime,
+    end: datetime,
+    reserve_type: str,
+    fetch_all: bool | None,
+    workers: int,
+    resume: bool,
+    merit_order: str | None,
 ) -> None:
     """Fetch balancing capacity bids."""
     if fetch_all is None:
         raise click.UsageError("You must specify either --all or --first-page.")
+    if workers and not fetch_all:
+        raise click.UsageError("--workers requires --all.")
+    if resume and (not fetch_all or workers):
+        raise click.UsageError("--resume requires --all and cannot be combined with --workers.")
+    if resume and (ctx.obj["nested"] or ctx.obj["partition_by"] or ctx.obj.get("aggregation")):
+        raise click.UsageError("--resume cannot be combined with --nested, --partition-by or aggregation.")
+    if resume and merit_order:
+        raise click.UsageError("--resume cannot be combined with --merit-order.")
+    options = {**ctx.obj, "merit_order": parse_merit_order(merit_order)}
     client = make_client(ctx)
     log.debug(
         "GET /balancing/capacity/bids area=%s start=%s end=%s reserve_type=%s",
         area, start, end, reserve_type,
     )
+    if workers:
+        table = fetch_all_pages_to_arrow(
+            get_balancing_capacity_bids,
+            BalancingCapacityBidsResponse,
+            CAPACITY_BIDS,
+            workers,
+            client=client,
+            area=Area(area),
+            period_start_at=start,
+            period_end_at=end,
+            reserve_type=ReserveType(reserve_type),
+        )
+        write_table(table, CAPACITY_BIDS, options)
+        return
+    if resume:
+        export_all_pages(
+            get_balancing_capacity_bids.sync_detailed,
+            CAPACITY_BIDS,
+            ctx.obj["output"],
+            ctx.obj["fmt"],
+            resume=True,
+            client=client,
+            area=Area(area),
+            period_start_at=start,
+            period_end_at=end,
+            reserve_type=ReserveType(reserve_type),
+        )
+        return
     fetch = fetch_all_pages if fetch_all else fetch_first_page
     data = fetch(
         get_balancing_capacity_bids.sync_detailed,
@@ -69,9 +158,7 @@ def capacity_bids(
         period_end_at=end,
         reserve_type=ReserveType(reserve_type),
     )
-    rows = flatten_response(data, CAPACITY_BIDS)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(data, CAPACITY_BIDS, options)
 
 
 @click.command("capacity-prices")
@@ -89,8 +176,17 @@ def capacity_bids(
     type=click.Choice(RESERVE_TYPE_CHOICES, case_sensitive=False),
     help="Reserve type.",
 )
+@click.option(
+    "--procurement",
+    type=click.Choice(PROCUREMENT_MODES),
+    default=None,
+    help="Keep only the latest or earliest procurement of each period, or write all of a period's procurements "
+    "as columns of one row (default: one row per procurement).",
+)
 @click.pass_context
-def capacity_prices(ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str) -> None:
+def capacity_prices(
+    ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str, procurement: str | None
+) -> None:
     """Fetch balancing capacity prices."""
     client = make_client(ctx)
     log.debug(
@@ -108,9 +204,7 @@ def capacity_prices(ctx: click.Context, area: str, start: datetime, end: datetim
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, CAPACITY_PRICES)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    _write_procurements(response.parsed.data, CAPACITY_PRICES, procurement, ctx.obj)
 
 
 @click.command("capacity-procured")
@@ -128,8 +222,17 @@ def capacity_prices(ctx: click.Context, area: str, start: datetime, end: datetim
     type=click.Choice(RESERVE_TYPE_CHOICES, case_sensitive=False),
     help="Reserve type.",
 )
+@click.option(
+    "--procurement",
+    type=click.Choice(PROCUREMENT_MODES),
+    default=None,
+    help="Keep only the latest or earliest procurement of each period, or write all of a period's procurements "
+    "as columns of one row (default: one row per procurement).",
+)
 @click.pass_context
-def capacity_procured(ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str) -> None:
+def capacity_procured(
+    ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str, procurement: str | None
+) -> None:
     """Fetch balancing capacity procured volumes."""
     client = make_client(ctx)
     log.debug(
@@ -147,17 +250,14 @@ def capacity_procured(ctx: click.Context, area: str, start: datetime, end: datet
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, CAPACITY_PROCURED)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    _write_procurements(response.parsed.data, CAPACITY_PROCURED, procurement, ctx.obj)
 
 
 @click.command("capacity-cross-zonal")
 @click.option(
     "--area",
-    required=True,
     type=click.Choice(AREA_CHOICES, case_sensitive=False),
-    help="Area code.",
+    help="Area code (required unless --all-areas is given).",
 )
 @click.option("--start", required=True, type=ISO8601, help="Period start (ISO 8601).")
 @click.option("--end", required=True, type=ISO8601, help="Period end (ISO 8601).")
@@ -167,10 +267,49 @@ def capacity_procured(ctx: click.Context, area: str, start: datetime, end: datet
     type=click.Choice(RESERVE_TYPE_CHOICES, case_sensitive=False),
     help="Reserve type.",
 )
+@click.option(
+    "--all-areas",
+    is_flag=True,
+    default=False,
+    help="Fetch every area concurrently and drop borders reported by both of their ends.",
+)
+@click.option(
+    "--net-positions",
+    is_flag=True,
+    default=False,
+    help="With --all-areas, write exports minus imports per area and period instead of the borders.",
+)
 @click.pass_context
-def capacity_cross_zonal(ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str) -> None:
+def capacity_cross_zonal(
+    ctx: click.Context,
+    area: str | None,
+    start: datetime,
+    end: datetime,
+    reserve_type: str,
+    all_areas: bool,
+    net_positions: bool,
+) -> None:
     """Fetch cross-zonal capacity allocation."""
+    if (area is None) == (not all_areas):
+        raise click.UsageError("Specify exactly one of --area and --all-areas.")
+    if net_positions and not all_areas:
+        raise click.UsageError("--net-positions requires --all-areas.")
     client = make_client(ctx)
+    if all_areas:
+        log.debug(
+            "GET /balancing/capacity/cross-zonal-allocation for all areas start=%s end=%s reserve_type=%s",
+            start, end, reserve_type,
+        )
+        groups = deduplicate(fetch_cross_zonal(client, start=start, end=end, reserve_type=reserve_type))
+        log.debug("%d border group(s) after deduplication", len(groups))
+        if net_positions:
+            if ctx.obj["nested"]:
+                raise click.UsageError("--net-positions cannot be combined with --nested.")
+            matrix = CrossZonalMatrix.from_groups(groups)
+            write_rows(matrix.net_position_rows(reserve_type), ctx.obj["output"], ctx.obj["fmt"])
+        else:
+            write_response(groups, CAPACITY_CROSS_ZONAL, ctx.obj)
+        return
     log.debug(
         "GET /balancing/capacity/cross-zonal-allocation area=%s start=%s end=%s reserve_type=%s",
         area, start, end, reserve_type,
@@ -186,6 +325,4 @@ def capacity_cross_zonal(ctx: click.Context, area: str, start: datetime, end: da
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, CAPACITY_CROSS_ZONAL)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(response.parsed.data, CAPACITY_CROSS_ZONAL, ctx.obj)
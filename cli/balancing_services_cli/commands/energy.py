@@ -12,7 +12,7 @@ from balancing_services.api.default import (
     get_balancing_energy_offered_volumes,
     get_balancing_energy_prices,
 )
-from balancing_services.models import Area, ReserveType
+from balancing_services.models import Area, BalancingEnergyBidsResponse, ReserveType
 
 from balancing_services_cli.client_factory import make_client
 from balancing_services_cli.flatten import (
@@ -20,10 +20,12 @@ from balancing_services_cli.flatten import (
     ENERGY_BIDS,
     ENERGY_OFFERED,
     ENERGY_PRICES,
-    flatten_response,
 )
-from balancing_services_cli.output import format_api_error, write_rows
-from balancing_services_cli.pagination import fetch_all_pages, fetch_first_page
+from balancing_services_cli.follow import follow_rows
+from balancing_services_cli.merit_order import parse_merit_order
+from balancing_services_cli.offload import fetch_all_pages_to_arrow
+from balancing_services_cli.output import format_api_error, write_batches, write_response, write_table
+from balancing_services_cli.pagination import export_all_pages, fetch_all_pages, fetch_first_page
 from balancing_services_cli.types import ISO8601
 
 log = logging.getLogger(__name__)
@@ -40,17 +42,43 @@ RESERVE_TYPE_CHOICES = [r.value for r in ReserveType]
     help="Area code.",
 )
 @click.option("--start", required=True, type=ISO8601, help="Period start (ISO 8601).")
-@click.option("--end", required=True, type=ISO8601, help="Period end (ISO 8601).")
+@click.option(
+    "--end",
+    type=ISO8601,
+    help="Period end (ISO 8601); with --follow, stop once all data up to this time has been fetched.",
+)
 @click.option(
     "--reserve-type",
     required=True,
     type=click.Choice(RESERVE_TYPE_CHOICES, case_sensitive=False),
     help="Reserve type.",
 )
+@click.option(
+    "--follow",
+    is_flag=True,
+    default=False,
+    help="Keep polling for newly published periods and write only new or revised rows.",
+)
 @click.pass_context
-def energy_activated(ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str) -> None:
+def energy_activated(
+    ctx: click.Context, area: str, start: datetime, end: datetime | None, reserve_type: str, follow: bool,
+) -> None:
     """Fetch balancing energy activated volumes."""
+    if end is None and not follow:
+        raise click.UsageError("Missing option '--end'.")
     client = make_client(ctx)
+    if follow:
+        batches = follow_rows(
+            get_balancing_energy_activated_volumes,
+            ENERGY_ACTIVATED,
+            client=client,
+            start=start,
+            until=end,
+            area=Area(area),
+            reserve_type=ReserveType(reserve_type),
+        )
+        write_batches(batches, ENERGY_ACTIVATED, ctx.obj)
+        return
     log.debug(
         "GET /balancing/energy/activated-volumes area=%s start=%s end=%s reserve_type=%s",
         area, start, end, reserve_type,
@@ -66,9 +94,7 @@ def energy_activated(ctx: click.Context, area: str, start: datetime, end: dateti
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, ENERGY_ACTIVATED)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(response.parsed.data, ENERGY_ACTIVATED, ctx.obj)
 
 
 @click.command("energy-offered")
@@ -105,9 +131,7 @@ def energy_offered(ctx: click.Context, area: str, start: datetime, end: datetime
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, ENERGY_OFFERED)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(response.parsed.data, ENERGY_OFFERED, ctx.obj)
 
 
 @click.command("energy-prices")
@@ -144,9 +168,7 @@ def energy_prices(ctx: click.Context, area: str, start: datetime, end: datetime,
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, ENERGY_PRICES)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(response.parsed.data, ENERGY_PRICES, ctx.obj)
 
 
 @click.command("energy-bids")
@@ -165,18 +187,84 @@ def energy_prices(ctx: click.Context, area: str, start: datetime, end: datetime,
     help="Reserve type.",
 )
 @click.option("--all/--first-page", "fetch_all", default=None, help="Fetch all pages or only the first page.")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Decode and flatten pages in this many worker processes (with --all; requires pyarrow).",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Write pages as they arrive, checkpointing after each, and continue an interrupted export "
+    "(with --all; CSV or JSON Lines --output).",
+)
+@click.option(
+    "--merit-order",
+    "merit_order",
+    default=None,
+    help="Write merit-order curves instead of the bids: curve, price-at:VOLUME[,...], volume-at:PRICE[,...] "
+    "or top:N (requires pyarrow).",
+)
 @click.pass_context
 def energy_bids(
-    ctx: click.Context, area: str, start: datetime, end: datetime, reserve_type: str, fetch_all: bool | None,
+    ctx: click.Context,
+    area: str,
+    start: datetime,
+    end: datetime,
+    reserve_type: str,
+    fetch_all: bool | None,
+    workers: int,
+    resume: bool,
+    merit_order: str | None,
 ) -> None:
     """Fetch balancing energy bids."""
     if fetch_all is None:
         raise click.UsageError("You must specify either --all or --first-page.")
+    if workers and not fetch_all:
+        raise click.UsageError("--workers requires --all.")
+    if resume and (not fetch_all or workers):
+        raise click.UsageError("--resume requires --all and cannot be combined with --workers.")
+    if resume and (ctx.obj["nested"] or ctx.obj["partition_by"] or ctx.obj.get("aggregation")):
+        raise click.UsageError("--resume cannot be combined with --nested, --partition-by or aggregation.")
+    if resume and merit_order:
+        raise click.UsageError("--resume cannot be combined with --merit-order.")
+    options = {**ctx.obj, "merit_order": parse_merit_order(merit_order)}
     client = make_client(ctx)
     log.debug(
         "GET /balancing/energy/bids area=%s start=%s end=%s reserve_type=%s",
         area, start, end, reserve_type,
     )
+    if workers:
+        table = fetch_all_pages_to_arrow(
+            get_balancing_energy_bids,
+            BalancingEnergyBidsResponse,
+            ENERGY_BIDS,
+            workers,
+            client=client,
+            area=Area(area),
+            period_start_at=start,
+            period_end_at=end,
+            reserve_type=ReserveType(reserve_type),
+        )
+        write_table(table, ENERGY_BIDS, options)
+        return
+    if resume:
+        export_all_pages(
+            get_balancing_energy_bids.sync_detailed,
+            ENERGY_BIDS,
+            ctx.obj["output"],
+            ctx.obj["fmt"],
+            resume=True,
+            client=client,
+            area=Area(area),
+            period_start_at=start,
+            period_end_at=end,
+            reserve_type=ReserveType(reserve_type),
+        )
+        return
     fetch = fetch_all_pages if fetch_all else fetch_first_page
     data = fetch(
         get_balancing_energy_bids.sync_detailed,
@@ -186,6 +274,4 @@ def energy_bids(
         period_end_at=end,
         reserve_type=ReserveType(reserve_type),
     )
-    rows = flatten_response(data, ENERGY_BIDS)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(data, ENERGY_BIDS, options)
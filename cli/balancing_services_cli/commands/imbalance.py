@@ -10,8 +10,9 @@ from balancing_services.api.default import get_imbalance_prices, get_imbalance_t
 from balancing_services.models import Area
 
 from balancing_services_cli.client_factory import make_client
-from balancing_services_cli.flatten import IMBALANCE_PRICES, IMBALANCE_VOLUMES, flatten_response
-from balancing_services_cli.output import format_api_error, write_rows
+from balancing_services_cli.flatten import IMBALANCE_PRICES, IMBALANCE_VOLUMES
+from balancing_services_cli.follow import follow_rows
+from balancing_services_cli.output import format_api_error, write_batches, write_response
 from balancing_services_cli.types import ISO8601
 
 log = logging.getLogger(__name__)
@@ -27,11 +28,34 @@ AREA_CHOICES = [a.value for a in Area]
     help="Area code.",
 )
 @click.option("--start", required=True, type=ISO8601, help="Period start (ISO 8601).")
-@click.option("--end", required=True, type=ISO8601, help="Period end (ISO 8601).")
+@click.option(
+    "--end",
+    type=ISO8601,
+    help="Period end (ISO 8601); with --follow, stop once all data up to this time has been fetched.",
+)
+@click.option(
+    "--follow",
+    is_flag=True,
+    default=False,
+    help="Keep polling for newly published periods and write only new or revised rows.",
+)
 @click.pass_context
-def imbalance_prices(ctx: click.Context, area: str, start: datetime, end: datetime) -> None:
+def imbalance_prices(ctx: click.Context, area: str, start: datetime, end: datetime | None, follow: bool) -> None:
     """Fetch imbalance prices."""
+    if end is None and not follow:
+        raise click.UsageError("Missing option '--end'.")
     client = make_client(ctx)
+    if follow:
+        batches = follow_rows(
+            get_imbalance_prices,
+            IMBALANCE_PRICES,
+            client=client,
+            start=start,
+            until=end,
+            area=Area(area),
+        )
+        write_batches(batches, IMBALANCE_PRICES, ctx.obj)
+        return
     log.debug("GET /imbalance/prices area=%s start=%s end=%s", area, start, end)
     response = get_imbalance_prices.sync_detailed(
         client=client,
@@ -43,9 +67,7 @@ def imbalance_prices(ctx: click.Context, area: str, start: datetime, end: dateti
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, IMBALANCE_PRICES)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(response.parsed.data, IMBALANCE_PRICES, ctx.obj)
 
 
 @click.command("imbalance-volumes")
@@ -72,6 +94,4 @@ def imbalance_volumes(ctx: click.Context, area: str, start: datetime, end: datet
         raise SystemExit(format_api_error(response))
     n_groups = len(response.parsed.data) if response.parsed else 0
     log.debug("Response: HTTP %d, %d group(s)", response.status_code, n_groups)
-    rows = flatten_response(response.parsed.data, IMBALANCE_VOLUMES)
-    log.debug("Flattened to %d row(s)", len(rows))
-    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
+    write_response(response.parsed.data, IMBALANCE_VOLUMES, ctx.obj)
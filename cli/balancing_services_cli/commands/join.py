@@ -0,0 +1,71 @@
+"""Join subcommand: align several endpoints on group fields and settlement period."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+import click
+from balancing_services.models import Area, ReserveType
+
+from balancing_services_cli.client_factory import make_client
+from balancing_services_cli.join import JOIN_HOWS, JOINABLE, fetch_and_join
+from balancing_services_cli.output import write_rows
+from balancing_services_cli.types import ISO8601
+
+log = logging.getLogger(__name__)
+
+AREA_CHOICES = [a.value for a in Area]
+RESERVE_TYPE_CHOICES = [r.value for r in ReserveType]
+
+
+@click.command("join")
+@click.argument("endpoints", nargs=-1, required=True, type=click.Choice(list(JOINABLE)))
+@click.option(
+    "--area",
+    required=True,
+    type=click.Choice(AREA_CHOICES, case_sensitive=False),
+    help="Area code.",
+)
+@click.option("--start", required=True, type=ISO8601, help="Period start (ISO 8601).")
+@click.option("--end", required=True, type=ISO8601, help="Period end (ISO 8601).")
+@click.option(
+    "--reserve-type",
+    type=click.Choice(RESERVE_TYPE_CHOICES, case_sensitive=False),
+    default=None,
+    help="Reserve type (required when joining energy or capacity endpoints).",
+)
+@click.option(
+    "--on",
+    default="area",
+    show_default=True,
+    help="Comma-separated group fields to join on, in addition to periodStartAt.",
+)
+@click.option("--how", type=click.Choice(JOIN_HOWS), default="inner", show_default=True, help="Join type.")
+@click.pass_context
+def join(
+    ctx: click.Context,
+    endpoints: tuple[str, ...],
+    area: str,
+    start: datetime,
+    end: datetime,
+    reserve_type: str | None,
+    on: str,
+    how: str,
+) -> None:
+    """Fetch ENDPOINTS concurrently and join their rows on settlement period.
+
+    Rows are matched on the --on group fields and periodStartAt; other columns are
+    prefixed with the endpoint name (e.g. imbalance_prices.price).
+    """
+    if len(endpoints) < 2:
+        raise click.UsageError("Specify at least two endpoints to join.")
+    if ctx.obj["nested"] or ctx.obj["partition_by"] or ctx.obj.get("aggregation"):
+        raise click.UsageError("join cannot be combined with --nested, --partition-by or aggregation.")
+    keys = tuple(part.strip() for part in on.split(",") if part.strip())
+    client = make_client(ctx)
+    log.debug("Joining %s area=%s start=%s end=%s on=%s how=%s", ", ".join(endpoints), area, start, end, keys, how)
+    rows = fetch_and_join(
+        client, endpoints, area=area, start=start, end=end, reserve_type=reserve_type, on=keys, how=how
+    )
+    write_rows(rows, ctx.obj["output"], ctx.obj["fmt"])
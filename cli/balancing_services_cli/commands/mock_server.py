@@ -0,0 +1,69 @@
+"""Mock-server command: serve a local mock of the API for load and performance testing."""
+
+from __future__ import annotations
+
+import click
+
+from balancing_services_cli.mock_server import LATENCY_DISTRIBUTIONS, LatencyModel, MockServerConfig, make_server
+
+
+@click.command("mock-server")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to bind.")
+@click.option("--port", default=8080, show_default=True, help="Port to listen on (0 picks a free port).")
+@click.option("--groups", default=4, show_default=True, help="Data groups per response (controls payload size).")
+@click.option("--latency-ms", default=0.0, show_default=True, help="Typical injected latency per request.")
+@click.option("--latency-spread-ms", default=0.0, show_default=True, help="Spread of the injected latency.")
+@click.option(
+    "--latency-distribution",
+    type=click.Choice(LATENCY_DISTRIBUTIONS),
+    default="fixed",
+    show_default=True,
+    help="Shape of the injected latency distribution.",
+)
+@click.option("--rate-429", default=0.0, show_default=True, help="Fraction of requests answered with 429.")
+@click.option("--rate-5xx", default=0.0, show_default=True, help="Fraction of requests answered with 500.")
+@click.option("--retry-after", default=1, show_default=True, help="Retry-After seconds sent with 429 responses.")
+@click.option("--require-token", default=None, help="Reject requests without this bearer token.")
+@click.option("--seed", default=None, type=int, help="Seed for latency and error injection.")
+@click.option(
+    "--validators/--no-validators",
+    default=True,
+    show_default=True,
+    help="Send ETag/Last-Modified headers and answer conditional requests with 304.",
+)
+def mock_server(
+    host: str,
+    port: int,
+    groups: int,
+    latency_ms: float,
+    latency_spread_ms: float,
+    latency_distribution: str,
+    rate_429: float,
+    rate_5xx: float,
+    retry_after: int,
+    require_token: str | None,
+    seed: int | None,
+    validators: bool,
+) -> None:
+    """Serve a local mock of all API paths with synthetic data.
+
+    Point the CLI or client at it with --base-url http://HOST:PORT.
+    """
+    config = MockServerConfig(
+        groups=groups,
+        latency=LatencyModel(latency_distribution, latency_ms, latency_spread_ms),
+        rate_429=rate_429,
+        rate_5xx=rate_5xx,
+        retry_after=retry_after,
+        token=require_token,
+        seed=seed,
+        validators=validators,
+    )
+    server = make_server(config, host, port)
+    click.echo(f"Mock API listening on {server.base_url} (Ctrl-C to stop)", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
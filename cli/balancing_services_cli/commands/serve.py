@@ -0,0 +1,70 @@
+"""Serve command: run a local caching proxy in front of the API."""
+
+from __future__ import annotations
+
+import click
+
+from balancing_services_cli.client_factory import make_client
+from balancing_services_cli.proxy import DEFAULT_UPSTREAM_SLOTS, DEFAULT_WEIGHTS, FairScheduler, make_proxy
+from balancing_services_cli.response_cache import ResponseCache
+
+
+@click.command("serve")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to bind.")
+@click.option("--port", default=8090, show_default=True, help="Port to listen on (0 picks a free port).")
+@click.option(
+    "--upstream-concurrency",
+    default=DEFAULT_UPSTREAM_SLOTS,
+    show_default=True,
+    help="Maximum upstream requests in flight at once.",
+)
+@click.option("--cache-mb", default=256, show_default=True, help="Memory bound of the response cache in MiB.")
+@click.option(
+    "--interactive-weight",
+    default=DEFAULT_WEIGHTS["interactive"],
+    show_default=True,
+    help="Share of upstream slots for interactive consumers.",
+)
+@click.option(
+    "--backfill-weight",
+    default=DEFAULT_WEIGHTS["backfill"],
+    show_default=True,
+    help="Share of upstream slots for consumers sending 'X-Client-Class: backfill'.",
+)
+@click.option("--require-token", default=None, help="Reject consumers without this bearer token.")
+@click.pass_context
+def serve(
+    ctx: click.Context,
+    host: str,
+    port: int,
+    upstream_concurrency: int,
+    cache_mb: int,
+    interactive_weight: int,
+    backfill_weight: int,
+    require_token: str | None,
+) -> None:
+    """Serve the API's paths locally, sharing one upstream client between consumers.
+
+    Responses are cached and identical concurrent requests are sent upstream once.
+    Point consumers at it with --base-url http://HOST:PORT.
+    """
+    if upstream_concurrency < 1 or interactive_weight < 1 or backfill_weight < 1 or cache_mb < 0:
+        raise click.UsageError("--upstream-concurrency and the weights must be positive, --cache-mb non-negative.")
+    scheduler = FairScheduler(upstream_concurrency, {"interactive": interactive_weight, "backfill": backfill_weight})
+    server = make_proxy(
+        make_client(ctx),
+        cache=ResponseCache(max_bytes=cache_mb * 1024**2),
+        scheduler=scheduler,
+        token=require_token,
+        host=host,
+        port=port,
+    )
+    click.echo(f"Proxy for {ctx.obj['base_url']} listening on {server.base_url} (Ctrl-C to stop)", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = ", ".join(f"{name} {server.stats[name]}" for name in ("hits", "coalesced", "misses", "errors"))
+        click.echo(f"Proxy stopped: {stats}", err=True)
@@ -0,0 +1,157 @@
+"""Conditional GET requests (ETag / If-Modified-Since) for the generated API client.
+
+``ConditionalTransport`` remembers the body and validators (``ETag``,
+``Last-Modified``) of successful GET responses. When the same URL is requested
+again it sends ``If-None-Match``/``If-Modified-Since``, and turns a ``304 Not
+Modified`` answer back into the stored ``200`` response, so every endpoint's
+``_parse_response`` sees a normal response and nothing is re-downloaded.
+Responses without validators are passed through and not stored, so servers
+that do not emit them simply behave as before::
+
+    transport = ConditionalTransport(max_bytes=64 * 1024**2)
+    client = AuthenticatedClient(base_url=..., token=..., httpx_args={"transport": transport})
+
+Revalidated responses carry ``response.extensions["revalidated"] = True`` at the
+httpx level.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+import httpx
+
+from balancing_services_cli.cassette import WIRE_HEADERS
+
+DEFAULT_MAX_BYTES = 64 * 1024**2
+
+# Headers of a 304 response that replace the stored ones (RFC 9111, section 4.3.4).
+_UPDATED_HEADERS = ("etag", "last-modified", "date", "cache-control", "expires")
+
+
+@dataclass
+class _Stored:
+    headers: list[tuple[str, str]]
+    content: bytes
+
+
+class ConditionalTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Wraps sync and async transports, revalidating repeated GET requests with stored validators.
+
+    Args:
+        transport: sync transport to forward to; default ``httpx.HTTPTransport()``.
+        async_transport: async transport to forward to; default ``httpx.AsyncHTTPTransport()``.
+        max_bytes: bound on stored body bytes; least recently used bodies are dropped first.
+
+    Attributes:
+        stats: ``Counter`` of ``stored`` responses, ``conditional`` requests sent and
+            ``not_modified`` (304) answers served from the store.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._transport = transport or httpx.HTTPTransport()
+        self._async_transport = async_transport or httpx.AsyncHTTPTransport()
+        self.max_bytes = max_bytes
+        self.stats: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._store: OrderedDict[str, _Stored] = OrderedDict()
+        self._bytes = 0
+
+    def _prepare(self, request: httpx.Request) -> _Stored | None:
+        """Add validators of the stored response, if any, to ``request``."""
+        if request.method != "GET" or "if-none-match" in request.headers or "if-modified-since" in request.headers:
+            return None
+        with self._lock:
+            stored = self._store.get(str(request.url))
+            if stored is None:
+                return None
+            self._store.move_to_end(str(request.url))
+        headers = httpx.Headers(stored.headers)
+        if "etag" in headers:
+            request.headers["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            request.headers["If-Modified-Since"] = headers["last-modified"]
+        self.stats["conditional"] += 1
+        return stored
+
+    def _finish(self, request: httpx.Request, response: httpx.Response, stored: _Stored | None) -> httpx.Response:
+        key = str(request.url)
+        if response.status_code == 304 and stored is not None:
+            self.stats["not_modified"] += 1
+            headers = httpx.Headers(stored.headers)
+            for name in _UPDATED_HEADERS:
+                if name in response.headers:
+                    headers[name] = response.headers[name]
+            with self._lock:
+                if key in self._store:
+                    self._store[key].headers = headers.multi_items()
+            return httpx.Response(
+                200,
+                headers=headers.multi_items(),
+                content=stored.content,
+                request=request,
+                extensions={**response.extensions, "revalidated": True},
+            )
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in WIRE_HEADERS]
+        if request.method == "GET" and response.status_code == 200:
+            if "etag" in response.headers or "last-modified" in response.headers:
+                self._put(key, _Stored(headers, response.content))
+            else:
+                self._forget(key)
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=response.content,
+            request=request,
+            extensions=response.extensions,
+        )
+
+    def _put(self, key: str, stored: _Stored) -> None:
+        if len(stored.content) > self.max_bytes:
+            self._forget(key)
+            return
+        with self._lock:
+            if key in self._store:
+                self._bytes -= len(self._store.pop(key).content)
+            self._store[key] = stored
+            self._bytes += len(stored.content)
+            while self._bytes > self.max_bytes:
+                _, dropped = self._store.popitem(last=False)
+                self._bytes -= len(dropped.content)
+        self.stats["stored"] += 1
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            if key in self._store:
+                self._bytes -= len(self._store.pop(key).content)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        stored = self._prepare(request)
+        response = self._transport.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        return self._finish(request, response, stored)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stored = self._prepare(request)
+        response = await self._async_transport.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        return self._finish(request, response, stored)
+
+    def close(self) -> None:
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
@@ -0,0 +1,212 @@
+"""Cross-zonal capacity allocation of all areas as period x from x to arrays.
+
+``capacity-cross-zonal`` answers one area at a time with ``CrossZonalVolumes``
+groups keyed by ``from_area``/``to_area``. ``fetch_cross_zonal`` requests every
+area concurrently; a border is then usually reported by both of its ends, so
+``CrossZonalMatrix`` keeps the first volume of each (from, to, period)::
+
+    matrix = CrossZonalMatrix.from_groups(fetch_cross_zonal(client, start=start, end=end, reserve_type="aFRR"))
+    matrix.dense[p, i, j]           # volume from matrix.areas[i] to matrix.areas[j] in matrix.periods[p]
+    matrix.net_positions()[p, i]    # exports minus imports of matrix.areas[i] in matrix.periods[p]
+
+The matrix is held sparsely as parallel coordinate arrays (``array`` module)
+and densely as a C-contiguous float64 buffer. ``dense`` is a shaped
+``memoryview``, so ``numpy.asarray(matrix.dense)`` wraps it without copying.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from balancing_services.api.default import get_cross_zonal_capacity_allocation
+from balancing_services.models import Area, CrossZonalVolumes, ReserveType
+
+from balancing_services_cli.batch import EndpointCall, fetch_many
+from balancing_services_cli.output import format_api_error
+
+AREAS = tuple(a.value for a in Area)
+
+
+def fetch_cross_zonal(
+    client: Any,
+    *,
+    start: datetime,
+    end: datetime,
+    reserve_type: str,
+    areas: Sequence[str] = AREAS,
+    max_workers: int = 8,
+) -> list[CrossZonalVolumes]:
+    """Fetch the cross-zonal allocation of every area in ``areas`` concurrently.
+
+    Groups are returned in ``areas`` order, each area's groups as the API sent them.
+
+    Raises:
+        SystemExit: on an API error.
+    """
+    calls = [
+        EndpointCall(
+            get_cross_zonal_capacity_allocation,
+            {
+                "area": Area(area),
+                "period_start_at": start,
+                "period_end_at": end,
+                "reserve_type": ReserveType(reserve_type),
+            },
+        )
+        for area in areas
+    ]
+    groups: list[CrossZonalVolumes] = []
+    for result in fetch_many(client, calls, max_workers=max_workers):
+        if result.error is not None:
+            raise result.error
+        if result.response.status_code != 200:
+            raise SystemExit(format_api_error(result.response))
+        groups.extend(result.response.parsed.data)
+    return groups
+
+
+def deduplicate(groups: Iterable[CrossZonalVolumes]) -> list[CrossZonalVolumes]:
+    """Drop volumes whose (reserve type, from, to, period start) was already seen in an earlier group.
+
+    Groups left without volumes are dropped; the others are copied with the remaining volumes.
+    """
+    seen: set[tuple[str, str, str, datetime]] = set()
+    unique = []
+    for group in groups:
+        pair = (group.reserve_type.value, group.from_area.value, group.to_area.value)
+        volumes = []
+        for item in group.volumes:
+            key = (*pair, item.period.start_at)
+            if key not in seen:
+                seen.add(key)
+                volumes.append(item)
+        if len(volumes) == len(group.volumes):
+            unique.append(group)
+        elif volumes:
+            unique.append(
+                CrossZonalVolumes(
+                    from_area=group.from_area,
+                    from_eic_code=group.from_eic_code,
+                    to_area=group.to_area,
+                    to_eic_code=group.to_eic_code,
+                    reserve_type=group.reserve_type,
+                    volumes=volumes,
+                )
+            )
+    return unique
+
+
+def _shaped(buffer: array, shape: tuple[int, ...]) -> memoryview:
+    view = memoryview(buffer)
+    # memoryview cannot take a shape with a zero dimension; an empty matrix stays one-dimensional.
+    return view.cast("B").cast("d", shape) if len(buffer) else view
+
+
+class CrossZonalMatrix:
+    """Allocated cross-zonal volumes indexed by period, from-area and to-area.
+
+    Attributes:
+        areas: area codes along the second and third axes (all ``Area`` values by default).
+        periods: ``(start, end)`` of each period along the first axis, ordered by start.
+        period_index: sparse coordinates; entry ``k`` is the volume ``volumes[k]`` from
+            ``areas[from_index[k]]`` to ``areas[to_index[k]]`` in ``periods[period_index[k]]``.
+        from_index: see ``period_index``.
+        to_index: see ``period_index``.
+        volumes: see ``period_index``.
+    """
+
+    def __init__(
+        self,
+        areas: Sequence[str],
+        periods: Sequence[tuple[datetime, datetime]],
+        entries: Iterable[tuple[int, int, int, float]],
+    ) -> None:
+        self.areas = list(areas)
+        self.periods = list(periods)
+        self._area_positions = {area: i for i, area in enumerate(self.areas)}
+        self.period_index = array("l")
+        self.from_index = array("l")
+        self.to_index = array("l")
+        self.volumes = array("d")
+        for p, i, j, volume in sorted(entries):
+            self.period_index.append(p)
+            self.from_index.append(i)
+            self.to_index.append(j)
+            self.volumes.append(volume)
+        self._dense: memoryview | None = None
+
+    @classmethod
+    def from_groups(cls, groups: Iterable[CrossZonalVolumes], areas: Sequence[str] = AREAS) -> CrossZonalMatrix:
+        """Build the matrix from (possibly overlapping) groups, e.g. from ``fetch_cross_zonal``.
+
+        Reciprocal reports of the same border are deduplicated. Volumes of groups
+        with a from- or to-area outside ``areas`` are ignored.
+        """
+        positions = {area: i for i, area in enumerate(areas)}
+        raw = []
+        periods: dict[datetime, datetime] = {}
+        for group in deduplicate(groups):
+            i, j = positions.get(group.from_area.value), positions.get(group.to_area.value)
+            if i is None or j is None:
+                continue
+            for item in group.volumes:
+                periods.setdefault(item.period.start_at, item.period.end_at)
+                raw.append((item.period.start_at, i, j, item.volume))
+        starts = sorted(periods)
+        period_positions = {start: p for p, start in enumerate(starts)}
+        entries = ((period_positions[start], i, j, volume) for start, i, j, volume in raw)
+        return cls(areas, [(start, periods[start]) for start in starts], entries)
+
+    def __len__(self) -> int:
+        """Number of non-zero entries."""
+        return len(self.volumes)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return len(self.periods), len(self.areas), len(self.areas)
+
+    @property
+    def dense(self) -> memoryview:
+        """Float64 ``memoryview`` of ``shape``; border-periods without allocation are 0.0. Built once."""
+        if self._dense is None:
+            n_periods, n_areas, _ = self.shape
+            buffer = array("d", [0.0]) * (n_periods * n_areas * n_areas)
+            for p, i, j, volume in zip(self.period_index, self.from_index, self.to_index, self.volumes):
+                buffer[(p * n_areas + i) * n_areas + j] = volume
+            self._dense = _shaped(buffer, self.shape)
+        return self._dense
+
+    def net_positions(self) -> memoryview:
+        """Exports minus imports per period and area, as a float64 ``memoryview`` of shape (periods, areas)."""
+        n_periods, n_areas = len(self.periods), len(self.areas)
+        net = array("d", [0.0]) * (n_periods * n_areas)
+        for p, i, j, volume in zip(self.period_index, self.from_index, self.to_index, self.volumes):
+            net[p * n_areas + i] += volume
+            net[p * n_areas + j] -= volume
+        return _shaped(net, (n_periods, n_areas))
+
+    def between(self, from_area: str, to_area: str) -> list[float]:
+        """Volumes from ``from_area`` to ``to_area``, one per period (0.0 where none is allocated)."""
+        i, j = self._area_positions[from_area], self._area_positions[to_area]
+        series = [0.0] * len(self.periods)
+        for p, fi, tj, volume in zip(self.period_index, self.from_index, self.to_index, self.volumes):
+            if fi == i and tj == j:
+                series[p] = volume
+        return series
+
+    def net_position_rows(self, reserve_type: str | None = None) -> Iterator[dict[str, Any]]:
+        """Flattened rows of the net positions of areas with any allocation, by period then area."""
+        net = self.net_positions()
+        active = sorted(set(self.from_index) | set(self.to_index))
+        for p, (start, end) in enumerate(self.periods):
+            for i in active:
+                yield {
+                    "area": self.areas[i],
+                    "reserve_type": reserve_type,
+                    "periodStartAt": start.isoformat(),
+                    "periodEndAt": end.isoformat(),
+                    "net_position": net[p, i],
+                }
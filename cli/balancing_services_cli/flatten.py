@@ -2,30 +2,72 @@
 
 from __future__ import annotations
 
+import re
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
+from balancing_services.types import Unset
+
+# Types of the API fields that are not flattened to strings; all others hold
+# enum values, EIC codes or ISO 8601 times.
+FIELD_TYPES: dict[str, type] = {
+    "price": float,
+    "volume": float,
+    "capacity": float,
+    "average_power_mw": float,
+    "standard_product": bool,
+}
+
 
 @dataclass(frozen=True)
 class EndpointConfig:
     """Describes how to flatten a specific API response.
 
     Attributes:
+        name: snake_case endpoint name, used e.g. as the table name in database sinks.
         group_fields: attribute names on each data[] group to extract as columns.
         items_field: attribute name holding the nested list (e.g. "prices", "volumes", "bids").
         item_fields: attribute names on each nested item to extract as columns.
     """
 
+    name: str
     group_fields: tuple[str, ...]
     items_field: str
     item_fields: tuple[str, ...]
 
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Column names of the flattened rows, in output order."""
+        item_columns: list[str] = []
+        for field in self.item_fields:
+            if field == "period":
+                item_columns.extend(("periodStartAt", "periodEndAt"))
+            else:
+                item_columns.append(field)
+        return (*self.group_fields, *item_columns)
+
+    @property
+    def key_columns(self) -> tuple[str, ...]:
+        """Natural key of a flattened row: the group fields plus the period start."""
+        return (*self.group_fields, "periodStartAt")
+
+
+def column_type(column: str) -> type | None:
+    """``float`` or ``bool`` for columns holding such an API field (see ``FIELD_TYPES``), else None.
+
+    Derived names count too: ``imbalance_prices.price`` (joins) and ``price_2`` (procurement columns).
+    """
+    return FIELD_TYPES.get(re.sub(r"_\d+$", "", column.rsplit(".", 1)[-1]))
+
 
-def _extract_value(obj: Any, field: str) -> Any:
+def extract_value(obj: Any, field: str) -> Any:
     """Pull a value from an attrs/dataclass object, converting enums and datetimes to strings."""
     val = getattr(obj, field)
+    if isinstance(val, Unset):
+        return None
     if isinstance(val, Enum):
         return val.value
     if isinstance(val, datetime):
@@ -33,15 +75,14 @@ def _extract_value(obj: Any, field: str) -> Any:
     return val
 
 
-def flatten_response(data: list[Any], config: EndpointConfig) -> list[dict[str, Any]]:
-    """Flatten a list of data groups into a flat list of row dicts.
+def iter_rows(data: list[Any], config: EndpointConfig) -> Iterator[dict[str, Any]]:
+    """Lazily flatten a list of data groups, yielding one row dict per nested item.
 
     Each group contains metadata fields and a nested list of items.
-    The output denormalizes each item row by prepending the group metadata.
+    Each yielded row denormalizes an item by prepending the group metadata.
     """
-    rows: list[dict[str, Any]] = []
     for group in data:
-        group_values = {field: _extract_value(group, field) for field in config.group_fields}
+        group_values = {field: extract_value(group, field) for field in config.group_fields}
         items = getattr(group, config.items_field)
         for item in items:
             row = dict(group_values)
@@ -51,68 +92,82 @@ def flatten_response(data: list[Any], config: EndpointConfig) -> list[dict[str,
                     row["periodStartAt"] = period.start_at.isoformat()
                     row["periodEndAt"] = period.end_at.isoformat()
                 else:
-                    row[field] = _extract_value(item, field)
-            rows.append(row)
-    return rows
+                    row[field] = extract_value(item, field)
+            yield row
+
+
+def flatten_response(data: list[Any], config: EndpointConfig) -> list[dict[str, Any]]:
+    """Flatten a list of data groups into a flat list of row dicts (see ``iter_rows``)."""
+    return list(iter_rows(data, config))
 
 
 # ── Endpoint configurations ────────────────────────────────────────────────
 
 IMBALANCE_PRICES = EndpointConfig(
+    name="imbalance_prices",
     group_fields=("area", "eic_code", "currency", "direction"),
     items_field="prices",
     item_fields=("period", "price"),
 )
 
 IMBALANCE_VOLUMES = EndpointConfig(
+    name="imbalance_volumes",
     group_fields=("area", "eic_code"),
     items_field="volumes",
     item_fields=("period", "average_power_mw", "direction"),
 )
 
 ENERGY_ACTIVATED = EndpointConfig(
+    name="energy_activated",
     group_fields=("area", "eic_code", "reserve_type", "direction", "activation_type", "standard_product"),
     items_field="volumes",
     item_fields=("period", "volume"),
 )
 
 ENERGY_OFFERED = EndpointConfig(
+    name="energy_offered",
     group_fields=("area", "eic_code", "reserve_type", "direction", "activation_type", "standard_product"),
     items_field="volumes",
     item_fields=("period", "volume"),
 )
 
 ENERGY_PRICES = EndpointConfig(
+    name="energy_prices",
     group_fields=("area", "eic_code", "reserve_type", "direction", "activation_type", "currency", "standard_product"),
     items_field="prices",
     item_fields=("period", "price"),
 )
 
 ENERGY_BIDS = EndpointConfig(
+    name="energy_bids",
     group_fields=("area", "eic_code", "reserve_type", "direction", "currency", "standard_product"),
     items_field="bids",
     item_fields=("period", "volume", "price"),
 )
 
 CAPACITY_BIDS = EndpointConfig(
+    name="capacity_bids",
     group_fields=("area", "eic_code", "reserve_type", "direction", "currency"),
     items_field="bids",
     item_fields=("period", "capacity", "price", "status"),
 )
 
 CAPACITY_PRICES = EndpointConfig(
+    name="capacity_prices",
     group_fields=("area", "eic_code", "reserve_type", "direction", "currency", "procured_at"),
     items_field="prices",
     item_fields=("period", "price"),
 )
 
 CAPACITY_PROCURED = EndpointConfig(
+    name="capacity_procured",
     group_fields=("area", "eic_code", "reserve_type", "direction", "procured_at"),
     items_field="volumes",
     item_fields=("period", "volume"),
 )
 
 CAPACITY_CROSS_ZONAL = EndpointConfig(
+    name="capacity_cross_zonal",
     group_fields=("from_area", "from_eic_code", "to_area", "to_eic_code", "reserve_type"),
     items_field="volumes",
     item_fields=("period", "volume"),
@@ -0,0 +1,168 @@
+"""Follow a time-series endpoint as new settlement periods are published.
+
+``follow_rows`` polls an endpoint such as ``get_imbalance_prices`` and yields
+only rows that are new or whose values changed since they were last seen::
+
+    for rows in follow_rows(get_imbalance_prices, IMBALANCE_PRICES, client=client, area=Area.EE, start=start):
+        write_rows(rows, ...)
+
+Each poll requests the window from the oldest per-group ``period.end_at`` seen
+so far (minus ``FollowPolicy.revision_window``, so recent revisions are
+noticed) up to the next settlement boundary; a group that stopped publishing
+holds the window back by at most ``FollowPolicy.max_lag``. Once every group has
+data up to the last boundary, the next poll is scheduled shortly after the
+following boundary; until then polls back off exponentially. Waits are jittered
+so that many followers do not poll in lockstep. With an end time, following
+stops when every group has reached it, or at the first successful poll once the
+end is ``FollowPolicy.settle_timeout`` in the past, whatever it returned.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import ModuleType
+from typing import Any
+
+from balancing_services_cli.flatten import EndpointConfig, iter_rows
+from balancing_services_cli.output import format_api_error
+
+log = logging.getLogger(__name__)
+
+# Statuses after which the poll is retried with backoff instead of failing.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class FollowPolicy:
+    """Polling schedule of ``follow_rows``.
+
+    Attributes:
+        interval: settlement period length; polls are aligned to its boundaries.
+        publication_delay: wait after a boundary before polling for the period that just ended.
+        revision_window: how far before the latest period seen each poll starts, to pick up revised values.
+        initial_backoff: first wait while the expected period is not yet published.
+        max_backoff: upper bound of the doubling backoff.
+        jitter: relative random spread of backoff waits (0.2 = ±20%); aligned polls are delayed by up to
+            this fraction of ``publication_delay``.
+        max_lag: how far the window may start before the most recent period seen of any group,
+            so a group that stopped publishing does not make every request grow.
+        settle_timeout: time after ``until`` (plus ``publication_delay``) after which a successful
+            poll ends following even if some groups never reached ``until``.
+    """
+
+    interval: timedelta = timedelta(minutes=15)
+    publication_delay: timedelta = timedelta(seconds=30)
+    revision_window: timedelta = timedelta(hours=1)
+    initial_backoff: timedelta = timedelta(seconds=30)
+    max_backoff: timedelta = timedelta(minutes=5)
+    jitter: float = 0.2
+    max_lag: timedelta = timedelta(hours=6)
+    settle_timeout: timedelta = timedelta(minutes=10)
+
+
+def floor_boundary(t: datetime, interval: timedelta) -> datetime:
+    """Latest settlement boundary at or before ``t``."""
+    return t - (t - _EPOCH) % interval
+
+
+def follow_rows(
+    endpoint: ModuleType,
+    config: EndpointConfig,
+    *,
+    client: Any,
+    start: datetime,
+    until: datetime | None = None,
+    policy: FollowPolicy = FollowPolicy(),
+    now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    sleep: Callable[[float], None] = time.sleep,
+    rng: random.Random | None = None,
+    **kwargs: Any,
+) -> Iterator[list[dict[str, Any]]]:
+    """Poll ``endpoint`` from ``start`` on, yielding each batch of new or revised flattened rows.
+
+    Args:
+        endpoint: generated endpoint module with ``period_start_at``/``period_end_at`` arguments.
+        config: flattening configuration of the endpoint.
+        client: ``Client`` or ``AuthenticatedClient``.
+        start: beginning of the first window.
+        until: stop once every group has data up to this time (or ``policy.settle_timeout`` after it);
+            None follows forever.
+        policy: polling schedule.
+        now: returns the current time; ``sleep`` waits a number of seconds (both replaceable for tests).
+        rng: source of jitter.
+        **kwargs: further endpoint arguments (e.g. ``area``, ``reserve_type``).
+
+    Raises:
+        SystemExit: on an API error other than rate limiting or a server error.
+    """
+    rng = rng or random.Random()
+    last_end: dict[tuple[Any, ...], datetime] = {}
+    seen: dict[tuple[Any, ...], tuple[datetime, tuple[Any, ...]]] = {}
+    failures = 0
+    while True:
+        current = now()
+        window_start = start
+        if last_end:
+            oldest = max(min(last_end.values()), max(last_end.values()) - policy.max_lag)
+            window_start = max(oldest - policy.revision_window, start)
+        window_end = floor_boundary(current, policy.interval) + policy.interval
+        if until is not None:
+            window_end = min(window_end, until)
+        log.debug("Polling %s from %s to %s", config.name, window_start, window_end)
+        response = endpoint.sync_detailed(
+            client=client, period_start_at=window_start, period_end_at=window_end, **kwargs
+        )
+        if response.status_code in RETRY_STATUSES:
+            log.debug("HTTP %d, retrying", response.status_code)
+        elif response.status_code != 200:
+            raise SystemExit(format_api_error(response))
+        else:
+            changed = []
+            for row in iter_rows(response.parsed.data, config):
+                period_start = datetime.fromisoformat(row["periodStartAt"])
+                key = tuple(row[c] for c in config.key_columns)
+                values = tuple(row.values())
+                previous = seen.get(key)
+                if previous is None or previous[1] != values:
+                    seen[key] = (period_start, values)
+                    changed.append(row)
+                group = tuple(row[f] for f in config.group_fields)
+                period_end = datetime.fromisoformat(row["periodEndAt"])
+                if group not in last_end or period_end > last_end[group]:
+                    last_end[group] = period_end
+            # Rows before the window are never requested again.
+            seen = {k: v for k, v in seen.items() if v[0] >= window_start}
+            log.debug("%d new or revised row(s)", len(changed))
+            if changed:
+                yield changed
+
+        if (
+            until is not None
+            and response.status_code == 200
+            and window_end >= until
+            and current >= until + policy.publication_delay + policy.settle_timeout
+        ):
+            return
+        due = floor_boundary(now() - policy.publication_delay, policy.interval)
+        if until is not None:
+            due = min(due, until)
+        if last_end and min(last_end.values()) >= due and response.status_code == 200:
+            if until is not None and due >= until:
+                return
+            failures = 0
+            # Never wake before the publication delay has passed.
+            wake = due + policy.interval + policy.publication_delay * (1 + rng.uniform(0, policy.jitter))
+            delay = max((wake - now()).total_seconds(), 0.0)
+        else:
+            backoff = min(policy.initial_backoff * 2**failures, policy.max_backoff).total_seconds()
+            delay = backoff * (1 + rng.uniform(-policy.jitter, policy.jitter))
+            failures += 1
+        log.debug("Next poll in %.0f s", delay)
+        sleep(delay)
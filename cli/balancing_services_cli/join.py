@@ -0,0 +1,194 @@
+"""Streaming sort-merge join of several endpoints on group fields and settlement period.
+
+``fetch_and_join`` fetches the given endpoints for one area and window
+concurrently and yields joined rows::
+
+    for row in fetch_and_join(client, ["imbalance-prices", "energy-activated"], area="EE",
+                              start=start, end=end, reserve_type="aFRR"):
+        ...
+
+Each endpoint's rows are produced in join-key order by merging the (already
+period-ordered) item lists of its groups with ``heapq.merge``, and
+``merge_join`` walks all streams in step. Neither step materializes flattened
+rows; only the rows sharing the current key are held at a time. Columns other
+than the keys are prefixed with the endpoint's name, e.g.
+``imbalance_prices.price``.
+"""
+
+from __future__ import annotations
+
+import copy
+import heapq
+import itertools
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+from typing import Any
+
+from balancing_services.api.default import (
+    get_balancing_capacity_prices,
+    get_balancing_capacity_procured_volumes,
+    get_balancing_energy_activated_volumes,
+    get_balancing_energy_offered_volumes,
+    get_balancing_energy_prices,
+    get_imbalance_prices,
+    get_imbalance_total_volumes,
+)
+from balancing_services.models import Area, ReserveType
+
+from balancing_services_cli import flatten
+from balancing_services_cli.batch import EndpointCall, fetch_many
+from balancing_services_cli.flatten import EndpointConfig, iter_rows
+from balancing_services_cli.output import format_api_error
+
+JOIN_HOWS = ("inner", "left", "outer")
+
+PERIOD_KEY = "periodStartAt"
+
+
+@dataclass(frozen=True)
+class JoinSource:
+    """An endpoint that can take part in a join: queried by area and period (and reserve type)."""
+
+    endpoint: ModuleType
+    config: EndpointConfig
+    needs_reserve_type: bool
+
+
+JOINABLE: dict[str, JoinSource] = {
+    "imbalance-prices": JoinSource(get_imbalance_prices, flatten.IMBALANCE_PRICES, False),
+    "imbalance-volumes": JoinSource(get_imbalance_total_volumes, flatten.IMBALANCE_VOLUMES, False),
+    "energy-activated": JoinSource(get_balancing_energy_activated_volumes, flatten.ENERGY_ACTIVATED, True),
+    "energy-offered": JoinSource(get_balancing_energy_offered_volumes, flatten.ENERGY_OFFERED, True),
+    "energy-prices": JoinSource(get_balancing_energy_prices, flatten.ENERGY_PRICES, True),
+    "capacity-prices": JoinSource(get_balancing_capacity_prices, flatten.CAPACITY_PRICES, True),
+    "capacity-procured": JoinSource(get_balancing_capacity_procured_volumes, flatten.CAPACITY_PROCURED, True),
+}
+
+
+def _sort_key(row: dict[str, Any], keys: Sequence[str]) -> tuple[Any, ...]:
+    # None (e.g. a missing optional field) sorts first and never compares with a string.
+    return tuple((row[k] is not None, row[k] if row[k] is not None else "") for k in keys)
+
+
+def sorted_rows(data: list[Any], config: EndpointConfig, on: Sequence[str]) -> Iterator[dict[str, Any]]:
+    """Flatten groups into rows ordered by ``(*on, periodStartAt)``.
+
+    ``on`` must be group fields, which are constant within a group, so each group's
+    rows are ordered by period alone and the groups are merged lazily. A group whose
+    items are not ordered by period start is flattened from a sorted copy, leaving
+    the parsed response untouched.
+    """
+    keys = (*on, PERIOD_KEY)
+    streams = []
+    for group in data:
+        items = getattr(group, config.items_field)
+        if any(a.period.start_at > b.period.start_at for a, b in itertools.pairwise(items)):
+            group = copy.copy(group)
+            setattr(group, config.items_field, sorted(items, key=lambda item: item.period.start_at))
+        streams.append(iter_rows([group], config))
+    return heapq.merge(*streams, key=lambda row: _sort_key(row, keys))
+
+
+def merge_join(
+    streams: Mapping[str, Iterable[dict[str, Any]]],
+    columns: Mapping[str, Sequence[str]],
+    on: Sequence[str],
+    how: str = "inner",
+) -> Iterator[dict[str, Any]]:
+    """Join row streams that are sorted by ``(*on, periodStartAt)``.
+
+    Rows of different streams with equal keys are combined as in SQL (every
+    combination is emitted). ``how`` selects which keys are kept: ``inner`` (present
+    in every stream), ``left`` (present in the first stream) or ``outer`` (any);
+    columns of streams without a match are None.
+
+    Args:
+        streams: sorted rows by stream name.
+        columns: the columns of each stream's rows.
+        on: group fields to join on in addition to ``periodStartAt``.
+        how: join type.
+
+    Yields:
+        Rows with the key columns followed by ``<stream>.<column>`` for every other column.
+    """
+    if how not in JOIN_HOWS:
+        raise ValueError(f"how must be one of {JOIN_HOWS}, got {how!r}")
+    keys = (*on, PERIOD_KEY)
+    names = list(streams)
+    value_columns = {name: [c for c in columns[name] if c not in keys] for name in names}
+    runs = {
+        name: itertools.groupby(rows, key=lambda row: _sort_key(row, keys)) for name, rows in streams.items()
+    }
+    heads: dict[str, tuple[tuple[Any, ...], Iterator[dict[str, Any]]] | None] = {
+        name: next(runs[name], None) for name in names
+    }
+    while True:
+        present = [head[0] for head in heads.values() if head is not None]
+        if not present:
+            return
+        current = min(present)
+        matched: dict[str, list[dict[str, Any]]] = {}
+        for name in names:
+            head = heads[name]
+            if head is not None and head[0] == current:
+                matched[name] = list(head[1])
+                heads[name] = next(runs[name], None)
+        if (how == "inner" and len(matched) < len(names)) or (how == "left" and names[0] not in matched):
+            continue
+        key_row = next(iter(matched.values()))[0]
+        base = {k: key_row[k] for k in keys}
+        for combination in itertools.product(*(matched.get(name, [None]) for name in names)):
+            row = dict(base)
+            for name, source in zip(names, combination):
+                for column in value_columns[name]:
+                    row[f"{name}.{column}"] = None if source is None else source[column]
+            yield row
+
+
+def fetch_and_join(
+    client: Any,
+    names: Sequence[str],
+    *,
+    area: str,
+    start: datetime,
+    end: datetime,
+    reserve_type: str | None = None,
+    on: Sequence[str] = ("area",),
+    how: str = "inner",
+) -> Iterator[dict[str, Any]]:
+    """Fetch the ``JOINABLE`` endpoints ``names`` concurrently and return an iterator of their joined rows.
+
+    The rows are produced by ``merge_join`` with ``on`` (group fields, default ``area``)
+    plus ``periodStartAt`` as keys.
+
+    Raises:
+        SystemExit: on invalid arguments or an API error.
+    """
+    sources = [JOINABLE[name] for name in names]
+    if len({source.config.name for source in sources}) != len(sources):
+        raise SystemExit("Each endpoint can be joined only once.")
+    for name, source in zip(names, sources):
+        unknown = [key for key in on if key not in source.config.group_fields]
+        if unknown:
+            raise SystemExit(f"Cannot join {name} on {', '.join(unknown)}: not one of its group fields.")
+    if reserve_type is None and any(source.needs_reserve_type for source in sources):
+        raise SystemExit("--reserve-type is required for energy and capacity endpoints.")
+
+    calls = []
+    for source in sources:
+        kwargs: dict[str, Any] = {"area": Area(area), "period_start_at": start, "period_end_at": end}
+        if source.needs_reserve_type:
+            kwargs["reserve_type"] = ReserveType(reserve_type)
+        calls.append(EndpointCall(source.endpoint, kwargs))
+    streams = {}
+    for result in fetch_many(client, calls, max_workers=len(calls)):
+        if result.error is not None:
+            raise result.error
+        if result.response.status_code != 200:
+            raise SystemExit(format_api_error(result.response))
+        config = sources[result.index].config
+        streams[config.name] = sorted_rows(result.response.parsed.data, config, on)
+    columns = {source.config.name: source.config.columns for source in sources}
+    return merge_join(streams, columns, on, how)
@@ -8,6 +8,8 @@ import sys
 import click
 
 from balancing_services_cli import __version__
+from balancing_services_cli.aggregate import AggregationSpec, parse_aggregations, parse_group_by, parse_resample
+from balancing_services_cli.commands.backfill import backfill
 from balancing_services_cli.commands.capacity import (
     capacity_bids,
     capacity_cross_zonal,
@@ -24,7 +26,13 @@ from balancing_services_cli.commands.imbalance import (
     imbalance_prices,
     imbalance_volumes,
 )
+from balancing_services_cli.commands.join import join
+from balancing_services_cli.commands.mock_server import mock_server
+from balancing_services_cli.commands.serve import serve
 from balancing_services_cli.commands.version import check_update
+from balancing_services_cli.dataset import parse_partition_by
+from balancing_services_cli.profiling import Profiler
+from balancing_services_cli.rate_limit import DEFAULT_PATH as DEFAULT_RATE_LIMIT_PATH
 
 
 @click.group()
@@ -36,19 +44,124 @@ from balancing_services_cli.commands.version import check_update
     show_default=True,
     help="Base URL of the API server.",
 )
-@click.option("--output", "-o", default=None, help="Output file path (.csv, .parquet, .json).")
+@click.option(
+    "--output",
+    "-o",
+    default=None,
+    help="Output file path (.csv, .parquet, .json, .jsonl, .arrow, .sqlite, .duckdb).",
+)
 @click.option(
     "--format",
     "-f",
     "fmt",
-    type=click.Choice(["csv", "parquet"]),
+    type=click.Choice(["csv", "parquet", "json", "jsonl", "arrow", "arrow-stream", "sqlite", "duckdb"]),
     default=None,
     help="Output format; default: csv (overrides file extension detection).",
 )
+@click.option(
+    "--partition-by",
+    default=None,
+    help="Comma-separated columns (or 'date') to write a Hive-partitioned Parquet dataset into the --output directory.",
+)
+@click.option(
+    "--resample",
+    default=None,
+    metavar="INTERVAL",
+    help="Aggregate rows into time buckets of this width (e.g. 1h, 1d; aligned to UTC).",
+)
+@click.option(
+    "--group-by",
+    default=None,
+    help="Comma-separated columns to aggregate by (default with --resample/--agg: the endpoint's group fields).",
+)
+@click.option(
+    "--agg",
+    default=None,
+    help="Comma-separated aggregations COLUMN:FUNCTION (sum, mean, min, max, first, last) or COLUMN:wmean:WEIGHT; "
+    "default: mean of every numeric column.",
+)
+@click.option(
+    "--nested",
+    is_flag=True,
+    default=False,
+    help="Write the API's nested group structure instead of flattened rows (JSON formats only).",
+)
+@click.option(
+    "--record",
+    "record_path",
+    default=None,
+    metavar="CASSETTE",
+    help="Record every API response (with its latency) into a gzip JSON Lines cassette file.",
+)
+@click.option(
+    "--replay",
+    "replay_path",
+    default=None,
+    metavar="CASSETTE",
+    help="Serve API responses from a recorded cassette instead of the network.",
+)
+@click.option(
+    "--replay-latency-scale",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Multiplier for recorded latencies during --replay (1 = original timing, 0 = instant).",
+)
+@click.option(
+    "--rate-limit",
+    type=float,
+    default=None,
+    metavar="RPS",
+    help="Limit API requests per second, shared by all bs-cli processes using the same --rate-limit-file.",
+)
+@click.option(
+    "--rate-limit-burst",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Requests allowed back to back under --rate-limit after an idle period.",
+)
+@click.option(
+    "--rate-limit-file",
+    default=DEFAULT_RATE_LIMIT_PATH,
+    show_default=True,
+    metavar="FILE",
+    help="SQLite file holding the shared --rate-limit budget.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print wall time, CPU time, bytes and peak memory per pipeline stage and HTTP request to stderr.",
+)
+@click.option(
+    "--profile-output",
+    default=None,
+    metavar="FILE",
+    help="Also run cProfile and write pstats data to FILE (implies --profile).",
+)
 @click.option("--verbose", "-v", is_flag=True, default=False, help="Print progress messages to stderr.")
 @click.pass_context
 def cli(
-    ctx: click.Context, token: str | None, base_url: str, output: str | None, fmt: str | None, verbose: bool
+    ctx: click.Context,
+    token: str | None,
+    base_url: str,
+    output: str | None,
+    fmt: str | None,
+    partition_by: str | None,
+    resample: str | None,
+    group_by: str | None,
+    agg: str | None,
+    nested: bool,
+    record_path: str | None,
+    replay_path: str | None,
+    replay_latency_scale: float,
+    rate_limit: float | None,
+    rate_limit_burst: float,
+    rate_limit_file: str,
+    profile: bool,
+    profile_output: str | None,
+    verbose: bool,
 ) -> None:
     """Balancing Services CLI - access European electricity balancing market data."""
     if verbose:
@@ -62,7 +175,37 @@ def cli(
     ctx.obj["base_url"] = base_url
     ctx.obj["output"] = output
     ctx.obj["fmt"] = fmt
+    ctx.obj["partition_by"] = parse_partition_by(partition_by)
+    ctx.obj["nested"] = nested
+    ctx.obj["aggregation"] = None
+    if resample or group_by or agg:
+        ctx.obj["aggregation"] = AggregationSpec(
+            resample=parse_resample(resample),
+            group_by=parse_group_by(group_by),
+            aggregations=parse_aggregations(agg),
+        )
+    if record_path and replay_path:
+        raise SystemExit("--record and --replay cannot be used together.")
+    ctx.obj["record_path"] = record_path
+    ctx.obj["replay_path"] = replay_path
+    ctx.obj["replay_latency_scale"] = replay_latency_scale
+    if rate_limit is not None and (rate_limit <= 0 or rate_limit_burst < 1):
+        raise SystemExit("--rate-limit must be positive and --rate-limit-burst at least 1.")
+    ctx.obj["rate_limit"] = rate_limit
+    ctx.obj["rate_limit_burst"] = rate_limit_burst
+    ctx.obj["rate_limit_file"] = rate_limit_file
     ctx.obj["verbose"] = verbose
+    ctx.obj["profiler"] = None
+    if profile or profile_output:
+        profiler = Profiler(cprofile_path=profile_output)
+        ctx.obj["profiler"] = profiler
+
+        def report() -> None:
+            profiler.stop()
+            click.echo(profiler.report(), err=True)
+
+        ctx.call_on_close(report)
+        profiler.start()
 
 
 cli.add_command(imbalance_prices)
@@ -75,4 +218,8 @@ cli.add_command(capacity_bids)
 cli.add_command(capacity_prices)
 cli.add_command(capacity_procured)
 cli.add_command(capacity_cross_zonal)
+cli.add_command(join)
+cli.add_command(mock_server)
+cli.add_command(serve)
+cli.add_command(backfill)
 cli.add_command(check_update)
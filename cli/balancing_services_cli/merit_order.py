@@ -0,0 +1,236 @@
+"""Merit-order curves of energy and capacity bids with Arrow compute kernels.
+
+``MeritOrder`` sorts a table of flattened bid rows (see ``flatten.iter_rows``)
+into one supply curve per area, reserve type, direction, currency, standard
+product flag (energy bids) and period, and answers queries for all curves at once::
+
+    curves = MeritOrder(pa.Table.from_pylist(rows), quantity="volume")
+    curves.clearing_prices([100.0, 250.0])   # marginal price at each cumulative volume, per curve
+    curves.volumes_at_prices([80.0])         # volume offered at or better than each price, per curve
+    curves.top(5)                            # the five cheapest bids of every curve
+
+Bids are ranked by ascending price, except for directions in ``descending``
+(downward energy bids, where the most valuable bid for the TSO is the one with
+the highest price). Sorting, the running totals within each curve and every
+query run in Arrow's vectorized kernels on whole columns, so the cost does not
+depend on the number of curves.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from balancing_services_cli.flatten import EndpointConfig
+from balancing_services_cli.output import require_pyarrow
+
+CURVE_KEYS = ("area", "reserve_type", "direction", "currency", "standard_product", "periodStartAt", "periodEndAt")
+
+QUERIES = ("curve", "price-at", "volume-at", "top")
+
+# Hidden columns used while building curves.
+_KEY = "__key"
+_FLIP = "__flip"
+_SEGMENT = "__segment"
+
+
+@dataclass(frozen=True)
+class MeritOrderQuery:
+    """What to write instead of the raw bids.
+
+    Attributes:
+        kind: ``curve`` (every bid with its rank and cumulative quantity), ``price-at``
+            (clearing price at each of ``values`` as cumulative quantity), ``volume-at``
+            (quantity offered at or better than each of ``values`` as price) or ``top``
+            (the ``values[0]`` best bids of each curve).
+        values: the query's arguments.
+    """
+
+    kind: str
+    values: tuple[float, ...] = ()
+
+
+def parse_merit_order(value: str | None) -> MeritOrderQuery | None:
+    """Parse a ``--merit-order`` value: ``curve``, ``price-at:Q[,Q...]``, ``volume-at:P[,P...]`` or ``top:N``."""
+    if not value:
+        return None
+    kind, _, arguments = (part.strip() for part in value.partition(":"))
+    usage = f"Invalid --merit-order value {value!r}; use curve, price-at:VOLUME[,...], volume-at:PRICE[,...] or top:N."
+    if kind not in QUERIES or (kind == "curve") != (not arguments):
+        raise SystemExit(usage)
+    try:
+        values = tuple(float(part) for part in arguments.split(",")) if arguments else ()
+    except ValueError:
+        raise SystemExit(usage)
+    if kind == "top" and (len(values) != 1 or values[0] < 1 or not values[0].is_integer()):
+        raise SystemExit(usage)
+    return MeritOrderQuery(kind, values)
+
+
+def quantity_field(config: EndpointConfig) -> str:
+    """The bid quantity column of an endpoint: ``capacity`` for capacity bids, otherwise ``volume``."""
+    return "capacity" if "capacity" in config.item_fields else "volume"
+
+
+def _filled(pa: Any, pc: Any, n: int, value: bool) -> Any:
+    return pc.fill_null(pa.nulls(n, pa.bool_()), value)
+
+
+def _positions(pa: Any, pc: Any, n: int) -> Any:
+    """0, 1, ..., n - 1 as int64, without building a Python range."""
+    return pc.subtract(pc.cumulative_sum(pc.cast(_filled(pa, pc, n, True), pa.int64())), 1)
+
+
+class MeritOrder:
+    """Bids sorted into merit-order curves with running quantity totals.
+
+    Rows with a null price or quantity are dropped. Quantities must not be negative.
+
+    Attributes:
+        bids: the input rows in merit order, curve by curve, with ``rank`` (1-based
+            position within the curve) and ``cumulative_<quantity>`` columns appended.
+        curves: one row per curve with its key columns, in the same order as ``bids``.
+    """
+
+    def __init__(
+        self,
+        table: Any,
+        quantity: str = "volume",
+        keys: Sequence[str] = CURVE_KEYS,
+        descending: Sequence[str] = ("down",),
+    ) -> None:
+        pa = require_pyarrow("--merit-order")
+        import pyarrow.compute as pc
+
+        self._pa, self._pc = pa, pc
+        self.quantity = quantity
+        self.keys = tuple(key for key in keys if key in table.column_names)
+        missing = [name for name in ("price", quantity) if name not in table.column_names]
+        if table.num_rows and missing:
+            raise SystemExit(f"Unknown column(s) for the merit order: {', '.join(missing)}.")
+        if table.num_rows == 0:
+            table = pa.table({name: pa.array([], pa.float64()) for name in ("price", quantity)})
+
+        valid = pc.and_(pc.is_valid(table["price"]), pc.is_valid(table[quantity]))
+        table = table.filter(valid)
+        price = pc.cast(table["price"], pa.float64())
+        if descending and "direction" in table.column_names:
+            flip = pc.fill_null(pc.is_in(table["direction"], value_set=pa.array(list(descending))), False)
+        else:
+            flip = _filled(pa, pc, table.num_rows, False)
+        table = table.append_column(_KEY, pc.if_else(flip, pc.negate(price), price)).append_column(_FLIP, flip)
+        table = table.sort_by([*((key, "ascending") for key in self.keys), (_KEY, "ascending")])
+
+        n = table.num_rows
+        starts_mask = _filled(pa, pc, min(n, 1), True)
+        if n > 1:
+            changed = _filled(pa, pc, n - 1, False)
+            for key in self.keys:
+                column = table[key].combine_chunks()
+                before, after = column.slice(0, n - 1), column.slice(1)
+                differs = pc.fill_null(pc.not_equal(before, after), False)
+                null_changed = pc.not_equal(pc.is_null(before), pc.is_null(after))
+                changed = pc.or_(changed, pc.or_(differs, null_changed))
+            starts_mask = pa.concat_arrays([starts_mask, changed])
+        starts = pc.indices_nonzero(starts_mask)
+        segment = pc.subtract(pc.cumulative_sum(pc.cast(starts_mask, pa.int64())), 1)
+
+        amount = pc.cast(table[quantity], pa.float64())
+        running = pc.cumulative_sum(amount)
+        # Running total of the whole table minus everything before the curve's first bid.
+        offset = pc.subtract(pc.take(running, starts), pc.take(amount, starts))
+        cumulative = pc.subtract(running, pc.take(offset, segment))
+        rank = pc.add(pc.subtract(_positions(pa, pc, n), pc.take(starts, segment)), 1)
+
+        self._order_key = table[_KEY]
+        self._flip = table[_FLIP]
+        self._segment = segment
+        self.bids = table.drop_columns([_KEY, _FLIP]).append_column("rank", rank)
+        self.bids = self.bids.append_column(f"cumulative_{quantity}", cumulative)
+        self.curves = table.select(list(self.keys)).take(starts)
+
+    def __len__(self) -> int:
+        return self.curves.num_rows
+
+    def _per_curve(self, values: Any, function: str) -> Any:
+        """Reduce ``values`` (parallel to ``bids``) to one value per curve, in curve order."""
+        pa = self._pa
+        table = pa.table({_SEGMENT: self._segment, "value": values})
+        grouped = table.group_by(_SEGMENT, use_threads=False).aggregate([("value", function)])
+        grouped = grouped.sort_by(_SEGMENT)
+        # Curves have at least one bid, so every segment is present.
+        return grouped[f"value_{function}"]
+
+    def _stack(self, value_name: str, per_value: list[tuple[float, dict[str, Any]]]) -> Any:
+        """One row per curve and query value: the curve keys, ``value_name`` and the result columns."""
+        pa = self._pa
+        tables = []
+        for value, results in per_value:
+            columns = {key: self.curves[key] for key in self.keys}
+            columns[value_name] = pa.array([value] * len(self), pa.float64())
+            columns.update(results)
+            tables.append(pa.table(columns))
+        if not tables:
+            return pa.table({key: self.curves[key] for key in self.keys})
+        # Stable sort: curves keep their order and each curve's rows follow the query values.
+        order = sorted(range(len(tables)), key=lambda i: per_value[i][0])
+        stacked = pa.concat_tables([tables[i] for i in order])
+        curve = pa.concat_arrays([pa.array(range(len(self)), pa.int64())] * len(tables))
+        return stacked.take(self._pc.sort_indices(curve))
+
+    def clearing_prices(self, quantities: Sequence[float]) -> Any:
+        """The marginal price of every curve at each cumulative quantity.
+
+        The clearing price is the price of the first bid at which the running total reaches
+        the quantity; it is null where the curve offers less. The output has the curve
+        keys, ``requested_<quantity>``, ``clearing_price`` and ``available_<quantity>``
+        (the curve's total).
+        """
+        pa, pc = self._pa, self._pc
+        cumulative = self.bids[f"cumulative_{self.quantity}"]
+        positions = _positions(pa, pc, self.bids.num_rows)
+        total = self._per_curve(cumulative, "max")
+        per_value = []
+        for quantity in quantities:
+            marginal = self._per_curve(pc.if_else(pc.greater_equal(cumulative, quantity), positions, None), "min")
+            results = {"clearing_price": pc.take(self.bids["price"], marginal), f"available_{self.quantity}": total}
+            per_value.append((quantity, results))
+        return self._stack(f"requested_{self.quantity}", per_value)
+
+    def volumes_at_prices(self, prices: Sequence[float]) -> Any:
+        """The quantity every curve offers at or better than each price.
+
+        "Better" is cheaper for ascending curves and more expensive for descending
+        ones. The output has the curve keys, ``price_limit`` and ``<quantity>``.
+        """
+        pa, pc = self._pa, self._pc
+        amount = pc.cast(self.bids[self.quantity], pa.float64())
+        per_value = []
+        for price in prices:
+            # The sort key is the negated price on descending curves, so compare against the negated limit there.
+            within = pc.less_equal(self._order_key, pc.if_else(self._flip, -price, price))
+            per_value.append((price, {self.quantity: self._per_curve(pc.if_else(within, amount, 0.0), "sum")}))
+        return self._stack("price_limit", per_value)
+
+    def top(self, n: int) -> Any:
+        """The ``n`` best bids of every curve (all columns of ``bids``)."""
+        return self.bids.filter(self._pc.less_equal(self.bids["rank"], n))
+
+
+def merit_order_table(table: Any, config: EndpointConfig, query: MeritOrderQuery) -> Any:
+    """Answer ``query`` over a ``pyarrow.Table`` of flattened bid rows of ``config``.
+
+    Capacity bids are always ranked by ascending price; energy bids in the
+    ``down`` direction by descending price.
+    """
+    quantity = quantity_field(config)
+    descending = () if quantity == "capacity" else ("down",)
+    curves = MeritOrder(table, quantity=quantity, descending=descending)
+    if query.kind == "curve":
+        return curves.bids
+    if query.kind == "price-at":
+        return curves.clearing_prices(query.values)
+    if query.kind == "volume-at":
+        return curves.volumes_at_prices(query.values)
+    return curves.top(int(query.values[0]))
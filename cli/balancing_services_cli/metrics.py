@@ -0,0 +1,291 @@
+"""Request-level metrics for the generated API client, exportable as OpenMetrics text.
+
+``ClientMetrics`` keeps, per endpoint path, latency and response size histograms,
+status and error counters and an in-flight gauge. It is installed on a client
+through ``httpx_args`` and costs nothing when not installed::
+
+    metrics = ClientMetrics()
+    client = AuthenticatedClient(base_url=..., token=..., httpx_args=metrics.httpx_args())
+    ...
+    print(metrics.to_openmetrics())
+
+Latency is measured from sending the request until the last byte of the body has
+been read, and sizes count the bytes received on the wire (before decompression).
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DEFAULT_SIZE_BUCKETS = tuple(1024 * 4**i for i in range(10))  # 1 KiB .. 256 MiB
+
+_PREFIX = "bs_client"
+
+
+@dataclass(frozen=True)
+class RequestObservation:
+    """One completed request, as passed to ``ClientMetrics(on_observe=...)``.
+
+    Attributes:
+        method: HTTP method.
+        endpoint: URL path of the request.
+        status: response status, or None if the request failed before a response arrived.
+        seconds: time from sending the request to reading the last body byte (or failing).
+        bytes: body bytes received on the wire.
+        error: exception class name for failed requests.
+    """
+
+    method: str
+    endpoint: str
+    status: int | None
+    seconds: float
+    bytes: int
+    error: str | None = None
+
+
+@dataclass
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    bounds: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    sum: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * len(self.bounds)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        """Yield ``(le, cumulative count)`` pairs, ending with ``+Inf``."""
+        running = 0
+        for bound, n in zip(self.bounds, self.counts):
+            running += n
+            yield _format_number(bound), running
+        yield "+Inf", self.count
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class ClientMetrics:
+    """Thread-safe registry of per-endpoint request metrics.
+
+    Args:
+        latency_buckets: upper bounds of the latency histogram, in seconds.
+        size_buckets: upper bounds of the response size histogram, in bytes.
+        on_observe: optional callback invoked with a ``RequestObservation`` after every
+            request, e.g. to forward measurements to an existing metrics library.
+    """
+
+    def __init__(
+        self,
+        latency_buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+        size_buckets: tuple[float, ...] = DEFAULT_SIZE_BUCKETS,
+        on_observe: Callable[[RequestObservation], None] | None = None,
+    ) -> None:
+        self.on_observe = on_observe
+        self._lock = threading.Lock()
+        self._latency: defaultdict[str, Histogram] = defaultdict(lambda: Histogram(tuple(latency_buckets)))
+        self._size: defaultdict[str, Histogram] = defaultdict(lambda: Histogram(tuple(size_buckets)))
+        self._requests: Counter[tuple[str, str, str]] = Counter()
+        self._errors: Counter[tuple[str, str]] = Counter()
+        self._in_flight: Counter[str] = Counter()
+
+    def httpx_args(
+        self,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> dict[str, Any]:
+        """``httpx_args`` for ``Client``/``AuthenticatedClient`` that install the metrics transport."""
+        return {"transport": MetricsTransport(self, transport, async_transport)}
+
+    def started(self, endpoint: str) -> None:
+        with self._lock:
+            self._in_flight[endpoint] += 1
+
+    def observe(self, observation: RequestObservation) -> None:
+        """Record a finished request."""
+        endpoint = observation.endpoint
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+            self._latency[endpoint].observe(observation.seconds)
+            if observation.status is None:
+                self._errors[(endpoint, observation.error or "Exception")] += 1
+            else:
+                self._requests[(endpoint, observation.method, str(observation.status))] += 1
+                self._size[endpoint].observe(observation.bytes)
+        if self.on_observe is not None:
+            self.on_observe(observation)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Plain-data copy of all metrics, keyed like the OpenMetrics families."""
+        with self._lock:
+            return {
+                "requests": dict(self._requests),
+                "errors": dict(self._errors),
+                "in_flight": {k: v for k, v in self._in_flight.items() if v},
+                "latency": {k: (h.count, h.sum) for k, h in self._latency.items()},
+                "size": {k: (h.count, h.sum) for k, h in self._size.items()},
+            }
+
+    def to_openmetrics(self) -> str:
+        """Render all metrics in the OpenMetrics text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            lines.append(f"# TYPE {_PREFIX}_requests counter")
+            lines.append(f"# HELP {_PREFIX}_requests Completed requests by endpoint, method and status.")
+            for (endpoint, method, status), n in sorted(self._requests.items()):
+                lines.append(f"{_PREFIX}_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {n}")
+            lines.append(f"# TYPE {_PREFIX}_request_errors counter")
+            lines.append(f"# HELP {_PREFIX}_request_errors Requests that failed without a response.")
+            for (endpoint, error), n in sorted(self._errors.items()):
+                lines.append(f"{_PREFIX}_request_errors_total{_labels(endpoint=endpoint, error=error)} {n}")
+            lines.append(f"# TYPE {_PREFIX}_requests_in_flight gauge")
+            lines.append(f"# HELP {_PREFIX}_requests_in_flight Requests sent whose body has not been read yet.")
+            for endpoint, n in sorted(self._in_flight.items()):
+                lines.append(f"{_PREFIX}_requests_in_flight{_labels(endpoint=endpoint)} {n}")
+            for name, unit, help_text, histograms in (
+                ("request_duration_seconds", "seconds", "Time to the last response byte.", self._latency),
+                ("response_size_bytes", "bytes", "Response body bytes received.", self._size),
+            ):
+                family = f"{_PREFIX}_{name}"
+                lines.append(f"# TYPE {family} histogram")
+                lines.append(f"# UNIT {family} {unit}")
+                lines.append(f"# HELP {family} {help_text}")
+                for endpoint, histogram in sorted(histograms.items()):
+                    for le, n in histogram.cumulative():
+                        lines.append(f"{family}_bucket{_labels(endpoint=endpoint, le=le)} {n}")
+                    lines.append(f"{family}_count{_labels(endpoint=endpoint)} {histogram.count}")
+                    lines.append(f"{family}_sum{_labels(endpoint=endpoint)} {_format_number(histogram.sum)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class _ObservedStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Counts body bytes and reports the request to the metrics when the body is closed."""
+
+    def __init__(self, stream: Any, finish: Callable[[int], None]) -> None:
+        self._stream = stream
+        self._finish = finish
+        self._bytes = 0
+        self._done = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    def _complete(self) -> None:
+        if not self._done:
+            self._done = True
+            self._finish(self._bytes)
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._complete()
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._complete()
+
+
+class MetricsTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Wraps sync and async transports, feeding every request into a ``ClientMetrics``.
+
+    A transport is used rather than httpx event hooks because response hooks run
+    before the body is read and never see connection errors, so they can measure
+    neither the full latency and size nor keep the in-flight gauge accurate.
+    """
+
+    def __init__(
+        self,
+        metrics: ClientMetrics,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.metrics = metrics
+        self._transport = transport or httpx.HTTPTransport()
+        self._async_transport = async_transport or (
+            transport if isinstance(transport, httpx.AsyncBaseTransport) else httpx.AsyncHTTPTransport()
+        )
+
+    def _begin(self, request: httpx.Request) -> Callable[..., None]:
+        endpoint = request.url.path
+        self.metrics.started(endpoint)
+        started = time.perf_counter()
+
+        def finish(nbytes: int = 0, status: int | None = None, error: str | None = None) -> None:
+            self.metrics.observe(
+                RequestObservation(request.method, endpoint, status, time.perf_counter() - started, nbytes, error)
+            )
+
+        return finish
+
+    @staticmethod
+    def _observe(response: httpx.Response, finish: Callable[..., None]) -> httpx.Response:
+        status = response.status_code
+        if isinstance(response.stream, httpx.ByteStream):
+            # Body already in memory (e.g. from a replay transport): nothing left to wait for.
+            finish(len(response.content), status)
+        else:
+            response.stream = _ObservedStream(response.stream, lambda nbytes: finish(nbytes, status))
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        finish = self._begin(request)
+        try:
+            response = self._transport.handle_request(request)
+        except Exception as e:
+            finish(error=type(e).__name__)
+            raise
+        return self._observe(response, finish)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        finish = self._begin(request)
+        try:
+            response = await self._async_transport.handle_async_request(request)
+        except Exception as e:
+            finish(error=type(e).__name__)
+            raise
+        return self._observe(response, finish)
+
+    def close(self) -> None:
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
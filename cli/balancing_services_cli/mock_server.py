@@ -0,0 +1,331 @@
+"""Self-contained mock of the Balancing Services REST API for load and performance testing.
+
+Serves all API paths with synthetic, schema-valid data (see ``synthetic``), real
+cursor pagination for the bids endpoints, injected latency and random 429/5xx
+responses. Responses are deterministic for a given query, so paginating through
+a result set yields a consistent view; they carry ``ETag`` and ``Last-Modified``
+validators and conditional requests are answered with ``304 Not Modified``.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from balancing_services.models import Area, ReserveType
+from dateutil.parser import isoparse
+
+from balancing_services_cli.synthetic import ENDPOINTS, SyntheticEndpoint, generate_groups
+
+log = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+_AREAS = {a.value for a in Area}
+_RESERVE_TYPES = {r.value for r in ReserveType}
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Distribution of injected response latency.
+
+    Attributes:
+        distribution: "fixed" (always ``ms``), "uniform" (``ms`` ± ``spread_ms``) or
+            "lognormal" (median ``ms``, heavy right tail growing with ``spread_ms``).
+        ms: typical latency in milliseconds.
+        spread_ms: spread around ``ms`` in milliseconds.
+    """
+
+    distribution: str = "fixed"
+    ms: float = 0.0
+    spread_ms: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency, in seconds."""
+        if self.ms <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            value = rng.uniform(self.ms - self.spread_ms, self.ms + self.spread_ms)
+        elif self.distribution == "lognormal":
+            value = rng.lognormvariate(math.log(self.ms), self.spread_ms / self.ms)
+        else:
+            value = self.ms
+        return max(0.0, value) / 1000
+
+
+@dataclass
+class MockServerConfig:
+    """Behaviour of the mock server.
+
+    Attributes:
+        groups: data[] groups per response; each covers every period of the queried window.
+        latency: latency injected before every response.
+        rate_429: probability of answering with 429 Too Many Requests.
+        rate_5xx: probability of answering with 500 Internal Server Error.
+        retry_after: value of the Retry-After header on 429 responses, in seconds.
+        token: if set, requests must carry ``Authorization: Bearer <token>``.
+        seed: seed for latency and error injection.
+        validators: send ETag/Last-Modified headers and answer matching conditional requests with 304.
+    """
+
+    groups: int = 4
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: int = 1
+    token: str | None = None
+    seed: int | None = None
+    validators: bool = True
+
+
+class _ProblemError(Exception):
+    def __init__(self, status: int, type_: str, title: str, detail: str) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.body = {"type": type_, "title": title, "status": status, "detail": detail}
+
+
+def _invalid(name: str) -> _ProblemError:
+    return _ProblemError(400, "invalid-parameter", "Invalid Parameter", f"The {name} parameter value is not valid")
+
+
+def _encode_cursor(offset: int) -> str:
+    return "v1:" + base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        if not cursor.startswith("v1:"):
+            raise ValueError(cursor)
+        return int(base64.urlsafe_b64decode(cursor[3:].encode()).decode())
+    except (ValueError, binascii.Error):
+        raise _invalid("cursor")
+
+
+def _required(params: dict[str, list[str]], name: str) -> str:
+    values = params.get(name)
+    if not values or not values[0]:
+        raise _ProblemError(400, "missing-parameter", "Missing Parameter", f"Required parameter '{name}' is missing")
+    return values[0]
+
+
+def _parse_datetime(params: dict[str, list[str]], name: str) -> datetime:
+    value = _required(params, name)
+    try:
+        return isoparse(value)
+    except ValueError:
+        raise _invalid(name)
+
+
+@lru_cache(maxsize=64)
+def _cached_groups(
+    endpoint_name: str, area: str, reserve_type: str | None, start: datetime, end: datetime, n_groups: int
+) -> tuple[dict[str, Any], ...]:
+    seed = zlib.crc32(f"{endpoint_name}|{area}|{reserve_type}|{start.isoformat()}|{end.isoformat()}".encode())
+    endpoint = ENDPOINTS[endpoint_name]
+    groups = generate_groups(endpoint, start=start, end=end, n_groups=n_groups, area=area, seed=seed)
+    if reserve_type is not None:
+        for group in groups:
+            group["reserveType"] = reserve_type
+    return tuple(groups)
+
+
+def _paginate(
+    endpoint: SyntheticEndpoint, groups: tuple[dict[str, Any], ...], offset: int, limit: int
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Slice the result set's items ``[offset, offset + limit)``, keeping their group metadata."""
+    items_field = endpoint.items_field
+    page: list[dict[str, Any]] = []
+    position = 0
+    stop = offset + limit
+    total = 0
+    for group in groups:
+        items = group[items_field]
+        total += len(items)
+        lo, hi = max(offset - position, 0), min(stop - position, len(items))
+        if lo < hi:
+            page.append({**group, items_field: items[lo:hi]})
+        position += len(items)
+    return page, stop if stop < total else None
+
+
+class MockApiServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering API requests according to a ``MockServerConfig``."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: MockServerConfig) -> None:
+        super().__init__(address, _MockApiHandler)
+        self.config = config
+        self.stats: Counter[tuple[str, int]] = Counter()
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        # Synthetic data never changes while the server runs, so its start is the modification time of everything.
+        self.last_modified = int(time.time())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> tuple[float, float]:
+        """Draw (latency seconds, error roll) for one request."""
+        with self._lock:
+            return self.config.latency.sample(self._rng), self._rng.random()
+
+    def record(self, path: str, status: int) -> None:
+        with self._lock:
+            self.stats[(path, status)] += 1
+
+    def respond(self, path: str, query: str, headers: Any) -> tuple[int, dict[str, str], dict[str, Any]]:
+        """Compute (status, extra headers, JSON body) for one GET request."""
+        config = self.config
+        try:
+            endpoint = next((e for e in ENDPOINTS.values() if path.endswith(e.path)), None)
+            if endpoint is None:
+                raise _ProblemError(404, "not-found", "Not Found", "The requested resource was not found")
+            if config.token and headers.get("Authorization") != f"Bearer {config.token}":
+                raise _ProblemError(401, "unauthorized", "Unauthorized", "Valid API token required")
+
+            latency, roll = self.draw()
+            if latency:
+                time.sleep(latency)
+            if roll < config.rate_429:
+                error = _ProblemError(
+                    429, "rate-limited", "Rate Limited", "Request limit exceeded. Please try again later"
+                )
+                return error.status, {"Retry-After": str(config.retry_after)}, error.body
+            if roll < config.rate_429 + config.rate_5xx:
+                raise _ProblemError(
+                    500,
+                    "internal-error",
+                    "Internal Server Error",
+                    "An unexpected error occurred while processing the request",
+                )
+
+            params = parse_qs(query)
+            area = _required(params, "area")
+            if area not in _AREAS:
+                raise _invalid("area")
+            start = _parse_datetime(params, "period-start-at")
+            end = _parse_datetime(params, "period-end-at")
+            if end <= start:
+                raise _invalid("period-end-at")
+            reserve_type = None
+            if endpoint.path.startswith("/balancing/"):
+                reserve_type = _required(params, "reserve-type")
+                if reserve_type not in _RESERVE_TYPES:
+                    raise _invalid("reserve-type")
+
+            groups = _cached_groups(endpoint.name, area, reserve_type, start, end, config.groups)
+            body: dict[str, Any] = {
+                "queriedPeriod": {"startAt": params["period-start-at"][0], "endAt": params["period-end-at"][0]},
+                "hasMore": False,
+                "nextCursor": None,
+            }
+            if endpoint.paginated:
+                offset = _decode_cursor(params["cursor"][0]) if params.get("cursor") else 0
+                try:
+                    limit = int(params.get("limit", [DEFAULT_LIMIT])[0])
+                except ValueError:
+                    limit = 0
+                if not 1 <= limit <= MAX_LIMIT:
+                    raise _invalid("limit")
+                data, next_offset = _paginate(endpoint, groups, offset, limit)
+                if next_offset is not None:
+                    body["hasMore"] = True
+                    body["nextCursor"] = _encode_cursor(next_offset)
+            else:
+                data = list(groups)
+            body["data"] = data
+            return 200, {}, body
+        except _ProblemError as error:
+            return error.status, {}, error.body
+
+
+class _MockApiHandler(BaseHTTPRequestHandler):
+    server: MockApiServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 - name required by BaseHTTPRequestHandler
+        parts = urlsplit(self.path)
+        status, headers, body = self.server.respond(parts.path, parts.query, self.headers)
+        payload = json.dumps(body).encode()
+        if status == 200 and self.server.config.validators:
+            etag = '"' + hashlib.blake2b(payload, digest_size=8).hexdigest() + '"'
+            headers = {**headers, "ETag": etag, "Last-Modified": formatdate(self.server.last_modified, usegmt=True)}
+            if self._not_modified(etag):
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.server.record(parts.path, 304)
+                return
+        self.send_response(status)
+        content_type = "application/json" if status == 200 else "application/problem+json"
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.record(parts.path, status)
+
+    def _not_modified(self, etag: str) -> bool:
+        """Whether the request's validators match the current representation."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.server.last_modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(config: MockServerConfig, host: str = "127.0.0.1", port: int = 0) -> MockApiServer:
+    """Create (but do not start) a mock server; ``port=0`` picks a free port."""
+    return MockApiServer((host, port), config)
+
+
+@contextmanager
+def running_server(
+    config: MockServerConfig | None = None, host: str = "127.0.0.1", port: int = 0
+) -> Iterator[MockApiServer]:
+    """Run a mock server on a background thread for the duration of a ``with`` block, e.g. in tests."""
+    server = make_server(config or MockServerConfig(), host, port)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,125 @@
+"""Decode and flatten paginated responses in worker processes.
+
+For large bids exports a single core becomes the bottleneck on JSON decoding,
+``from_dict`` and flattening. ``fetch_all_pages_to_arrow`` keeps the main
+process busy with network I/O only: it sends each raw page body to a process
+pool, where it is decoded, parsed, flattened and returned as an Arrow IPC
+stream buffer (one contiguous byte string instead of a pickled object graph).
+The cursor of the next page is read from the raw body without decoding it, so
+requests are not held up by parsing.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import re
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from types import ModuleType
+from typing import Any
+
+from balancing_services.types import UNSET
+
+from balancing_services_cli.flatten import EndpointConfig, iter_rows
+from balancing_services_cli.output import endpoint_schema, format_api_error, require_pyarrow
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only when orjson is absent
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+# Top-level pagination fields; item fields never use these names, and quotes inside
+# JSON strings are escaped, so a match can only be the top-level key.
+_HAS_MORE = re.compile(rb'"hasMore"\s*:\s*(true|false)')
+_NEXT_CURSOR = re.compile(rb'"nextCursor"\s*:\s*(null|"((?:[^"\\]|\\.)*)")')
+
+
+def read_pagination(body: bytes) -> tuple[bool, str | None]:
+    """Extract ``(hasMore, nextCursor)`` from a raw page body, decoding it fully only as a fallback."""
+    has_more = _HAS_MORE.search(body)
+    cursor = _NEXT_CURSOR.search(body)
+    if has_more is None or cursor is None:
+        decoded = json.loads(body)
+        return bool(decoded.get("hasMore")), decoded.get("nextCursor")
+    next_cursor = None if cursor.group(2) is None else json.loads(cursor.group(1))
+    return has_more.group(1) == b"true", next_cursor
+
+
+def decode_page(body: bytes, response_model: type, config: EndpointConfig) -> tuple[bytes, int]:
+    """Decode, parse and flatten one page into an Arrow IPC stream; runs in a worker process.
+
+    Returns:
+        The IPC stream bytes (empty if the page has no rows) and the number of rows.
+    """
+    import pyarrow as pa
+
+    decoded = orjson.loads(body) if orjson is not None else json.loads(body)
+    parsed = response_model.from_dict(decoded)
+    rows = list(iter_rows(parsed.data, config))
+    if not rows:
+        return b"", 0
+    # The generated models keep whole numbers as ints, so types are taken from the fields,
+    # not inferred per page; every page then has the schema of the sequential path.
+    batch = pa.RecordBatch.from_pylist(rows, schema=endpoint_schema(pa, config))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes(), len(rows)
+
+
+def _iter_pages(endpoint: ModuleType, client: Any, kwargs: dict[str, Any]) -> Iterator[bytes]:
+    """Yield raw 200 page bodies, following cursors; exit with the API error on any other status."""
+    http = client.get_httpx_client()
+    cursor: str | Any = kwargs.pop("cursor", UNSET)
+    page = 1
+    while True:
+        log.debug("Fetching page %d...", page)
+        response = http.request(**endpoint._get_kwargs(cursor=cursor, **kwargs))
+        if response.status_code != 200:
+            raise SystemExit(format_api_error(endpoint._build_response(client=client, response=response)))
+        body = response.content
+        yield body
+        has_more, next_cursor = read_pagination(body)
+        if not has_more or not next_cursor:
+            log.debug("Fetched %d page(s)", page)
+            return
+        cursor = next_cursor
+        page += 1
+
+
+def fetch_all_pages_to_arrow(
+    endpoint: ModuleType, response_model: type, config: EndpointConfig, workers: int, **kwargs: Any
+) -> Any:
+    """Fetch every page of a paginated endpoint and flatten it in ``workers`` processes.
+
+    Args:
+        endpoint: generated endpoint module (e.g. ``get_balancing_energy_bids``).
+        response_model: model class of the endpoint's 200 response.
+        config: flattening configuration of the endpoint.
+        workers: number of worker processes.
+        **kwargs: ``client`` and the endpoint's query arguments.
+
+    Returns:
+        A ``pyarrow.Table`` with the rows of all pages in page order.
+    """
+    pa = require_pyarrow("--workers")
+    client = kwargs.pop("client")
+    # Spawned workers do not inherit locks held by other threads of this process.
+    context = multiprocessing.get_context("spawn")
+    futures: list[Future[tuple[bytes, int]]] = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for body in _iter_pages(endpoint, client, kwargs):
+            futures.append(pool.submit(decode_page, body, response_model, config))
+        tables = []
+        for future in futures:
+            buffer, n_rows = future.result()
+            if n_rows:
+                tables.append(pa.ipc.open_stream(buffer).read_all())
+    log.debug("Decoded %d page(s) into %d row(s)", len(futures), sum(t.num_rows for t in tables))
+    if not tables:
+        return pa.table({})
+    return pa.concat_tables(tables)
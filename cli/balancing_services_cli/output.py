@@ -1,17 +1,51 @@
-"""Write flattened rows to CSV or Parquet."""
+"""Write flattened rows to CSV, JSON, JSON Lines, Parquet, Arrow IPC or a SQLite/DuckDB database."""
 
 from __future__ import annotations
 
 import csv
-import io
+import itertools
+import json
 import logging
+import sqlite3
 import sys
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import IO, Any
 
 from balancing_services.models import Problem
 
+from balancing_services_cli.flatten import EndpointConfig, column_type, iter_rows
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only when orjson is absent
+    orjson = None
+
 log = logging.getLogger(__name__)
 
+JSON_FORMATS = ("json", "jsonl")
+
+DATABASE_FORMATS = ("sqlite", "duckdb")
+
+# Formats to which successive batches of rows can be appended.
+APPEND_FORMATS = ("csv", "jsonl", *DATABASE_FORMATS)
+
+ARROW_BATCH_SIZE = 65_536
+
+_EXTENSION_FORMATS = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".arrows": "arrow-stream",
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".db": "sqlite",
+    ".duckdb": "duckdb",
+}
+
 
 def format_api_error(response: Any) -> str:
     """Format a user-friendly error message from an API error response."""
@@ -26,46 +60,257 @@ def detect_format(output: str | None, fmt: str | None) -> str:
     """Determine the output format from explicit flag or file extension."""
     if fmt:
         return fmt
-    if output and output.endswith(".parquet"):
-        return "parquet"
+    if output:
+        for extension, resolved in _EXTENSION_FORMATS.items():
+            if output.endswith(extension):
+                return resolved
     return "csv"
 
 
-def write_rows(rows: list[dict[str, Any]], output: str | None, fmt: str | None) -> None:
-    """Write rows to the appropriate destination and format."""
+def write_response(data: list[Any], config: EndpointConfig, options: dict[str, Any]) -> None:
+    """Write API data groups using the CLI's global output options.
+
+    Groups are flattened lazily into rows, or written as the API's nested
+    structure when the ``nested`` option is set (JSON formats only). With
+    ``--profile``, flattening and writing are timed as separate stages.
+    """
+    profiler = options.get("profiler")
+    if profiler is None:
+        _write_response(iter_rows(data, config), data, config, options)
+        return
+    profiler.finish_fetch()
+    with profiler.stage("write", options["output"]):
+        _write_response(profiler.timed(iter_rows(data, config), "flatten"), data, config, options)
+
+
+def write_table(table: Any, config: EndpointConfig, options: dict[str, Any]) -> None:
+    """Write a ``pyarrow.Table`` of flattened rows using the CLI's global output options.
+
+    Parquet and Arrow IPC outputs are written from the table directly; other
+    formats and partitioned datasets consume its rows.
+    """
+    if options.get("nested"):
+        raise SystemExit("Nested output is not available for rows decoded by --workers.")
+    profiler = options.get("profiler")
+    if profiler is None:
+        _write_table(table, config, options)
+        return
+    profiler.finish_fetch()
+    with profiler.stage("write", options["output"]):
+        _write_table(table, config, options)
+
+
+def _write_table(table: Any, config: EndpointConfig, options: dict[str, Any]) -> None:
+    output = options["output"]
+    resolved = detect_format(output, options["fmt"])
+    merit_order = options.get("merit_order")
+    if merit_order is not None:
+        from balancing_services_cli.merit_order import merit_order_table
+
+        if resolved in DATABASE_FORMATS:
+            raise SystemExit(f"Merit-order rows cannot be written to {resolved} output.")
+        table = merit_order_table(table, config, merit_order)
+        log.debug("Built merit order: %d row(s)", table.num_rows)
+        options = {**options, "merit_order": None}
+    aggregation = options.get("aggregation")
+    if aggregation is not None:
+        from balancing_services_cli.aggregate import aggregate_table
+
+        if resolved in DATABASE_FORMATS:
+            raise SystemExit(f"Aggregated rows cannot be written to {resolved} output.")
+        table = aggregate_table(table, config, aggregation)
+        log.debug("Aggregated into %d row(s)", table.num_rows)
+        options = {**options, "aggregation": None}
+    if options.get("partition_by") or resolved not in ("parquet", "arrow", "arrow-stream"):
+        rows = (row for batch in table.to_batches(ARROW_BATCH_SIZE) for row in batch.to_pylist())
+        _write_response(rows, [], config, options)
+        return
+    log.debug("Writing table as %s to %s", resolved, output or "stdout")
+    if table.num_rows == 0:
+        count = 0
+    elif resolved == "parquet":
+        count = _write_parquet_table(table, output)
+    else:
+        pa = require_pyarrow("Arrow")
+        stream = resolved == "arrow-stream"
+        if not stream and not output:
+            raise SystemExit("Arrow IPC file output requires a file path. Use --output/-o or --format arrow-stream.")
+        count = _write_arrow_batches(pa, table.to_batches(ARROW_BATCH_SIZE), table.schema, output, stream)
+    log.debug("Wrote %d row(s)", count)
+
+
+def _write_response(
+    rows: Iterable[dict[str, Any]], data: list[Any], config: EndpointConfig, options: dict[str, Any]
+) -> None:
+    if options.get("aggregation") is not None or options.get("merit_order") is not None:
+        if options.get("nested"):
+            raise SystemExit("--nested cannot be combined with --resample, --group-by, --agg or --merit-order.")
+        pa = require_pyarrow("--merit-order" if options.get("aggregation") is None else "--resample/--group-by")
+        _write_table(pa.Table.from_pylist(list(rows)), config, options)
+    elif options.get("nested"):
+        write_groups(data, options["output"], options["fmt"])
+    elif options.get("partition_by"):
+        from balancing_services_cli.dataset import write_dataset
+
+        if options["fmt"] not in (None, "parquet"):
+            raise SystemExit("--partition-by is only supported for Parquet output.")
+        count = write_dataset(rows, options["output"], options["partition_by"])
+        log.debug("Wrote %d row(s)", count)
+    else:
+        write_rows(rows, options["output"], options["fmt"], config)
+
+
+def write_batches(batches: Iterable[list[dict[str, Any]]], config: EndpointConfig, options: dict[str, Any]) -> None:
+    """Write batches of rows as they arrive (e.g. from ``follow_rows``), appending each to the output.
+
+    The first non-empty batch replaces a CSV or JSON Lines file; later ones are appended
+    without repeating the CSV header. Database formats upsert every batch.
+    """
+    if options.get("nested") or options.get("partition_by") or options.get("aggregation") is not None:
+        raise SystemExit("--nested, --partition-by and aggregation cannot be used when following an endpoint.")
+    resolved = detect_format(options["output"], options["fmt"])
+    if resolved not in APPEND_FORMATS:
+        raise SystemExit(f"Following an endpoint requires one of these output formats: {', '.join(APPEND_FORMATS)}.")
+    append = False
+    for rows in batches:
+        if not rows:
+            continue
+        write_rows(rows, options["output"], resolved, config, append=append)
+        sys.stdout.flush()
+        append = True
+
+
+def write_rows(
+    rows: Iterable[dict[str, Any]],
+    output: str | None,
+    fmt: str | None,
+    config: EndpointConfig | None = None,
+    append: bool = False,
+) -> None:
+    """Write rows to the appropriate destination and format.
+
+    Rows may be any iterable; CSV, JSON and database formats consume it one row at a time.
+    Database formats need the endpoint ``config`` to name and key the target table.
+    With ``append``, CSV and JSON Lines rows are added to an existing output (CSV without
+    a header); database formats always upsert.
+    """
     resolved = detect_format(output, fmt)
     dest = output or "stdout"
-    log.debug("Writing %d row(s) as %s to %s", len(rows), resolved, dest)
-    if resolved == "parquet":
-        _write_parquet(rows, output)
+    if append and resolved not in APPEND_FORMATS:
+        raise SystemExit(f"Cannot append to {resolved} output.")
+    log.debug("Writing rows as %s to %s", resolved, dest)
+    if resolved in DATABASE_FORMATS:
+        count = _write_database(rows, output, config, resolved)
+    elif resolved == "parquet":
+        count = _write_parquet(rows, output)
+    elif resolved == "arrow":
+        count = _write_arrow(rows, output, stream=False)
+    elif resolved == "arrow-stream":
+        count = _write_arrow(rows, output, stream=True)
+    elif resolved == "json":
+        count = _write_json_array(rows, output)
+    elif resolved == "jsonl":
+        count = _write_json_lines(rows, output, append)
     else:
-        _write_csv(rows, output)
+        count = _write_csv(rows, output, append)
+    log.debug("Wrote %d row(s)", count)
 
 
-def _write_csv(rows: list[dict[str, Any]], output: str | None) -> None:
-    if not rows:
+def write_groups(data: Iterable[Any], output: str | None, fmt: str | None) -> None:
+    """Write API data groups in their original nested JSON structure."""
+    resolved = detect_format(output, fmt)
+    if resolved not in JSON_FORMATS:
+        raise SystemExit(f"Nested output is only supported for JSON formats ({', '.join(JSON_FORMATS)}).")
+    dest = output or "stdout"
+    log.debug("Writing nested groups as %s to %s", resolved, dest)
+    groups = (group.to_dict() for group in data)
+    if resolved == "json":
+        count = _write_json_array(groups, output)
+    else:
+        count = _write_json_lines(groups, output)
+    log.debug("Wrote %d group(s)", count)
+
+
+@contextmanager
+def open_binary(output: str | None, append: bool = False) -> Iterator[IO[bytes]]:
+    """Open ``output`` for binary writing, falling back to the binary layer of stdout."""
+    if output:
+        with open(output, "ab" if append else "wb") as f:
+            yield f
         return
-    fieldnames = list(rows[0].keys())
+    sys.stdout.flush()
+    buffer = sys.stdout.buffer
+    yield buffer
+    buffer.flush()
+
+
+def _json_default(obj: Any) -> Any:
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _make_json_encoder() -> Callable[[Any], bytes]:
+    if orjson is not None:
+        return lambda obj: orjson.dumps(obj, default=_json_default)
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_json_default)
+    return lambda obj: encoder.encode(obj).encode()
+
+
+def _write_json_lines(records: Iterable[Any], output: str | None, append: bool = False) -> int:
+    encode = _make_json_encoder()
+    count = 0
+    with open_binary(output, append) as f:
+        for record in records:
+            f.write(encode(record))
+            f.write(b"\n")
+            count += 1
+    return count
+
+
+def _write_json_array(records: Iterable[Any], output: str | None) -> int:
+    encode = _make_json_encoder()
+    count = 0
+    with open_binary(output) as f:
+        f.write(b"[")
+        for record in records:
+            f.write(b",\n" if count else b"\n")
+            f.write(encode(record))
+            count += 1
+        f.write(b"\n]\n" if count else b"]\n")
+    return count
+
+
+def _write_csv(rows: Iterable[dict[str, Any]], output: str | None, append: bool = False) -> int:
+    it = iter(rows)
+    first = next(it, None)
+    if first is None:
+        return 0
+    fieldnames = list(first.keys())
+    count = 0
     if output:
-        with open(output, "w", newline="") as f:
+        with open(output, "a" if append else "w", newline="") as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
+            if not append:
+                writer.writeheader()
+            for row in itertools.chain((first,), it):
+                writer.writerow(row)
+                count += 1
     else:
-        buf = io.StringIO()
-        writer = csv.DictWriter(buf, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-        sys.stdout.write(buf.getvalue())
+        writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames)
+        if not append:
+            writer.writeheader()
+        for row in itertools.chain((first,), it):
+            writer.writerow(row)
+            count += 1
+    return count
 
 
-def _write_parquet(rows: list[dict[str, Any]], output: str | None) -> None:
+def require_pyarrow(feature: str) -> Any:
+    """Import and return ``pyarrow``, exiting with install instructions if it is missing."""
     try:
         import pyarrow as pa
-        import pyarrow.parquet as pq
     except ImportError:
         raise SystemExit(
-            "Parquet support requires the 'pyarrow' package.\n"
+            f"{feature} support requires the 'pyarrow' package.\n"
             "\n"
             "Install it with:\n"
             "  pip install balancing-services-cli[parquet]\n"
@@ -73,10 +318,176 @@ def _write_parquet(rows: list[dict[str, Any]], output: str | None) -> None:
             "Or, if using uv:\n"
             "  uv add balancing-services-cli[parquet]"
         )
+    return pa
+
+
+def arrow_schema(pa: Any, inferred: Any) -> Any:
+    """``inferred`` with API number and flag columns typed from their field and other all-null columns as strings.
+
+    A schema inferred from the first rows types a column that is None in all of them
+    (e.g. ``procured_at``) as ``null``, which later non-null values cannot be converted to.
+    """
+    types = {float: pa.float64(), bool: pa.bool_()}
+    fields = []
+    for field in inferred:
+        if (kind := column_type(field.name)) is not None:
+            field = field.with_type(types[kind])
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
 
+def endpoint_schema(pa: Any, config: EndpointConfig) -> Any:
+    """Arrow schema of ``config``'s flattened rows, typed from the fields alone (see ``arrow_schema``)."""
+    return arrow_schema(pa, pa.schema([(column, pa.null()) for column in config.columns]))
+
+
+def _write_parquet(rows: Iterable[dict[str, Any]], output: str | None) -> int:
+    pa = require_pyarrow("Parquet")
+
+    rows = list(rows)
     if not rows:
-        return
+        return 0
+    table = pa.Table.from_pylist(rows)
+    return _write_parquet_table(table.cast(arrow_schema(pa, table.schema)), output)
+
+
+def _write_parquet_table(table: Any, output: str | None) -> int:
+    import pyarrow.parquet as pq
+
     if not output:
         raise SystemExit("Parquet output requires a file path. Use --output/-o to specify a file.")
-    table = pa.Table.from_pylist(rows)
     pq.write_table(table, output)
+    return table.num_rows
+
+
+def _write_arrow(rows: Iterable[dict[str, Any]], output: str | None, stream: bool) -> int:
+    """Write rows as Arrow IPC, converting and flushing one record batch at a time.
+
+    The IPC file format (``.arrow``/``.feather``) needs a file path; the IPC stream
+    format may go to stdout so readers can consume batches as they arrive.
+    """
+    pa = require_pyarrow("Arrow")
+    if not stream and not output:
+        raise SystemExit("Arrow IPC file output requires a file path. Use --output/-o or --format arrow-stream.")
+
+    it = iter(rows)
+    first = list(itertools.islice(it, ARROW_BATCH_SIZE))
+    if not first:
+        return 0
+    schema = arrow_schema(pa, pa.RecordBatch.from_pylist(first).schema)
+
+    def batches() -> Iterator[Any]:
+        yield pa.RecordBatch.from_pylist(first, schema=schema)
+        while chunk := list(itertools.islice(it, ARROW_BATCH_SIZE)):
+            yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+    return _write_arrow_batches(pa, batches(), schema, output, stream)
+
+
+def _write_arrow_batches(pa: Any, batches: Iterable[Any], schema: Any, output: str | None, stream: bool) -> int:
+    count = 0
+    with open_binary(output) as sink:
+        new_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+        with new_writer(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                if stream:
+                    sink.flush()
+                count += batch.num_rows
+    return count
+
+
+def _sql_type(column: str) -> str:
+    return {float: "DOUBLE", bool: "BOOLEAN"}.get(column_type(column), "VARCHAR")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _write_database(
+    rows: Iterable[dict[str, Any]], output: str | None, config: EndpointConfig | None, dialect: str
+) -> int:
+    """Upsert rows into a per-endpoint table of a SQLite or DuckDB database file.
+
+    Rows are bulk-loaded into a temporary staging table indexed on the natural key
+    (``executemany`` for SQLite, Arrow record batches for DuckDB). Inside the same transaction, existing rows that
+    share a natural key (group fields + ``periodStartAt``) with any staged row are
+    deleted and the staged rows inserted, so re-fetched revisions replace old values.
+    Replacing by key rather than ``ON CONFLICT`` keeps every bid of a period and
+    treats NULL key values (e.g. missing ``procured_at``) as equal.
+    """
+    if not output:
+        raise SystemExit(f"{dialect} output requires a file path. Use --output/-o to specify a file.")
+    if config is None:
+        raise SystemExit(f"{dialect} output is only supported for endpoint commands.")
+
+    it = iter(rows)
+    first = next(it, None)
+    if first is None:
+        return 0
+    rows = itertools.chain((first,), it)
+
+    columns = config.columns
+    table = _quote(config.name)
+    column_list = ", ".join(_quote(c) for c in columns)
+    column_defs = ", ".join(f"{_quote(c)} {_sql_type(c)}" for c in columns)
+    key_list = ", ".join(_quote(c) for c in config.key_columns)
+    null_safe_eq = "IS" if dialect == "sqlite" else "IS NOT DISTINCT FROM"
+    key_match = " AND ".join(f"t.{_quote(c)} {null_safe_eq} s.{_quote(c)}" for c in config.key_columns)
+
+    if dialect == "duckdb":
+        try:
+            import duckdb
+        except ImportError:
+            raise SystemExit(
+                "DuckDB output requires the 'duckdb' package.\n"
+                "\n"
+                "Install it with:\n"
+                "  pip install balancing-services-cli[duckdb]"
+            )
+        pa = require_pyarrow("DuckDB")
+        schema = endpoint_schema(pa, config)
+        con = duckdb.connect(output)
+    else:
+        con = sqlite3.connect(output, isolation_level=None)
+
+    count = 0
+    started = False
+    try:
+        con.execute("BEGIN TRANSACTION")
+        started = True
+        con.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs})")
+        con.execute(f"CREATE INDEX IF NOT EXISTS {_quote(config.name + '_key')} ON {table} ({key_list})")
+        con.execute(f"CREATE TEMP TABLE _bs_staging AS SELECT {column_list} FROM {table} LIMIT 0")
+        # The key lookups below run against the staging table, once per row of the target table.
+        con.execute(f"CREATE INDEX _bs_staging_key ON _bs_staging ({key_list})")
+        if dialect == "duckdb":
+            while True:
+                chunk = list(itertools.islice(rows, ARROW_BATCH_SIZE))
+                if not chunk:
+                    break
+                con.register("_bs_batch", pa.RecordBatch.from_pylist(chunk, schema=schema))
+                con.execute(f"INSERT INTO _bs_staging SELECT {column_list} FROM _bs_batch")
+                con.unregister("_bs_batch")
+                count += len(chunk)
+        else:
+            placeholders = ", ".join("?" for _ in columns)
+            cursor = con.executemany(
+                f"INSERT INTO _bs_staging ({column_list}) VALUES ({placeholders})",
+                (tuple(row.get(c) for c in columns) for row in rows),
+            )
+            count = cursor.rowcount
+        con.execute(f"DELETE FROM {table} AS t WHERE EXISTS (SELECT 1 FROM _bs_staging AS s WHERE {key_match})")
+        con.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM _bs_staging")
+        con.execute("DROP TABLE _bs_staging")
+        con.execute("COMMIT")
+    except BaseException:
+        if started:
+            con.execute("ROLLBACK")
+        raise
+    finally:
+        con.close()
+    return count
@@ -2,32 +2,37 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from collections.abc import Callable
+import os
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from enum import Enum
 from typing import Any
 
-from balancing_services_cli.output import format_api_error
+from balancing_services_cli.flatten import EndpointConfig, iter_rows
+from balancing_services_cli.output import detect_format, format_api_error, write_rows
 
 log = logging.getLogger(__name__)
 
+# Formats whose files can be truncated to a committed size and appended to.
+RESUMABLE_FORMATS = ("csv", "jsonl")
 
-def fetch_all_pages(
+
+def iter_pages(
     fetch_fn: Callable[..., Any],
+    cursor: str | None = None,
+    page: int = 1,
     **kwargs: Any,
-) -> list[Any]:
-    """Fetch all pages from a paginated endpoint, collecting data items.
+) -> Iterator[tuple[int, Any]]:
+    """Yield ``(page_number, parsed_response)`` for every page of a paginated endpoint.
 
     Args:
         fetch_fn: The sync_detailed function to call (e.g. get_balancing_energy_bids.sync_detailed).
+        cursor: Cursor of the first page to fetch; None starts at the beginning.
+        page: Number of the first page fetched, for logging and checkpoints.
         **kwargs: Arguments forwarded to fetch_fn (client, area, period_start_at, etc.).
-
-    Returns:
-        Combined list of all data items across pages.
     """
-    all_data: list[Any] = []
-    cursor = None
-    page = 1
-
     while True:
         if cursor is not None:
             kwargs["cursor"] = cursor
@@ -38,17 +43,34 @@ def fetch_all_pages(
             raise SystemExit(format_api_error(response))
 
         parsed = response.parsed
-        all_data.extend(parsed.data)
         log.debug("Page %d: got %d group(s), has_more=%s", page, len(parsed.data), parsed.has_more)
+        yield page, parsed
 
         if not parsed.has_more:
-            break
-
+            return
         cursor = parsed.next_cursor
         if not cursor:
-            break
+            return
         page += 1
 
+
+def fetch_all_pages(
+    fetch_fn: Callable[..., Any],
+    **kwargs: Any,
+) -> list[Any]:
+    """Fetch all pages from a paginated endpoint, collecting data items.
+
+    Args:
+        fetch_fn: The sync_detailed function to call (e.g. get_balancing_energy_bids.sync_detailed).
+        **kwargs: Arguments forwarded to fetch_fn (client, area, period_start_at, etc.).
+
+    Returns:
+        Combined list of all data items across pages.
+    """
+    all_data: list[Any] = []
+    page = 0
+    for page, parsed in iter_pages(fetch_fn, **kwargs):
+        all_data.extend(parsed.data)
     log.debug("Fetched %d page(s), %d total group(s)", page, len(all_data))
     return all_data
 
@@ -74,3 +96,108 @@ def fetch_first_page(
 
     log.debug("First page: got %d group(s), has_more=%s", len(response.parsed.data), response.parsed.has_more)
     return response.parsed.data
+
+
+def checkpoint_path(output: str) -> str:
+    """Path of the checkpoint file kept next to a resumable export's ``output``."""
+    return output + ".checkpoint.json"
+
+
+def _request_params(config: EndpointConfig, fmt: str, kwargs: dict[str, Any]) -> dict[str, str]:
+    """JSON-serializable identity of an export: endpoint, output format and query arguments."""
+    params = {"endpoint": config.name, "format": fmt}
+    for name, value in kwargs.items():
+        if name == "client":
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        params[name] = str(value)
+    return params
+
+
+def _fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _save_checkpoint(path: str, checkpoint: dict[str, Any]) -> None:
+    """Atomically replace the checkpoint file, so a crash leaves either the old or the new one."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def export_all_pages(
+    fetch_fn: Callable[..., Any],
+    config: EndpointConfig,
+    output: str | None,
+    fmt: str | None,
+    resume: bool = False,
+    **kwargs: Any,
+) -> int:
+    """Write every page of a paginated endpoint to ``output`` as it arrives, checkpointing after each page.
+
+    After a page's rows are written and flushed to disk, its ``next_cursor``, page number,
+    the request parameters and the output size are stored in ``checkpoint_path(output)``.
+    With ``resume``, an export continues from that checkpoint: the output is truncated
+    to the last committed size (dropping rows of a partially written page) and fetching
+    restarts at the stored cursor, so every row is written exactly once. Without a
+    checkpoint, ``resume`` starts from the beginning. The checkpoint is deleted once
+    the last page is written.
+
+    Args:
+        fetch_fn: The sync_detailed function to call (e.g. get_balancing_energy_bids.sync_detailed).
+        config: Flattening configuration of the endpoint.
+        output: Output file path; CSV or JSON Lines.
+        fmt: Output format, or None to detect it from ``output``.
+        resume: Continue from an existing checkpoint.
+        **kwargs: Arguments forwarded to fetch_fn (client, area, period_start_at, etc.).
+
+    Returns:
+        Number of pages fetched in this run.
+    """
+    resolved = detect_format(output, fmt)
+    if not output or resolved not in RESUMABLE_FORMATS:
+        raise SystemExit(f"--resume requires --output with one of these formats: {', '.join(RESUMABLE_FORMATS)}.")
+    path = checkpoint_path(output)
+    params = _request_params(config, resolved, kwargs)
+
+    cursor, page = None, 1
+    if resume and os.path.exists(path):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint["params"] != params:
+            raise SystemExit(f"Checkpoint {path} belongs to a different export; remove it or change --output.")
+        cursor, page = checkpoint["nextCursor"], checkpoint["page"] + 1
+        if not os.path.exists(output) or os.path.getsize(output) < checkpoint["outputBytes"]:
+            raise SystemExit(f"{output} is shorter than recorded in {path}; cannot resume.")
+        log.debug("Resuming at page %d from %s", page, path)
+        with open(output, "ab") as f:
+            f.truncate(checkpoint["outputBytes"])
+    else:
+        open(output, "wb").close()
+
+    pages = 0
+    for page, parsed in iter_pages(fetch_fn, cursor=cursor, page=page, **kwargs):
+        write_rows(iter_rows(parsed.data, config), output, resolved, config, append=os.path.getsize(output) > 0)
+        _fsync(output)
+        pages += 1
+        next_cursor = parsed.next_cursor if parsed.has_more else None
+        if not next_cursor:
+            break
+        _save_checkpoint(
+            path,
+            {"params": params, "page": page, "nextCursor": next_cursor, "outputBytes": os.path.getsize(output)},
+        )
+    if os.path.exists(path):
+        os.remove(path)
+    log.debug("Fetched %d page(s), export complete", pages)
+    return pages
@@ -0,0 +1,153 @@
+"""Sorted index over the periods of a response group's items.
+
+Every data group of the API (``ImbalancePrices.prices``,
+``BalancingEnergyVolumes.volumes``, ...) holds a plain list of items with a
+``period``. ``PeriodIndex`` sorts the items once by period start and keeps the
+start/end times as int64 arrays of epoch microseconds, so lookups bisect
+instead of scanning::
+
+    index = period_index(group, "prices")
+    index.at(datetime(2025, 1, 1, 12, 5, tzinfo=timezone.utc))   # items whose period contains the instant
+    index.slice(day_start, day_end)                              # items starting within [day_start, day_end)
+    index.gaps(day_start, day_end)                               # uncovered intervals
+
+``period_index`` caches one index per group for the group's lifetime and
+rebuilds it if the item list is replaced or changes length.
+"""
+
+from __future__ import annotations
+
+import bisect
+import weakref
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(t: datetime) -> int:
+    """Microseconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return (t - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(us: int) -> datetime:
+    """Inverse of ``to_epoch_us``, as an aware UTC datetime."""
+    return _EPOCH + timedelta(microseconds=us)
+
+
+class PeriodIndex:
+    """Items of one group sorted by period, with bisect-based time lookups.
+
+    Periods may repeat (several bids per period) and may have different lengths.
+
+    Attributes:
+        items: the items sorted by period start (stable, so equal periods keep their order).
+        starts: period starts as epoch microseconds (``array('q')``), parallel to ``items``.
+        ends: period ends as epoch microseconds, parallel to ``items``.
+    """
+
+    def __init__(self, items: Sequence[Any]) -> None:
+        keyed = sorted(
+            ((to_epoch_us(item.period.start_at), to_epoch_us(item.period.end_at), item) for item in items),
+            key=lambda entry: entry[0],
+        )
+        self.items: list[Any] = [item for _, _, item in keyed]
+        self.starts = array("q", (start for start, _, _ in keyed))
+        self.ends = array("q", (end for _, end, _ in keyed))
+        # Running maximum of ends: items before position i end no later than _max_end[i - 1].
+        self._max_end = array("q")
+        running = -(2**63)
+        for end in self.ends:
+            running = max(running, end)
+            self._max_end.append(running)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _containing(self, lo_us: int, hi_us: int) -> list[Any]:
+        """Items with start < hi_us and end > lo_us, in start order."""
+        i = bisect.bisect_left(self.starts, hi_us)
+        found = []
+        while i > 0 and self._max_end[i - 1] > lo_us:
+            i -= 1
+            if self.ends[i] > lo_us:
+                found.append(self.items[i])
+        found.reverse()
+        return found
+
+    def at(self, t: datetime) -> list[Any]:
+        """Items whose period contains ``t`` (start <= t < end)."""
+        us = to_epoch_us(t)
+        return self._containing(us, us + 1)
+
+    def slice(self, start: datetime, end: datetime) -> list[Any]:
+        """Items whose period starts within ``[start, end)``."""
+        lo = bisect.bisect_left(self.starts, to_epoch_us(start))
+        hi = bisect.bisect_left(self.starts, to_epoch_us(end))
+        return self.items[lo:hi]
+
+    def overlapping(self, start: datetime, end: datetime) -> list[Any]:
+        """Items whose period overlaps ``[start, end)``."""
+        return self._containing(to_epoch_us(start), to_epoch_us(end))
+
+    def has_overlaps(self) -> bool:
+        """True if two different periods overlap; items sharing the same period do not count."""
+        for i in range(1, len(self.items)):
+            same_period = self.starts[i] == self.starts[i - 1] and self.ends[i] == self.ends[i - 1]
+            if not same_period and self.starts[i] < self._max_end[i - 1]:
+                return True
+        return False
+
+    def gaps(self, start: datetime | None = None, end: datetime | None = None) -> list[tuple[datetime, datetime]]:
+        """Intervals within ``[start, end)`` not covered by any period.
+
+        ``start`` and ``end`` default to the first period start and the last period end.
+        """
+        if not self.items:
+            return [] if start is None or end is None or start >= end else [(start, end)]
+        lo = self.starts[0] if start is None else to_epoch_us(start)
+        hi = self._max_end[-1] if end is None else to_epoch_us(end)
+        gaps = []
+        first = bisect.bisect_right(self.starts, lo)
+        covered = max(lo, self._max_end[first - 1]) if first else lo
+        for i in range(first, len(self.items)):
+            if self.starts[i] >= hi:
+                break
+            if self.starts[i] > covered:
+                gaps.append((from_epoch_us(covered), from_epoch_us(self.starts[i])))
+            covered = max(covered, self.ends[i])
+        if covered < hi:
+            gaps.append((from_epoch_us(covered), from_epoch_us(hi)))
+        return gaps
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """True if the periods cover ``[start, end)`` without gaps."""
+        return not self.gaps(start, end)
+
+
+# (id(group), items_field) -> (weak reference to the group, indexed item list, its length, index). Generated
+# models are unhashable attrs classes, so a WeakKeyDictionary cannot hold them.
+_INDEXES: dict[tuple[int, str], tuple[weakref.ref[Any], list[Any], int, PeriodIndex]] = {}
+
+
+def period_index(group: Any, items_field: str) -> PeriodIndex:
+    """Return the cached ``PeriodIndex`` of ``getattr(group, items_field)``, building it on first use.
+
+    The index lives as long as ``group`` and is rebuilt if the item list is replaced
+    or its length changes; in-place edits of items or periods are not detected.
+    """
+    items = getattr(group, items_field)
+    key = (id(group), items_field)
+    cached = _INDEXES.get(key)
+    if cached is not None and cached[0]() is group and cached[1] is items and cached[2] == len(items):
+        return cached[3]
+    index = PeriodIndex(items)
+    if cached is None or cached[0]() is not group:
+        weakref.finalize(group, _INDEXES.pop, key, None)
+    _INDEXES[key] = (weakref.ref(group), items, len(items), index)
+    return index
@@ -0,0 +1,123 @@
+"""Reduce capacity prices and procured volumes to one procurement per period.
+
+Capacity groups carry ``procured_at``, so the same period of the same area,
+reserve type and direction can appear once per auction. ``reduce_procurements``
+keeps one of them before the groups are flattened::
+
+    data = reduce_procurements(response.parsed.data, CAPACITY_PRICES, "latest")
+
+Each group's items are checked against a hash index from (group fields
+without ``procured_at``, period start) to the winning group and item, so the
+groups are read once and only the items are filtered. ``procurement_rows``
+instead puts all auctions of a period side by side in one row.
+
+A missing ``procured_at`` (None or unset) ranks below any known time for both
+``latest`` and ``earliest``; among equal times the first group wins.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+from balancing_services.types import Unset
+
+from balancing_services_cli.flatten import EndpointConfig, extract_value
+
+PROCUREMENT_MODES = ("latest", "earliest", "columns")
+
+PROCURED_AT = "procured_at"
+
+
+def _procured_at(group: Any) -> datetime | None:
+    value = getattr(group, PROCURED_AT)
+    return None if isinstance(value, Unset) else value
+
+
+def _series_fields(config: EndpointConfig) -> tuple[str, ...]:
+    return tuple(field for field in config.group_fields if field != PROCURED_AT)
+
+
+def _preferred(candidate: datetime | None, current: datetime | None, keep: str) -> bool:
+    if candidate is None:
+        return False
+    if current is None:
+        return True
+    return candidate > current if keep == "latest" else candidate < current
+
+
+def reduce_procurements(data: list[Any], config: EndpointConfig, keep: str = "latest") -> list[Any]:
+    """Keep only the ``latest`` or ``earliest`` procurement of every period.
+
+    Groups whose items all survive are returned as they are, groups that lose
+    some items as copies with the remaining items, and groups that lose all are
+    dropped; the order of groups and items is unchanged.
+    """
+    if keep not in ("latest", "earliest"):
+        raise ValueError(f"keep must be 'latest' or 'earliest', got {keep!r}")
+    fields = _series_fields(config)
+    # (series, period start) -> (procured_at, group position, item position) of the current winner.
+    winners: dict[tuple[Any, ...], tuple[datetime | None, int, int]] = {}
+    for g, group in enumerate(data):
+        series = tuple(getattr(group, field) for field in fields)
+        when = _procured_at(group)
+        for i, item in enumerate(getattr(group, config.items_field)):
+            key = (*series, item.period.start_at)
+            current = winners.get(key)
+            if current is None or _preferred(when, current[0], keep):
+                winners[key] = (when, g, i)
+
+    kept_positions: dict[int, set[int]] = {}
+    for _, g, i in winners.values():
+        kept_positions.setdefault(g, set()).add(i)
+    reduced = []
+    for g, group in enumerate(data):
+        items = getattr(group, config.items_field)
+        positions = kept_positions.get(g)
+        if not positions:
+            continue
+        if len(positions) == len(items):
+            reduced.append(group)
+            continue
+        copy = type(group)(
+            **{field: getattr(group, field) for field in config.group_fields},
+            **{config.items_field: [item for i, item in enumerate(items) if i in positions]},
+        )
+        copy.additional_properties = dict(group.additional_properties)
+        reduced.append(copy)
+    return reduced
+
+
+def procurement_rows(data: list[Any], config: EndpointConfig) -> Iterator[dict[str, Any]]:
+    """Flattened rows with one row per period and all its procurements as columns.
+
+    Each row has the group fields without ``procured_at``, the period, and for
+    every auction ``n`` (1 = latest, unknown times last) ``procured_at_<n>`` and the
+    item's value columns suffixed with ``_<n>``. All rows have as many auctions as
+    the period with the most; missing ones are None. Rows follow the first
+    appearance of their series and period.
+    """
+    fields = _series_fields(config)
+    values = [field for field in config.item_fields if field != "period"]
+    index: dict[tuple[Any, ...], list[tuple[Any, Any]]] = {}
+    for group in data:
+        series = tuple(getattr(group, field) for field in fields)
+        for item in getattr(group, config.items_field):
+            index.setdefault((*series, item.period.start_at), []).append((group, item))
+    width = max((len(entries) for entries in index.values()), default=0)
+    for entries in index.values():
+        group, item = entries[0]
+        row = {field: extract_value(group, field) for field in fields}
+        row["periodStartAt"] = item.period.start_at.isoformat()
+        row["periodEndAt"] = item.period.end_at.isoformat()
+        # Latest first with ties in input order (reverse sorts are stable), unknown times last.
+        known = [entry for entry in entries if _procured_at(entry[0]) is not None]
+        known.sort(key=lambda entry: _procured_at(entry[0]), reverse=True)
+        ordered = known + [entry for entry in entries if _procured_at(entry[0]) is None]
+        for n in range(1, width + 1):
+            entry = ordered[n - 1] if n <= len(ordered) else None
+            row[f"{PROCURED_AT}_{n}"] = None if entry is None else extract_value(entry[0], PROCURED_AT)
+            for field in values:
+                row[f"{field}_{n}"] = None if entry is None else extract_value(entry[1], field)
+        yield row
@@ -0,0 +1,288 @@
+"""Per-stage timing, CPU and memory profile of a CLI export (``--profile``).
+
+The pipeline of every command is split into stages:
+
+- ``http``: each request on the wire, including reading the response body;
+- ``json_decode``: ``response.json()`` inside the generated client;
+- ``from_dict``: the rest of the fetch phase, i.e. building the response models
+  plus pagination bookkeeping;
+- ``flatten``: producing row dicts from the models;
+- ``write``: the output writer, excluding the time spent waiting on ``flatten``.
+
+Wall and CPU time are measured for every stage. Peak memory is traced with
+tracemalloc: per call for ``http``, ``json_decode`` and ``write``, while
+``from_dict`` reports the peak of the whole fetch phase and ``flatten`` is
+interleaved with ``write`` and reported as part of it.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from balancing_services_cli.cassette import WIRE_HEADERS
+
+_MAX_REQUEST_LINES = 20
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements of one pipeline stage."""
+
+    count: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes: int | None = None
+    peak: int | None = None
+
+    def add(self, wall: float, cpu: float, count: int = 1, nbytes: int | None = None, peak: int | None = None) -> None:
+        self.count += count
+        self.wall += wall
+        self.cpu += cpu
+        if nbytes is not None:
+            self.bytes = (self.bytes or 0) + nbytes
+        if peak is not None:
+            self.peak = max(self.peak or 0, peak)
+
+
+@dataclass(frozen=True)
+class RequestStats:
+    """Measurements of one HTTP request."""
+
+    method: str
+    path: str
+    status: int
+    wall: float
+    bytes: int
+
+
+def _format_bytes(n: int | None) -> str:
+    if n is None:
+        return "-"
+    value = float(n)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def output_size(output: str | None) -> int | None:
+    """Size in bytes of a written file or dataset directory; None for stdout."""
+    if not output or not os.path.exists(output):
+        return None
+    if os.path.isdir(output):
+        return sum(
+            os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(output) for name in names
+        )
+    return os.path.getsize(output)
+
+
+class Profiler:
+    """Collects per-stage and per-request measurements for one CLI invocation.
+
+    Args:
+        trace_memory: trace peak memory with tracemalloc (slows Python allocations down).
+        cprofile_path: if set, also run cProfile and dump pstats data to this file on ``stop()``.
+    """
+
+    STAGES = ("http", "json_decode", "from_dict", "flatten", "write")
+
+    def __init__(self, trace_memory: bool = True, cprofile_path: str | None = None) -> None:
+        self.trace_memory = trace_memory
+        self.cprofile_path = cprofile_path
+        self.stages: dict[str, StageStats] = {name: StageStats() for name in self.STAGES}
+        self.requests: list[RequestStats] = []
+        self._lock = threading.Lock()
+        self._cprofile: cProfile.Profile | None = None
+        self._started_wall = self._started_cpu = 0.0
+        self._fetch_done = False
+        self._total: StageStats | None = None
+        # Peak traced memory of the current phase and of the whole run, folded in at every peak reset.
+        self._phase_peak = 0
+        self._max_peak = 0
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+
+    def stop(self) -> None:
+        if self._total is not None:
+            return
+        if not self._fetch_done:
+            self.finish_fetch()
+        self._total = StageStats(
+            count=1,
+            wall=time.perf_counter() - self._started_wall,
+            cpu=time.process_time() - self._started_cpu,
+            peak=self._overall_peak(),
+        )
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _reset_peak(self) -> None:
+        if tracemalloc.is_tracing():
+            self._fold_peak()
+            tracemalloc.reset_peak()
+
+    def _read_peak(self) -> int | None:
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.get_traced_memory()[1]
+
+    def _fold_peak(self) -> None:
+        peak = self._read_peak()
+        if peak is not None:
+            self._phase_peak = max(self._phase_peak, peak)
+            self._max_peak = max(self._max_peak, peak)
+
+    def _overall_peak(self) -> int | None:
+        if not tracemalloc.is_tracing():
+            return None
+        self._fold_peak()
+        return self._max_peak
+
+    def record(
+        self, stage: str, wall: float, cpu: float, count: int = 1, nbytes: int | None = None, peak: int | None = None
+    ) -> None:
+        with self._lock:
+            self.stages[stage].add(wall, cpu, count, nbytes, peak)
+
+    def record_request(self, request: httpx.Request, status: int, wall: float, cpu: float, nbytes: int) -> None:
+        self.record("http", wall, cpu, nbytes=nbytes, peak=self._read_peak())
+        with self._lock:
+            self.requests.append(RequestStats(request.method, request.url.path, status, wall, nbytes))
+
+    def finish_fetch(self) -> None:
+        """Close the fetch phase; its time not spent in ``http`` or ``json_decode`` is attributed to ``from_dict``."""
+        self._fetch_done = True
+        wall = time.perf_counter() - self._started_wall
+        cpu = time.process_time() - self._started_cpu
+        for name in ("http", "json_decode"):
+            wall -= self.stages[name].wall
+            cpu -= self.stages[name].cpu
+        self._fold_peak()
+        peak = self._phase_peak if tracemalloc.is_tracing() else None
+        self.record("from_dict", max(wall, 0.0), max(cpu, 0.0), peak=peak)
+
+    @contextmanager
+    def stage(self, name: str, output: str | None = None) -> Iterator[None]:
+        """Measure a block as stage ``name``, excluding time recorded by other stages inside it."""
+        others = [s for n, s in self.stages.items() if n != name]
+        wall_before = sum(s.wall for s in others)
+        cpu_before = sum(s.cpu for s in others)
+        self._reset_peak()
+        self._phase_peak = 0
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0 - (sum(s.wall for s in others) - wall_before)
+            cpu = time.process_time() - c0 - (sum(s.cpu for s in others) - cpu_before)
+            self.record(name, wall, cpu, nbytes=output_size(output), peak=self._read_peak())
+
+    def timed(self, items: Iterable[Any], stage: str) -> Iterator[Any]:
+        """Yield from ``items``, attributing the time spent producing each item to ``stage``."""
+        it = iter(items)
+        stats = self.stages[stage]
+        while True:
+            t0, c0 = time.perf_counter(), time.process_time()
+            try:
+                item = next(it)
+            except StopIteration:
+                stats.add(time.perf_counter() - t0, time.process_time() - c0, count=0)
+                return
+            stats.add(time.perf_counter() - t0, time.process_time() - c0)
+            yield item
+
+    def report(self) -> str:
+        """Render the stage and request tables."""
+        lines = [f"{'stage':<12} {'count':>8} {'wall s':>9} {'cpu s':>9} {'bytes':>11} {'peak mem':>11}"]
+        rows = list(self.stages.items())
+        if self._total is not None:
+            rows.append(("total", self._total))
+        for name, s in rows:
+            lines.append(
+                f"{name:<12} {s.count:>8,} {s.wall:>9.3f} {s.cpu:>9.3f} "
+                f"{_format_bytes(s.bytes):>11} {_format_bytes(s.peak):>11}"
+            )
+        if self.requests:
+            lines.append("")
+            lines.append(f"{'request (slowest first)':<50} {'status':>6} {'wall s':>9} {'bytes':>11}")
+            for r in sorted(self.requests, key=lambda r: r.wall, reverse=True)[:_MAX_REQUEST_LINES]:
+                lines.append(f"{r.method + ' ' + r.path:<50} {r.status:>6} {r.wall:>9.3f} {_format_bytes(r.bytes):>11}")
+            if len(self.requests) > _MAX_REQUEST_LINES:
+                lines.append(f"... {len(self.requests) - _MAX_REQUEST_LINES} more request(s)")
+        if self.cprofile_path:
+            lines.append("")
+            lines.append(f"cProfile stats written to {self.cprofile_path} (inspect with python -m pstats)")
+        return "\n".join(lines)
+
+
+class _ProfiledResponse(httpx.Response):
+    """Response whose ``json()`` is timed as the ``json_decode`` stage."""
+
+    profiler: Profiler
+
+    def json(self, **kwargs: Any) -> Any:
+        profiler = self.profiler
+        profiler._reset_peak()
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            return super().json(**kwargs)
+        finally:
+            profiler.record(
+                "json_decode",
+                time.perf_counter() - t0,
+                time.process_time() - c0,
+                nbytes=len(self.content),
+                peak=profiler._read_peak(),
+            )
+
+
+class ProfilingTransport(httpx.BaseTransport):
+    """Wraps a sync transport, timing every request (including the body read) as the ``http`` stage."""
+
+    def __init__(self, profiler: Profiler, transport: httpx.BaseTransport | None = None) -> None:
+        self.profiler = profiler
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.profiler._reset_peak()
+        t0, c0 = time.perf_counter(), time.process_time()
+        response = self._transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+        self.profiler.record_request(request, response.status_code, wall, cpu, len(content))
+        profiled = _ProfiledResponse(
+            response.status_code,
+            headers=[(k, v) for k, v in response.headers.multi_items() if k.lower() not in WIRE_HEADERS],
+            content=content,
+            request=request,
+            extensions=response.extensions,
+        )
+        profiled.profiler = self.profiler
+        return profiled
+
+    def close(self) -> None:
+        self._transport.close()
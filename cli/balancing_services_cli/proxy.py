@@ -0,0 +1,311 @@
+"""Local caching proxy that shares one upstream client between many API consumers.
+
+``ProxyServer`` answers the API's REST paths (``/imbalance/prices``, ...) on a
+local port. Every request is parsed into the generated endpoint's arguments and
+then served, in order of preference:
+
+1. from the ``ResponseCache`` (``X-Cache: HIT``),
+2. by joining an identical upstream request already in flight (``SingleFlight``),
+3. by a new upstream request through the shared ``AuthenticatedClient``
+   (``X-Cache: MISS``), which waits for one of a fixed number of upstream slots.
+
+Slots are handed out by a ``FairScheduler``: consumers declare themselves
+``interactive`` (the default) or ``backfill`` with the ``X-Client-Class`` header,
+and waiting requests of each class get slots in proportion to the class's weight,
+so a large backfill cannot starve interactive users. Upstream bodies are passed
+through unchanged; only 200 responses are cached::
+
+    server = make_proxy(AuthenticatedClient(base_url=..., token=...), ResponseCache(max_bytes=...), port=8090)
+    server.serve_forever()
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import logging
+import threading
+from collections import Counter, deque
+from collections.abc import Hashable, Iterator, Mapping
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import ModuleType
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from balancing_services.api.default import (
+    get_balancing_capacity_bids,
+    get_balancing_capacity_prices,
+    get_balancing_capacity_procured_volumes,
+    get_balancing_energy_activated_volumes,
+    get_balancing_energy_bids,
+    get_balancing_energy_offered_volumes,
+    get_balancing_energy_prices,
+    get_cross_zonal_capacity_allocation,
+    get_imbalance_prices,
+    get_imbalance_total_volumes,
+)
+from balancing_services.models import Area, ReserveType
+from dateutil.parser import isoparse
+
+from balancing_services_cli.response_cache import ResponseCache
+from balancing_services_cli.singleflight import SingleFlight, normalize_request
+
+log = logging.getLogger(__name__)
+
+CLIENT_CLASS_HEADER = "X-Client-Class"
+CLIENT_CLASSES = ("interactive", "backfill")
+DEFAULT_WEIGHTS = {"interactive": 4, "backfill": 1}
+DEFAULT_UPSTREAM_SLOTS = 8
+
+ENDPOINTS: dict[str, ModuleType] = {
+    "/imbalance/prices": get_imbalance_prices,
+    "/imbalance/total-volumes": get_imbalance_total_volumes,
+    "/balancing/energy/activated-volumes": get_balancing_energy_activated_volumes,
+    "/balancing/energy/offered-volumes": get_balancing_energy_offered_volumes,
+    "/balancing/energy/prices": get_balancing_energy_prices,
+    "/balancing/energy/bids": get_balancing_energy_bids,
+    "/balancing/capacity/bids": get_balancing_capacity_bids,
+    "/balancing/capacity/prices": get_balancing_capacity_prices,
+    "/balancing/capacity/procured-volumes": get_balancing_capacity_procured_volumes,
+    "/balancing/capacity/cross-zonal-allocation": get_cross_zonal_capacity_allocation,
+}
+
+# Query parameter -> (endpoint argument, parser).
+_PARAMETERS = {
+    "area": ("area", Area),
+    "period-start-at": ("period_start_at", isoparse),
+    "period-end-at": ("period_end_at", isoparse),
+    "reserve-type": ("reserve_type", ReserveType),
+    "cursor": ("cursor", str),
+    "limit": ("limit", int),
+}
+
+# Upstream headers passed on to consumers.
+_FORWARDED_HEADERS = ("Content-Type", "Retry-After", "ETag", "Last-Modified")
+
+
+class FairScheduler:
+    """Bounded pool of upstream slots shared between client classes by weight.
+
+    When a slot frees up, it goes to the oldest waiter of the class that has received
+    the least service relative to its weight (stride scheduling). A class that was idle
+    re-enters at the current virtual time, so it cannot claim a burst of saved-up turns.
+
+    Attributes:
+        stats: ``Counter`` of slots granted per class.
+    """
+
+    def __init__(self, slots: int = DEFAULT_UPSTREAM_SLOTS, weights: Mapping[str, int] = DEFAULT_WEIGHTS) -> None:
+        if slots < 1 or any(weight < 1 for weight in weights.values()):
+            raise ValueError("slots and weights must be positive")
+        self.weights = dict(weights)
+        self.stats: Counter[str] = Counter()
+        self._free = slots
+        self._condition = threading.Condition()
+        self._queues: dict[str, deque[object]] = {name: deque() for name in self.weights}
+        self._pass = dict.fromkeys(self.weights, 0.0)
+        self._virtual_time = 0.0
+
+    def _next(self) -> object | None:
+        waiting = [name for name in self.weights if self._queues[name]]
+        if not waiting:
+            return None
+        return self._queues[min(waiting, key=lambda name: self._pass[name])][0]
+
+    @contextmanager
+    def slot(self, client_class: str) -> Iterator[None]:
+        """Hold one upstream slot for the duration of the ``with`` block."""
+        ticket = object()
+        with self._condition:
+            queue = self._queues[client_class]
+            if not queue:
+                self._pass[client_class] = max(self._pass[client_class], self._virtual_time)
+            queue.append(ticket)
+            while not (self._free and self._next() is ticket):
+                self._condition.wait()
+            queue.popleft()
+            self._free -= 1
+            self._virtual_time = self._pass[client_class]
+            self._pass[client_class] += 1 / self.weights[client_class]
+            self.stats[client_class] += 1
+            # Another slot may still be free for the next waiter.
+            self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._free += 1
+                self._condition.notify_all()
+
+
+class _ProblemError(Exception):
+    def __init__(self, status: int, type_: str, title: str, detail: str) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.body = {"type": type_, "title": title, "status": status, "detail": detail}
+
+
+def parse_query(endpoint: ModuleType, query: str) -> dict[str, Any]:
+    """Turn a request's query string into keyword arguments for ``endpoint.sync_detailed``.
+
+    Raises:
+        _ProblemError: (400) for unknown, repeated, missing or invalid parameters.
+    """
+    parameters = inspect.signature(endpoint.sync_detailed).parameters
+    kwargs: dict[str, Any] = {}
+    for name, values in parse_qs(query, keep_blank_values=True).items():
+        argument, parse = _PARAMETERS.get(name, (None, str))
+        if argument not in parameters or len(values) != 1:
+            raise _ProblemError(400, "invalid-parameter", "Invalid Parameter", f"Unexpected parameter '{name}'")
+        try:
+            kwargs[argument] = parse(values[0])
+        except ValueError:
+            raise _ProblemError(
+                400, "invalid-parameter", "Invalid Parameter", f"The {name} parameter value is not valid"
+            )
+    for name, (argument, _) in _PARAMETERS.items():
+        parameter = parameters.get(argument)
+        if parameter is not None and parameter.default is inspect.Parameter.empty and argument not in kwargs:
+            raise _ProblemError(
+                400, "missing-parameter", "Missing Parameter", f"Required parameter '{name}' is missing"
+            )
+    return kwargs
+
+
+class ProxyServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering API requests from a cache, in-flight requests or the upstream client.
+
+    Args:
+        address: ``(host, port)`` to bind.
+        client: upstream ``AuthenticatedClient``; its connection pool is shared by all requests.
+        cache: cache of upstream 200 responses.
+        scheduler: upstream slots and their sharing between client classes.
+        token: if set, consumers must send ``Authorization: Bearer <token>``.
+
+    Attributes:
+        stats: ``Counter`` of ``hits`` (served from the cache), ``misses`` (upstream
+            requests sent), ``coalesced`` (served by another consumer's upstream request)
+            and ``errors`` (upstream failures answered with 502).
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        client: Any,
+        cache: ResponseCache | None = None,
+        scheduler: FairScheduler | None = None,
+        token: str | None = None,
+    ) -> None:
+        super().__init__(address, _ProxyHandler)
+        self.client = client
+        # Create the pooled httpx client now; lazy creation from handler threads could race.
+        client.get_httpx_client()
+        self.cache = cache if cache is not None else ResponseCache()
+        self.scheduler = scheduler if scheduler is not None else FairScheduler()
+        self.token = token
+        self.flight = SingleFlight()
+        self.stats: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _upstream(self, endpoint: ModuleType, kwargs: dict[str, Any], key: Hashable, client_class: str) -> Any:
+        with self.scheduler.slot(client_class):
+            self._count("misses")
+            response = endpoint.sync_detailed(client=self.client, **kwargs)
+        if response.status_code == 200:
+            self.cache.put(key, response, self.cache.ttl(endpoint, kwargs))
+        return response
+
+    def respond(self, path: str, query: str, headers: Mapping[str, str]) -> tuple[int, dict[str, str], bytes]:
+        """Compute (status, headers, body) for one GET request."""
+        try:
+            endpoint = next((module for suffix, module in ENDPOINTS.items() if path.endswith(suffix)), None)
+            if endpoint is None:
+                raise _ProblemError(404, "not-found", "Not Found", "The requested resource was not found")
+            if self.token and headers.get("Authorization") != f"Bearer {self.token}":
+                raise _ProblemError(401, "unauthorized", "Unauthorized", "Valid API token required")
+            client_class = headers.get(CLIENT_CLASS_HEADER, CLIENT_CLASSES[0]).strip().lower()
+            if client_class not in self.scheduler.weights:
+                raise _ProblemError(
+                    400, "invalid-header", "Invalid Header", f"The {CLIENT_CLASS_HEADER} header value is not valid"
+                )
+            kwargs = parse_query(endpoint, query)
+
+            key = ("proxy", *normalize_request(endpoint, **kwargs))
+            response = self.cache.get(key)
+            cache_status = "HIT"
+            if response is None:
+                led: list[bool] = []
+
+                def fetch() -> Any:
+                    led.append(True)
+                    return self._upstream(endpoint, kwargs, key, client_class)
+
+                response = self.flight.call(key, fetch)
+                cache_status = "MISS" if led else "COALESCED"
+            if cache_status != "MISS":
+                self._count("hits" if cache_status == "HIT" else "coalesced")
+        except _ProblemError as error:
+            return error.status, {"Content-Type": "application/problem+json"}, json.dumps(error.body).encode()
+        except Exception as e:  # transport errors and unparseable upstream answers alike
+            self._count("errors")
+            log.warning("Upstream request failed: %s", str(e) or type(e).__name__)
+            body = {"type": "bad-gateway", "title": "Bad Gateway", "status": 502, "detail": "Upstream request failed"}
+            return 502, {"Content-Type": "application/problem+json"}, json.dumps(body).encode()
+        forwarded = {name: response.headers[name] for name in _FORWARDED_HEADERS if name in response.headers}
+        return int(response.status_code), {**forwarded, "X-Cache": cache_status}, response.content
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    server: ProxyServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 - name required by BaseHTTPRequestHandler
+        parts = urlsplit(self.path)
+        status, headers, payload = self.server.respond(parts.path, parts.query, self.headers)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_proxy(
+    client: Any,
+    cache: ResponseCache | None = None,
+    scheduler: FairScheduler | None = None,
+    token: str | None = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> ProxyServer:
+    """Create (but do not start) a proxy server; ``port=0`` picks a free port."""
+    return ProxyServer((host, port), client, cache, scheduler, token)
+
+
+@contextmanager
+def running_proxy(client: Any, **kwargs: Any) -> Iterator[ProxyServer]:
+    """Run a proxy on a background thread for the duration of a ``with`` block, e.g. in tests."""
+    server = make_proxy(client, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,235 @@
+"""Request rate limit shared by all bs-cli processes on a host.
+
+``SharedRateLimiter`` keeps one token bucket in a small SQLite database, so
+parallel jobs (e.g. from cron) draw from a single budget instead of each
+throttling on its own and together tripping 429s. SQLite's write lock
+(``BEGIN IMMEDIATE``) serializes the bucket updates between processes and
+threads.
+
+Waiting requests are queued fairly between owners (by default one owner per
+process): each request is tagged with its owner's next virtual finish time, and
+the request with the smallest tag takes the next token. A process issuing many
+concurrent requests therefore alternates with a process issuing one, rather
+than queuing ahead of it. Owners that stop polling (crashed processes) are
+dropped from the queue after ``stale_after`` seconds.
+
+``RateLimitedTransport`` takes a token before every request and, when the API
+answers 429, pauses the shared bucket for the ``Retry-After`` period so every
+process backs off together::
+
+    limiter = SharedRateLimiter(rate=5, burst=10)
+    client = AuthenticatedClient(base_url=..., token=..., httpx_args={"transport": RateLimitedTransport(limiter)})
+
+All processes sharing a database should use the same ``rate`` and ``burst``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+import httpx
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "bs-cli-rate-limit.sqlite")
+DEFAULT_RETRY_AFTER = 1.0
+
+# Tolerance for refill arithmetic, so sleeping exactly the computed wait yields a whole token.
+_EPSILON = 1e-9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bucket (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    paused_until REAL NOT NULL,
+    virtual_time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, last_tag REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS waiters (
+    ticket INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    tag REAL NOT NULL,
+    seen_at REAL NOT NULL
+);
+"""
+
+
+class SharedRateLimiter:
+    """Token bucket stored in SQLite and shared by every process that opens the same ``path``.
+
+    Args:
+        path: database file; created if missing.
+        rate: tokens added per second.
+        burst: bucket capacity, i.e. requests allowed back to back after an idle period.
+        owner: fairness unit; defaults to the process id.
+        stale_after: seconds after which a waiter that stopped polling is dropped.
+        clock: wall-clock time in seconds (shared between processes), replaceable in tests.
+        sleep: sleep function, replaceable in tests.
+
+    Attributes:
+        stats: ``Counter`` of ``acquired`` tokens and ``pauses`` (429 answers), and
+            ``waited`` (total seconds spent waiting for tokens).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        rate: float = 5.0,
+        burst: float = 1.0,
+        owner: str | None = None,
+        stale_after: float = 10.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.owner = owner if owner is not None else str(os.getpid())
+        self.stale_after = stale_after
+        self.stats: Counter[str] = Counter()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        with self._transaction() as db:
+            db.execute("INSERT OR IGNORE INTO bucket VALUES (0, ?, ?, 0, 0)", (burst, self._clock()))
+
+    def close(self) -> None:
+        self._db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _refill(self, db: sqlite3.Connection, now: float) -> tuple[float, float, float]:
+        tokens, updated_at, paused_until, virtual_time = db.execute(
+            "SELECT tokens, updated_at, paused_until, virtual_time FROM bucket"
+        ).fetchone()
+        tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+        return tokens, paused_until, virtual_time
+
+    def _enqueue(self) -> tuple[int, float]:
+        with self._transaction() as db:
+            now = self._clock()
+            _, _, virtual_time = self._refill(db, now)
+            row = db.execute("SELECT last_tag FROM owners WHERE owner = ?", (self.owner,)).fetchone()
+            tag = max(virtual_time, row[0] if row else 0.0) + 1
+            db.execute("INSERT OR REPLACE INTO owners VALUES (?, ?)", (self.owner, tag))
+            cursor = db.execute("INSERT INTO waiters (owner, tag, seen_at) VALUES (?, ?, ?)", (self.owner, tag, now))
+            return int(cursor.lastrowid), tag
+
+    def _try_acquire(self, ticket: int, tag: float) -> float | None:
+        """Take a token if ``ticket`` is first in line and one is available; else return seconds to wait."""
+        with self._transaction() as db:
+            now = self._clock()
+            db.execute("DELETE FROM waiters WHERE seen_at < ? AND ticket != ?", (now - self.stale_after, ticket))
+            # Re-inserting (rather than updating) restores a ticket dropped as stale after a long stall.
+            db.execute("INSERT OR REPLACE INTO waiters VALUES (?, ?, ?, ?)", (ticket, self.owner, tag, now))
+            tokens, paused_until, virtual_time = self._refill(db, now)
+            ahead = db.execute(
+                "SELECT COUNT(*) FROM waiters WHERE tag < ? OR (tag = ? AND ticket < ?)",
+                (tag, tag, ticket),
+            ).fetchone()[0]
+            if ahead == 0 and tokens >= 1 - _EPSILON and now >= paused_until:
+                tokens = max(0.0, tokens - 1)
+                virtual_time = max(virtual_time, tag)
+                db.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+                db.execute("DELETE FROM owners WHERE last_tag <= ?", (virtual_time,))
+                wait = None
+            else:
+                # Tokens needed before this request's turn, but poll often enough to stay fresh.
+                wait = max(paused_until - now, (ahead + 1 - tokens) / self.rate, 0.001)
+                wait = min(wait, self.stale_after / 4)
+            db.execute("UPDATE bucket SET tokens = ?, updated_at = ?, virtual_time = ?", (tokens, now, virtual_time))
+            return wait
+
+    def acquire(self) -> float:
+        """Block until a token is available for this owner; return the seconds waited."""
+        start = self._clock()
+        ticket, tag = self._enqueue()
+        try:
+            while (wait := self._try_acquire(ticket, tag)) is not None:
+                self._sleep(wait)
+        except BaseException:
+            with self._transaction() as db:
+                db.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+            raise
+        waited = self._clock() - start
+        with self._lock:
+            self.stats["acquired"] += 1
+            self.stats["waited"] += waited
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens to any process for ``seconds`` (e.g. after a 429)."""
+        with self._transaction() as db:
+            db.execute("UPDATE bucket SET paused_until = MAX(paused_until, ?)", (self._clock() + seconds,))
+        with self._lock:
+            self.stats["pauses"] += 1
+
+
+def retry_after(response: httpx.Response, default: float = DEFAULT_RETRY_AFTER) -> float:
+    """Seconds from a response's ``Retry-After`` header (delay form only), or ``default``."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return default
+
+
+class RateLimitedTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Wraps sync and async transports, taking a ``SharedRateLimiter`` token before each request.
+
+    Args:
+        limiter: shared bucket; not closed with the transport.
+        transport: sync transport to forward to; default ``httpx.HTTPTransport()``.
+        async_transport: async transport to forward to; default ``httpx.AsyncHTTPTransport()``.
+    """
+
+    def __init__(
+        self,
+        limiter: SharedRateLimiter,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.limiter = limiter
+        self._transport = transport or httpx.HTTPTransport()
+        self._async_transport = async_transport or httpx.AsyncHTTPTransport()
+
+    def _check(self, response: httpx.Response) -> None:
+        if response.status_code == 429:
+            self.limiter.pause(retry_after(response))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.limiter.acquire()
+        response = self._transport.handle_request(request)
+        self._check(response)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.to_thread(self.limiter.acquire)
+        response = await self._async_transport.handle_async_request(request)
+        self._check(response)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
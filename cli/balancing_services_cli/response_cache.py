@@ -0,0 +1,221 @@
+"""In-process cache of parsed API responses for long-running services.
+
+``ResponseCache`` keeps successful ``Response`` objects (with their parsed models)
+in memory, evicting the least recently used entries once their estimated size
+exceeds ``max_bytes``. How long an entry stays fresh depends on its queried
+window: data for periods that ended more than ``settle_after`` ago is treated as
+settled and kept until evicted, while windows reaching into the recent past
+expire after a short TTL so revisions and newly published periods are picked up.
+Cached responses are shared between callers and must be treated as read-only::
+
+    cache = ResponseCache(max_bytes=512 * 1024**2)
+    response = cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, ...)
+    response = await cache.asyncio_detailed(get_imbalance_prices, client=client, area=Area.EE, ...)
+    print(cache.stats)
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from types import ModuleType
+from typing import Any
+
+from balancing_services_cli.singleflight import normalize_request
+
+DEFAULT_MAX_BYTES = 256 * 1024**2
+
+_SAMPLE = 16
+
+_ATOMIC = (str, bytes, int, float, bool, type(None), datetime, Enum)
+
+
+@dataclass(frozen=True)
+class TtlPolicy:
+    """Freshness rules for cached responses of one endpoint.
+
+    Attributes:
+        recent: TTL for windows ending after ``now - settle_after``.
+        settled: TTL for older windows; None keeps them until evicted.
+        settle_after: how long after a period ends its data is considered final.
+    """
+
+    recent: timedelta = timedelta(minutes=1)
+    settled: timedelta | None = None
+    settle_after: timedelta = timedelta(days=1)
+
+    def ttl(self, period_end_at: datetime | None, now: datetime) -> float | None:
+        """TTL in seconds for a window ending at ``period_end_at`` (None: no expiry)."""
+        if period_end_at is None:
+            return self.recent.total_seconds()
+        if period_end_at.tzinfo is None:
+            period_end_at = period_end_at.replace(tzinfo=timezone.utc)
+        if period_end_at <= now - self.settle_after:
+            return None if self.settled is None else self.settled.total_seconds()
+        return self.recent.total_seconds()
+
+
+def estimate_size(obj: Any) -> int:
+    """Approximate memory footprint of ``obj`` and everything it references, in bytes.
+
+    Long lists are estimated from an evenly spaced sample of ``_SAMPLE`` elements,
+    so the cost stays small even for responses with millions of items.
+    """
+    seen: set[int] = set()
+    stack: list[tuple[Any, float]] = [(obj, 1.0)]
+    total = 0.0
+    while stack:
+        item, weight = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item) * weight
+        if isinstance(item, _ATOMIC) or isinstance(item, type):
+            continue
+        if isinstance(item, dict):
+            stack.extend((child, weight) for child in item.keys())
+            stack.extend((child, weight) for child in item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            children = list(item) if isinstance(item, (set, frozenset)) else item
+            if len(children) > _SAMPLE:
+                step = len(children) / _SAMPLE
+                scaled = weight * step
+                stack.extend((children[int(i * step)], scaled) for i in range(_SAMPLE))
+            else:
+                stack.extend((child, weight) for child in children)
+        else:
+            stack.extend((getattr(item, name), weight) for name in _slot_names(type(item)) if hasattr(item, name))
+            if hasattr(item, "__dict__"):
+                stack.append((item.__dict__, weight))
+    return int(total)
+
+
+def _slot_names(cls: type) -> list[str]:
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return [name for name in names if name not in ("__weakref__", "__dict__")]
+
+
+@dataclass
+class _Entry:
+    response: Any
+    size: int
+    expires_at: float | None
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of parsed responses for the generated endpoint modules.
+
+    Entries are keyed on the client's base URL and the endpoint's normalized method,
+    URL and query parameters, so clients with different tokens share entries.
+
+    Args:
+        max_bytes: bound on the estimated memory of all cached responses.
+        default_ttl: freshness rules for endpoints without an entry in ``ttls``.
+        ttls: per-endpoint rules, keyed by endpoint module name (e.g. "get_imbalance_prices").
+        clock: monotonic clock in seconds, replaceable in tests.
+        now: current wall-clock time, replaceable in tests.
+
+    Attributes:
+        stats: ``Counter`` of ``hits``, ``misses``, ``expired`` and ``evictions``.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: TtlPolicy = TtlPolicy(),
+        ttls: dict[str, TtlPolicy] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.stats: Counter[str] = Counter()
+        self._clock = clock
+        self._now = now
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Estimated bytes currently held."""
+        return self._bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _key(self, endpoint: ModuleType, client: Any, kwargs: dict[str, Any]) -> Hashable:
+        return getattr(client, "_base_url", id(client)), *normalize_request(endpoint, **kwargs)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached response for ``key`` if fresh, counting a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= self._clock():
+                self._remove(key)
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.response
+
+    def put(self, key: Hashable, response: Any, ttl: float | None) -> None:
+        """Store ``response``; responses larger than ``max_bytes`` are not cached."""
+        size = estimate_size(response)
+        if size > self.max_bytes:
+            return
+        expires_at = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(response, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _remove(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def ttl(self, endpoint: ModuleType, kwargs: dict[str, Any]) -> float | None:
+        """TTL in seconds for a response of ``endpoint`` to ``kwargs`` under its policy (None: no expiry)."""
+        policy = self.ttls.get(endpoint.__name__.rsplit(".", 1)[-1], self.default_ttl)
+        return policy.ttl(kwargs.get("period_end_at"), self._now())
+
+    def sync_detailed(self, endpoint: ModuleType, *, client: Any, **kwargs: Any) -> Any:
+        """Return a cached response or call ``endpoint.sync_detailed`` and cache a 200 response."""
+        key = self._key(endpoint, client, kwargs)
+        response = self.get(key)
+        if response is None:
+            response = endpoint.sync_detailed(client=client, **kwargs)
+            if response.status_code == 200:
+                self.put(key, response, self.ttl(endpoint, kwargs))
+        return response
+
+    async def asyncio_detailed(self, endpoint: ModuleType, *, client: Any, **kwargs: Any) -> Any:
+        """Return a cached response or await ``endpoint.asyncio_detailed`` and cache a 200 response."""
+        key = self._key(endpoint, client, kwargs)
+        response = self.get(key)
+        if response is None:
+            response = await endpoint.asyncio_detailed(client=client, **kwargs)
+            if response.status_code == 200:
+                self.put(key, response, self.ttl(endpoint, kwargs))
+        return response
@@ -0,0 +1,118 @@
+"""Single-flight coalescing of concurrent identical API requests.
+
+When several threads or coroutines ask for the same endpoint with the same
+parameters at the same time, only the first caller sends the request; the others
+wait for it and receive the same ``Response`` object (including the same parsed
+model, which callers must therefore treat as read-only). Once that request has
+finished, the next identical call goes to the network again, so this is not a
+cache.
+
+Requests are identified by the client they are sent with and the method, URL
+and sorted query parameters built by the endpoint module's ``_get_kwargs``::
+
+    flight = SingleFlight()
+    response = flight.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, ...)
+    response = await flight.asyncio_detailed(get_imbalance_prices, client=client, area=Area.EE, ...)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import Counter
+from collections.abc import Callable, Hashable
+from types import ModuleType
+from typing import Any
+
+
+def normalize_request(endpoint: ModuleType, **kwargs: Any) -> tuple[str, str, tuple[tuple[str, str], ...]]:
+    """Method, URL and sorted query parameters that ``endpoint`` would send for ``kwargs``."""
+    request = endpoint._get_kwargs(**kwargs)
+    params = tuple(sorted((str(k), str(v)) for k, v in request.get("params", {}).items()))
+    return request["method"].upper(), request["url"], params
+
+
+def request_key(endpoint: ModuleType, client: Any, **kwargs: Any) -> Hashable:
+    """Identity of a request: the client plus its normalized method, URL and query parameters."""
+    # The client is kept alive by the in-flight entry, so its id cannot be reused while the key is in use.
+    return id(client), *normalize_request(endpoint, **kwargs)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent identical requests made through the generated endpoint modules.
+
+    Safe to share between threads and between coroutines; async callers are only
+    coalesced with callers running on the same event loop.
+
+    Attributes:
+        stats: ``Counter`` with ``requests`` (calls that hit the network) and
+            ``coalesced`` (calls served by another caller's request).
+    """
+
+    def __init__(self) -> None:
+        self.stats: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: dict[Hashable, asyncio.Future[Any]] = {}
+
+    def call(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn()``, or wait for and share the result of the call with the same ``key`` already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["requests"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def sync_detailed(self, endpoint: ModuleType, *, client: Any, **kwargs: Any) -> Any:
+        """Call ``endpoint.sync_detailed``, sharing the response with concurrent identical calls."""
+        key = request_key(endpoint, client, **kwargs)
+        return self.call(key, lambda: endpoint.sync_detailed(client=client, **kwargs))
+
+    async def asyncio_detailed(self, endpoint: ModuleType, *, client: Any, **kwargs: Any) -> Any:
+        """Await ``endpoint.asyncio_detailed``, sharing the response with concurrent identical calls.
+
+        The request runs as a task of its own, so cancelling one waiter does not
+        cancel the request for the others.
+        """
+        loop = asyncio.get_running_loop()
+        key = (id(loop), request_key(endpoint, client, **kwargs))
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = loop.create_task(endpoint.asyncio_detailed(client=client, **kwargs))
+                task.add_done_callback(lambda _: self._forget(key))
+                self.stats["requests"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._tasks.pop(key, None)
@@ -0,0 +1,298 @@
+"""Schema-valid synthetic API payloads for benchmarks, mock servers and tests."""
+
+from __future__ import annotations
+
+import math
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from balancing_services.models import (
+    ActivationType,
+    Area,
+    BalancingCapacityBidsResponse,
+    BalancingCapacityPricesResponse,
+    BalancingCapacityVolumesResponse,
+    BalancingEnergyBidsResponse,
+    BalancingEnergyPricesResponse,
+    BalancingEnergyVolumesResponse,
+    BidStatus,
+    CrossZonalCapacityAllocationResponse,
+    Currency,
+    Direction,
+    EicCode,
+    ImbalanceDirection,
+    ImbalancePricesResponse,
+    ImbalanceTotalVolumesResponse,
+    ReserveType,
+    TotalImbalanceDirection,
+)
+
+from balancing_services_cli import flatten
+from balancing_services_cli.flatten import EndpointConfig
+
+DEFAULT_START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DEFAULT_RESOLUTION = timedelta(minutes=15)
+
+_AREAS = [a.value for a in Area]
+_EIC_CODES = [e.value for e in EicCode]
+
+
+def _choice(rng: random.Random, enum: Any) -> str:
+    return rng.choice(list(enum)).value
+
+
+def _area_fields(rng: random.Random, area: str | None) -> dict[str, Any]:
+    return {"area": area or rng.choice(_AREAS), "eicCode": rng.choice(_EIC_CODES)}
+
+
+def _price(rng: random.Random) -> float:
+    return round(rng.uniform(-50.0, 500.0), 2)
+
+
+def _volume(rng: random.Random) -> float:
+    return round(rng.uniform(0.0, 250.0), 1)
+
+
+@dataclass(frozen=True)
+class SyntheticEndpoint:
+    """Describes how to synthesize the response of one API path.
+
+    Attributes:
+        path: API path relative to the base URL (e.g. "/imbalance/prices").
+        config: flattening configuration of the matching CLI command.
+        response_model: generated model class whose ``from_dict`` parses the payload.
+        make_group: builds the metadata fields of one data[] group (camelCase keys).
+        make_item: builds one nested item (without its period).
+        items_per_period: nested items per settlement period (several for bids).
+        paginated: whether the endpoint supports cursor pagination.
+    """
+
+    path: str
+    config: EndpointConfig
+    response_model: type
+    make_group: Callable[[random.Random, str | None], dict[str, Any]]
+    make_item: Callable[[random.Random], dict[str, Any]]
+    items_per_period: int = 1
+    paginated: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    @property
+    def items_field(self) -> str:
+        return self.config.items_field
+
+
+ENDPOINTS: dict[str, SyntheticEndpoint] = {
+    e.name: e
+    for e in (
+        SyntheticEndpoint(
+            path="/imbalance/prices",
+            config=flatten.IMBALANCE_PRICES,
+            response_model=ImbalancePricesResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "currency": _choice(rng, Currency),
+                "direction": _choice(rng, ImbalanceDirection),
+            },
+            make_item=lambda rng: {"price": _price(rng)},
+        ),
+        SyntheticEndpoint(
+            path="/imbalance/total-volumes",
+            config=flatten.IMBALANCE_VOLUMES,
+            response_model=ImbalanceTotalVolumesResponse,
+            make_group=_area_fields,
+            make_item=lambda rng: {
+                "averagePowerMW": round(rng.uniform(-300.0, 300.0), 1),
+                "direction": _choice(rng, TotalImbalanceDirection),
+            },
+        ),
+        SyntheticEndpoint(
+            path="/balancing/energy/activated-volumes",
+            config=flatten.ENERGY_ACTIVATED,
+            response_model=BalancingEnergyVolumesResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "reserveType": _choice(rng, ReserveType),
+                "direction": _choice(rng, Direction),
+                "activationType": _choice(rng, ActivationType),
+                "standardProduct": rng.random() < 0.8,
+            },
+            make_item=lambda rng: {"volume": _volume(rng)},
+        ),
+        SyntheticEndpoint(
+            path="/balancing/energy/offered-volumes",
+            config=flatten.ENERGY_OFFERED,
+            response_model=BalancingEnergyVolumesResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "reserveType": _choice(rng, ReserveType),
+                "direction": _choice(rng, Direction),
+                "activationType": _choice(rng, ActivationType),
+                "standardProduct": rng.random() < 0.8,
+            },
+            make_item=lambda rng: {"volume": _volume(rng)},
+        ),
+        SyntheticEndpoint(
+            path="/balancing/energy/prices",
+            config=flatten.ENERGY_PRICES,
+            response_model=BalancingEnergyPricesResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "reserveType": _choice(rng, ReserveType),
+                "direction": _choice(rng, Direction),
+                "activationType": _choice(rng, ActivationType),
+                "currency": _choice(rng, Currency),
+                "standardProduct": rng.random() < 0.8,
+            },
+            make_item=lambda rng: {"price": _price(rng)},
+        ),
+        SyntheticEndpoint(
+            path="/balancing/energy/bids",
+            config=flatten.ENERGY_BIDS,
+            response_model=BalancingEnergyBidsResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "reserveType": _choice(rng, ReserveType),
+                "direction": _choice(rng, Direction),
+                "currency": _choice(rng, Currency),
+                "standardProduct": rng.random() < 0.8,
+            },
+            make_item=lambda rng: {"volume": _volume(rng), "price": _price(rng)},
+            items_per_period=10,
+            paginated=True,
+        ),
+        SyntheticEndpoint(
+            path="/balancing/capacity/bids",
+            config=flatten.CAPACITY_BIDS,
+            response_model=BalancingCapacityBidsResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "reserveType": _choice(rng, ReserveType),
+                "direction": _choice(rng, Direction),
+                "currency": _choice(rng, Currency),
+            },
+            make_item=lambda rng: {
+                "capacity": _volume(rng),
+                "price": _price(rng),
+                "status": _choice(rng, BidStatus),
+            },
+            items_per_period=10,
+            paginated=True,
+        ),
+        SyntheticEndpoint(
+            path="/balancing/capacity/prices",
+            config=flatten.CAPACITY_PRICES,
+            response_model=BalancingCapacityPricesResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "reserveType": _choice(rng, ReserveType),
+                "direction": _choice(rng, Direction),
+                "currency": _choice(rng, Currency),
+                "procuredAt": "2024-12-31T10:00:00Z",
+            },
+            make_item=lambda rng: {"price": _price(rng)},
+        ),
+        SyntheticEndpoint(
+            path="/balancing/capacity/procured-volumes",
+            config=flatten.CAPACITY_PROCURED,
+            response_model=BalancingCapacityVolumesResponse,
+            make_group=lambda rng, area: {
+                **_area_fields(rng, area),
+                "reserveType": _choice(rng, ReserveType),
+                "direction": _choice(rng, Direction),
+                "procuredAt": "2024-12-31T10:00:00Z",
+            },
+            make_item=lambda rng: {"volume": _volume(rng)},
+        ),
+        SyntheticEndpoint(
+            path="/balancing/capacity/cross-zonal-allocation",
+            config=flatten.CAPACITY_CROSS_ZONAL,
+            response_model=CrossZonalCapacityAllocationResponse,
+            make_group=lambda rng, area: {
+                "fromArea": area or rng.choice(_AREAS),
+                "fromEicCode": rng.choice(_EIC_CODES),
+                "toArea": rng.choice(_AREAS),
+                "toEicCode": rng.choice(_EIC_CODES),
+                "reserveType": _choice(rng, ReserveType),
+            },
+            make_item=lambda rng: {"volume": _volume(rng)},
+        ),
+    )
+}
+
+ENDPOINTS_BY_PATH: dict[str, SyntheticEndpoint] = {e.path: e for e in ENDPOINTS.values()}
+
+
+def _isoformat(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def generate_groups(
+    endpoint: SyntheticEndpoint,
+    *,
+    start: datetime,
+    end: datetime,
+    n_groups: int,
+    resolution: timedelta = DEFAULT_RESOLUTION,
+    area: str | None = None,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Build ``n_groups`` data[] groups, each covering every period in ``[start, end)``."""
+    rng = random.Random(seed)
+    n_periods = max(0, math.ceil((end - start) / resolution))
+    periods = [
+        {"startAt": _isoformat(start + i * resolution), "endAt": _isoformat(start + (i + 1) * resolution)}
+        for i in range(n_periods)
+    ]
+    groups = []
+    for _ in range(n_groups):
+        group = endpoint.make_group(rng, area)
+        group[endpoint.items_field] = [
+            {"period": period, **endpoint.make_item(rng)}
+            for period in periods
+            for _ in range(endpoint.items_per_period)
+        ]
+        groups.append(group)
+    return groups
+
+
+def generate_payload(
+    endpoint: SyntheticEndpoint | str,
+    n_items: int,
+    *,
+    start: datetime = DEFAULT_START,
+    periods_per_group: int = 96,
+    resolution: timedelta = DEFAULT_RESOLUTION,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Build a complete single-page response payload holding exactly ``n_items`` nested items.
+
+    Items are spread over as many groups as needed, each covering ``periods_per_group``
+    periods (one day of 15-minute periods by default) with ``items_per_period`` items each.
+    """
+    if isinstance(endpoint, str):
+        endpoint = ENDPOINTS[endpoint]
+    end = start + periods_per_group * resolution
+    per_group = periods_per_group * endpoint.items_per_period
+    groups = generate_groups(
+        endpoint,
+        start=start,
+        end=end,
+        n_groups=math.ceil(n_items / per_group),
+        resolution=resolution,
+        seed=seed,
+    )
+    surplus = len(groups) * per_group - n_items
+    if surplus:
+        del groups[-1][endpoint.items_field][per_group - surplus:]
+    return {
+        "queriedPeriod": {"startAt": _isoformat(start), "endAt": _isoformat(end)},
+        "hasMore": False,
+        "nextCursor": None,
+        "data": groups,
+    }
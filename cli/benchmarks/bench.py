@@ -0,0 +1,233 @@
+"""Offline benchmarks for the parse -> flatten -> write hot path.
+
+Usage:
+    python benchmarks/bench.py run --items 10000 --items 1000000 --save main
+    python benchmarks/bench.py compare main --threshold 0.15
+    python benchmarks/bench.py replay recorded.jsonl.gz
+
+Every stage is timed on a synthetic, schema-valid payload (see
+``balancing_services_cli.synthetic``). Wall time is the best of ``--repeat`` runs;
+peak memory is measured with tracemalloc in a separate run so that tracing
+overhead does not distort the timings.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import click
+
+from balancing_services_cli.cassette import load_cassette
+from balancing_services_cli.flatten import flatten_response
+from balancing_services_cli.output import write_rows
+from balancing_services_cli.synthetic import ENDPOINTS, SyntheticEndpoint, generate_payload
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+STAGES = ("json_decode", "from_dict", "flatten", "write_csv", "write_parquet")
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _measure(fn: Callable[[], Any], repeat: int, trace_memory: bool) -> dict[str, float]:
+    """Return the best wall time over ``repeat`` runs and, optionally, the traced peak memory."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    result = {"seconds": best}
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_bytes"] = peak
+    return result
+
+
+def bench_endpoint(endpoint: SyntheticEndpoint, n_items: int, repeat: int, trace_memory: bool) -> dict[str, Any]:
+    """Benchmark every stage of the pipeline for one endpoint and payload size."""
+    body = json.dumps(generate_payload(endpoint, n_items)).encode()
+    decoded = json.loads(body)
+    parsed = endpoint.response_model.from_dict(decoded)
+    rows = flatten_response(parsed.data, endpoint.config)
+
+    results: dict[str, Any] = {"payload_bytes": len(body)}
+    results["json_decode"] = _measure(lambda: json.loads(body), repeat, trace_memory)
+    results["from_dict"] = _measure(lambda: endpoint.response_model.from_dict(decoded), repeat, trace_memory)
+    results["flatten"] = _measure(lambda: flatten_response(parsed.data, endpoint.config), repeat, trace_memory)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "out.csv")
+        results["write_csv"] = _measure(lambda: write_rows(rows, csv_path, "csv"), repeat, trace_memory)
+        if _has_pyarrow():
+            parquet_path = os.path.join(tmp, "out.parquet")
+            results["write_parquet"] = _measure(
+                lambda: write_rows(rows, parquet_path, "parquet"), repeat, trace_memory
+            )
+    return results
+
+
+def run_suite(endpoints: list[str], sizes: list[int], repeat: int, trace_memory: bool) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name in endpoints:
+        for n_items in sizes:
+            click.echo(f"  {name} x {n_items:,} ...", err=True)
+            results.setdefault(name, {})[str(n_items)] = bench_endpoint(
+                ENDPOINTS[name], n_items, repeat, trace_memory
+            )
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "trace_memory": trace_memory,
+        },
+        "results": results,
+    }
+
+
+def _format_bytes(n: float | None) -> str:
+    if n is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def print_report(suite: dict[str, Any]) -> None:
+    click.echo(f"{'endpoint':<22} {'items':>10} {'stage':<14} {'seconds':>10} {'items/s':>12} {'peak mem':>10}")
+    for name, by_size in suite["results"].items():
+        for size, stages in by_size.items():
+            for stage in STAGES:
+                if stage not in stages:
+                    continue
+                seconds = stages[stage]["seconds"]
+                rate = int(size) / seconds if seconds else float("inf")
+                peak = _format_bytes(stages[stage].get("peak_bytes"))
+                click.echo(f"{name:<22} {int(size):>10,} {stage:<14} {seconds:>10.4f} {rate:>12,.0f} {peak:>10}")
+
+
+@click.group()
+def main() -> None:
+    """Benchmark suite for the parse -> flatten -> write hot path (runs offline)."""
+
+
+@main.command()
+@click.option(
+    "--endpoint",
+    "endpoints",
+    multiple=True,
+    type=click.Choice(sorted(ENDPOINTS)),
+    help="Endpoint to benchmark (repeatable); default: all.",
+)
+@click.option(
+    "--items", "sizes", multiple=True, type=int, help="Nested items per payload (repeatable); default: 10000."
+)
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per stage; the best is reported.")
+@click.option("--memory/--no-memory", default=True, show_default=True, help="Also measure peak memory (tracemalloc).")
+@click.option("--save", default=None, help="Store the results as baseline NAME in benchmarks/baselines/.")
+def run(endpoints: tuple[str, ...], sizes: tuple[int, ...], repeat: int, memory: bool, save: str | None) -> None:
+    """Run the benchmarks and print a report."""
+    suite = run_suite(list(endpoints or sorted(ENDPOINTS)), list(sizes or (10_000,)), repeat, memory)
+    print_report(suite)
+    if save:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        path = BASELINES_DIR / f"{save}.json"
+        path.write_text(json.dumps(suite, indent=2) + "\n")
+        click.echo(f"Saved baseline to {path}", err=True)
+
+
+@main.command()
+@click.argument("baseline")
+@click.option("--threshold", default=0.10, show_default=True, help="Allowed relative slowdown before failing.")
+@click.option("--repeat", default=None, type=int, help="Timed runs per stage; default: as in the baseline.")
+def compare(baseline: str, threshold: float, repeat: int | None) -> None:
+    """Re-run the endpoints and sizes of BASELINE and report changes; exit 1 on regressions."""
+    path = BASELINES_DIR / f"{baseline}.json"
+    if not path.exists():
+        raise click.ClickException(f"Baseline not found: {path}")
+    old = json.loads(path.read_text())
+    endpoints = list(old["results"])
+    sizes = sorted({int(size) for by_size in old["results"].values() for size in by_size})
+    trace_memory = old["meta"].get("trace_memory", True)
+    new = run_suite(endpoints, sizes, repeat or old["meta"]["repeat"], trace_memory)
+
+    regressions = 0
+    click.echo(f"{'endpoint':<22} {'items':>10} {'stage':<14} {'old s':>10} {'new s':>10} {'change':>8}")
+    for name, by_size in new["results"].items():
+        for size, stages in by_size.items():
+            for stage in STAGES:
+                before = old["results"].get(name, {}).get(size, {}).get(stage)
+                after = stages.get(stage)
+                if before is None or after is None:
+                    continue
+                change = after["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+                marker = ""
+                if change > threshold:
+                    regressions += 1
+                    marker = "  REGRESSION"
+                click.echo(
+                    f"{name:<22} {int(size):>10,} {stage:<14} {before['seconds']:>10.4f} "
+                    f"{after['seconds']:>10.4f} {change:>+8.1%}{marker}"
+                )
+    if regressions:
+        click.echo(f"{regressions} stage(s) slower than the baseline by more than {threshold:.0%}.", err=True)
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("cassette", type=click.Path(exists=True, dir_okay=False))
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per stage; the best is reported.")
+def replay(cassette: str, repeat: int) -> None:
+    """Time decode, parse and flatten of the successful responses recorded in CASSETTE (see --record)."""
+    bodies: dict[str, list[bytes]] = {}
+    for record in load_cassette(cassette):
+        path = record["url"].split("?", 1)[0]
+        endpoint = next((e for e in ENDPOINTS.values() if path.endswith(e.path)), None)
+        if endpoint is not None and record["status"] == 200 and "body" in record:
+            bodies.setdefault(endpoint.name, []).append(record["body"].encode())
+    if not bodies:
+        raise click.ClickException(f"No successful API responses in {cassette}")
+
+    click.echo(f"{'endpoint':<22} {'responses':>10} {'rows':>10} {'stage':<14} {'seconds':>10} {'rows/s':>12}")
+    for name, payloads in sorted(bodies.items()):
+        endpoint = ENDPOINTS[name]
+        decoded = [json.loads(body) for body in payloads]
+        parsed = [endpoint.response_model.from_dict(d) for d in decoded]
+        n_rows = sum(len(flatten_response(p.data, endpoint.config)) for p in parsed)
+        stages = {
+            "json_decode": lambda: [json.loads(body) for body in payloads],
+            "from_dict": lambda: [endpoint.response_model.from_dict(d) for d in decoded],
+            "flatten": lambda: [flatten_response(p.data, endpoint.config) for p in parsed],
+        }
+        for stage, fn in stages.items():
+            seconds = _measure(fn, repeat, trace_memory=False)["seconds"]
+            rate = n_rows / seconds if seconds else float("inf")
+            click.echo(f"{name:<22} {len(payloads):>10,} {n_rows:>10,} {stage:<14} {seconds:>10.4f} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Tests for resampling and group-by aggregation."""
+
+from __future__ import annotations
+
+import json
+
+import pyarrow as pa
+import pytest
+from click.testing import CliRunner
+
+from balancing_services_cli.aggregate import (
+    Aggregation,
+    AggregationSpec,
+    aggregate_table,
+    parse_aggregations,
+    parse_resample,
+)
+from balancing_services_cli.flatten import ENERGY_BIDS, IMBALANCE_PRICES
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+
+
+def _row(area: str, minute: int, price: float | None, direction: str = "positive") -> dict:
+    start = f"2025-01-01T{minute // 60:02d}:{minute % 60:02d}:00+00:00"
+    end_minute = minute + 15
+    end = f"2025-01-01T{end_minute // 60:02d}:{end_minute % 60:02d}:00+00:00"
+    return {
+        "area": area,
+        "eic_code": area,
+        "currency": "EUR",
+        "direction": direction,
+        "periodStartAt": start,
+        "periodEndAt": end,
+        "price": price,
+    }
+
+
+ROWS = [_row("EE", m, float(m)) for m in range(0, 120, 15)] + [_row("LV", 45, 7.0), _row("LV", 0, None)]
+
+
+def test_parse_options():
+    assert parse_resample("15min") == (15, "minute")
+    assert parse_resample("1d") == (1, "day")
+    assert parse_aggregations("price:max, price:wmean:volume") == (
+        Aggregation("price", "max"),
+        Aggregation("price", "wmean", "volume"),
+    )
+    for bad in ("price", "price:median", "price:wmean", "price:sum:volume"):
+        with pytest.raises(SystemExit, match="Invalid --agg"):
+            parse_aggregations(bad)
+    with pytest.raises(SystemExit, match="Invalid --resample"):
+        parse_resample("1w")
+
+
+def test_hourly_resample_per_group():
+    spec = AggregationSpec(resample=(1, "hour"), aggregations=parse_aggregations("price:mean,price:last,price:sum"))
+    result = aggregate_table(pa.Table.from_pylist(list(reversed(ROWS))), IMBALANCE_PRICES, spec).to_pylist()
+
+    assert [(r["area"], r["periodStartAt"], r["periodEndAt"]) for r in result] == [
+        ("EE", "2025-01-01T00:00:00+00:00", "2025-01-01T01:00:00+00:00"),
+        ("EE", "2025-01-01T01:00:00+00:00", "2025-01-01T02:00:00+00:00"),
+        ("LV", "2025-01-01T00:00:00+00:00", "2025-01-01T01:00:00+00:00"),
+    ]
+    assert [r["price_mean"] for r in result] == [22.5, 82.5, 7.0]
+    assert [r["price_last"] for r in result] == [45.0, 105.0, 7.0]
+    assert result[0]["price_sum"] == 90.0
+
+
+def test_group_by_window_and_default_mean():
+    spec = AggregationSpec(group_by=("currency",))
+    result = aggregate_table(pa.Table.from_pylist(ROWS), IMBALANCE_PRICES, spec).to_pylist()
+    assert result == [
+        {
+            "currency": "EUR",
+            "periodStartAt": "2025-01-01T00:00:00+00:00",
+            "periodEndAt": "2025-01-01T02:00:00+00:00",
+            "price_mean": pytest.approx((sum(range(0, 120, 15)) + 7.0) / 9),
+        }
+    ]
+
+
+def test_weighted_mean_ignores_nulls():
+    rows = [
+        {
+            "area": "EE",
+            "periodStartAt": "2025-01-01T00:00:00+00:00",
+            "periodEndAt": "2025-01-01T00:15:00+00:00",
+            "price": price,
+            "volume": volume,
+        }
+        for price, volume in ((10.0, 1.0), (40.0, 3.0), (None, 100.0), (1000.0, None))
+    ]
+    wmean = parse_aggregations("price:wmean:volume")
+    spec = AggregationSpec(resample=(1, "day"), group_by=("area",), aggregations=wmean)
+    [result] = aggregate_table(pa.Table.from_pylist(rows), ENERGY_BIDS, spec).to_pylist()
+    assert result["price_wmean"] == 32.5
+    assert result["periodEndAt"] == "2025-01-02T00:00:00+00:00"
+
+
+def test_unknown_column():
+    spec = AggregationSpec(aggregations=(Aggregation("volume", "sum"),))
+    with pytest.raises(SystemExit, match="Unknown column"):
+        aggregate_table(pa.Table.from_pylist(ROWS), IMBALANCE_PRICES, spec)
+
+
+def test_cli_resample_bids():
+    args = [
+        "energy-bids",
+        "--all",
+        "--area",
+        "EE",
+        "--reserve-type",
+        "mFRR",
+        "--start",
+        "2025-01-01T00:00:00Z",
+        "--end",
+        "2025-01-01T06:00:00Z",
+    ]
+    options = ["-f", "jsonl", "--resample", "1h", "--group-by", "area", "--agg", "price:wmean:volume,volume:sum"]
+    with running_server(MockServerConfig(groups=2)) as server:
+        base = ["--token", "t", "--base-url", server.base_url, *options]
+        result = CliRunner().invoke(cli, [*base, *args])
+        parallel = CliRunner().invoke(cli, [*base, *args, "--workers", "2"])
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert len(rows) == 6
+    assert set(rows[0]) == {"area", "periodStartAt", "periodEndAt", "price_wmean", "volume_sum"}
+    assert parallel.exit_code == 0, parallel.output
+    assert parallel.output == result.output
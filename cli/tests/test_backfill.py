@@ -0,0 +1,164 @@
+"""Tests for sharded backfills from a shared queue."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pyarrow.parquet as pq
+import pytest
+from click.testing import CliRunner
+
+from balancing_services_cli.backfill import ShardQueue, parse_shard, plan_shards, run_worker
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+
+START = datetime(2025, 1, 1, 6, tzinfo=timezone.utc)
+END = datetime(2025, 1, 3, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_plan_shards():
+    shards = plan_shards(
+        ["imbalance-prices", "energy-bids"], ["EE", "LV"], ["aFRR", "mFRR"], START, END, parse_shard("1d")
+    )
+    assert len(shards) == 2 * 2 + 2 * 2 * 2
+    midnight = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    assert sorted({(s.start, s.end) for s in shards}) == [(START, midnight), (midnight, END)]
+    assert {s.reserve_type for s in shards if s.endpoint == "imbalance-prices"} == {""}
+    assert shards[0].path("out", "parquet").endswith("imbalance-prices/EE/20250101T060000Z.parquet")
+    with pytest.raises(SystemExit):
+        parse_shard("15min")
+
+
+def test_queue_leases_retries_and_completion(tmp_path):
+    clock = FakeClock()
+    queue = ShardQueue(str(tmp_path / "q.sqlite"), clock=clock)
+    shards = plan_shards(["imbalance-prices"], ["EE"], [], START, END, timedelta(days=1))
+    assert queue.add(shards) == 2
+    assert queue.add(shards) == 0
+
+    first = queue.lease("a", 60, max_attempts=2)
+    second = queue.lease("b", 60, max_attempts=2)
+    assert (first.id, first.attempts, second.id) == (1, 1, 2)
+    assert queue.lease("c", 60, max_attempts=2) is None
+    assert not queue.renew(first, "b", 60)
+
+    # A failed shard comes back after the retry delay; its last allowed attempt fails it for good.
+    queue.fail(first, "a", "boom", max_attempts=2, retry_delay=10)
+    assert queue.lease("c", 60, max_attempts=2) is None
+    clock.now += 10
+    retried = queue.lease("c", 60, max_attempts=2)
+    assert (retried.id, retried.attempts) == (1, 2)
+    queue.fail(retried, "c", "boom again", max_attempts=2, retry_delay=10)
+    assert [(shard.id, error) for shard, error in queue.errors()] == [(1, "boom again")]
+
+    # An expired lease is taken over; completing twice is harmless.
+    clock.now += 61
+    taken = queue.lease("d", 60, max_attempts=2)
+    assert taken.id == 2
+    assert queue.complete(taken, 5) and not queue.complete(second, 5)
+    assert queue.counts() == {"done": 1, "failed": 1}
+    assert queue.next_available() is None
+    assert queue.retry_failed() == 1
+    assert queue.lease("e", 60, max_attempts=2).attempts == 1
+
+
+def test_worker_fails_shard_on_unexpected_error(tmp_path):
+    queue = ShardQueue(str(tmp_path / "q.sqlite"))
+    queue.add(plan_shards(["imbalance-prices"], ["EE"], [], START, END, timedelta(days=1)))
+    with patch("balancing_services_cli.backfill.fetch_shard", side_effect=KeyError("prices")):
+        stats = run_worker(queue, None, str(tmp_path), "csv", max_attempts=1)
+    assert stats == {"failed": 2}
+    assert [error for _, error in queue.errors()] == ["'prices'", "'prices'"]
+
+
+def _backfill(server, tmp_path, *args):
+    base = ["--token", "t", "--base-url", server.base_url, "-o", str(tmp_path / "out")]
+    return CliRunner().invoke(cli, [*base, "backfill", *args])
+
+
+def test_cli_backfill(tmp_path):
+    queue = str(tmp_path / "q.sqlite")
+    plan = [
+        "plan",
+        queue,
+        "--endpoint",
+        "energy-bids",
+        "--endpoint",
+        "imbalance-prices",
+        "--area",
+        "EE,lv",
+        "--reserve-type",
+        "aFRR",
+        "--start",
+        START.isoformat(),
+        "--end",
+        END.isoformat(),
+    ]
+    with running_server(MockServerConfig(groups=2)) as server:
+        planned = _backfill(server, tmp_path, *plan)
+        worked = _backfill(server, tmp_path, "work", queue, "--workers", "3", "--lease", "5")
+        requests = sum(server.stats.values())
+        again = _backfill(server, tmp_path, "work", queue)
+        assert sum(server.stats.values()) == requests
+    assert planned.exit_code == 0, planned.output
+    assert worked.exit_code == 0, worked.output
+    assert "Processed 8 shard(s)" in worked.output
+    files = sorted((tmp_path / "out").rglob("*.parquet"))
+    assert len(files) == 8
+    assert not list((tmp_path / "out").rglob("*.tmp"))
+    assert files[0].relative_to(tmp_path / "out").parts[:3] == ("energy-bids", "EE", "aFRR")
+    rows = sum(pq.read_metadata(path).num_rows for path in files)
+    assert f"{rows} row(s)" in worked.output
+    assert again.exit_code == 0 and "Processed 0 shard(s)" in again.output
+
+
+def test_cli_backfill_failures(tmp_path):
+    queue = str(tmp_path / "q.sqlite")
+    plan = [
+        "plan",
+        queue,
+        "--endpoint",
+        "imbalance-prices",
+        "--area",
+        "EE",
+        "--start",
+        START.isoformat(),
+        "--end",
+        END.isoformat(),
+        "--shard",
+        "2d",
+    ]
+    with running_server(MockServerConfig(rate_5xx=1.0)) as server:
+        assert _backfill(server, tmp_path, *plan).exit_code == 0
+        worked = _backfill(server, tmp_path, "work", queue, "--max-attempts", "2", "--retry-delay", "0")
+        status = _backfill(server, tmp_path, "status", queue, "--retry-failed")
+        missing = _backfill(
+            server,
+            tmp_path,
+            "plan",
+            queue,
+            "--endpoint",
+            "energy-bids",
+            "--area",
+            "EE",
+            "--start",
+            START.isoformat(),
+            "--end",
+            END.isoformat(),
+        )
+    assert worked.exit_code != 0
+    # 2d windows are aligned to the epoch, so this range spans two shards.
+    assert "4 failed attempt(s)" in worked.output and "2 failed" in worked.output
+    assert "failed: imbalance-prices EE - 2025-01-01T06:00:00+00:00..2025-01-02T00:00:00+00:00" in status.output
+    assert "Requeued 2 failed shard(s)" in status.output and "pending: 2" in status.output
+    assert missing.exit_code != 0 and "--reserve-type is required" in missing.output
+    assert ShardQueue(queue).counts() == {"pending": 2}
@@ -0,0 +1,57 @@
+"""Tests for thread-pool batch fetching."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_imbalance_prices
+from balancing_services.models import Area
+
+from balancing_services_cli.batch import EndpointCall, fetch_many
+from balancing_services_cli.mock_server import LatencyModel, MockServerConfig, running_server
+
+WINDOW = {
+    "period_start_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+    "period_end_at": datetime(2025, 1, 2, tzinfo=timezone.utc),
+}
+AREAS = [Area.EE, Area.LV, Area.LT, Area.FI, Area.SE1, Area.SE2, Area.SE3, Area.SE4]
+
+
+def _calls() -> list[EndpointCall]:
+    return [EndpointCall(get_imbalance_prices, {"area": area, **WINDOW}) for area in AREAS]
+
+
+def test_results_in_submission_order_run_in_parallel():
+    with running_server(MockServerConfig(groups=1, latency=LatencyModel(ms=200))) as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        t0 = time.perf_counter()
+        results = list(fetch_many(client, _calls(), max_workers=8))
+        elapsed = time.perf_counter() - t0
+
+    assert [r.index for r in results] == list(range(len(AREAS)))
+    assert all(r.ok for r in results)
+    assert [r.response.parsed.data[0].area for r in results] == AREAS
+    assert elapsed < 0.2 * len(AREAS) / 2
+
+
+def test_as_completed_and_error_isolation():
+    calls = _calls()
+    calls.insert(3, EndpointCall(get_imbalance_prices, {"area": Area.EE}))  # missing arguments: raises TypeError
+    with running_server() as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        results = list(fetch_many(client, calls, max_workers=4, ordered=False))
+
+    assert sorted(r.index for r in results) == list(range(len(calls)))
+    failed = [r for r in results if not r.ok]
+    assert len(failed) == 1 and failed[0].index == 3
+    assert isinstance(failed[0].error, TypeError) and failed[0].response is None
+
+
+def test_http_errors_are_results():
+    with running_server(MockServerConfig(rate_429=1.0)) as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        results = list(fetch_many(client, _calls()[:3]))
+    assert [r.response.status_code for r in results] == [429, 429, 429]
+    assert not any(r.ok for r in results)
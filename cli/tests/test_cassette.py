@@ -0,0 +1,111 @@
+"""Tests for the record/replay transports, recorded against the mock API server."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_balancing_energy_bids, get_imbalance_prices
+from balancing_services.models import Area, ReserveType
+from click.testing import CliRunner
+
+from balancing_services_cli.cassette import CassetteMissError, RecordingTransport, ReplayTransport, load_cassette
+from balancing_services_cli.flatten import ENERGY_BIDS, IMBALANCE_PRICES, flatten_response
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import LatencyModel, MockServerConfig, running_server
+from balancing_services_cli.pagination import fetch_all_pages
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 1, 1, 6, tzinfo=timezone.utc)
+BIDS_KWARGS = dict(area=Area.LV, period_start_at=START, period_end_at=END, reserve_type=ReserveType.MFRR, limit=100)
+
+
+def _client(base_url: str, transport) -> AuthenticatedClient:
+    return AuthenticatedClient(base_url=base_url, token="secret-token", httpx_args={"transport": transport})
+
+
+def test_record_then_replay_paginated(tmp_path):
+    cassette = str(tmp_path / "bids.jsonl.gz")
+    with running_server(MockServerConfig(groups=2)) as server:
+        recorder = RecordingTransport(cassette)
+        recorded = fetch_all_pages(
+            get_balancing_energy_bids.sync_detailed, client=_client(server.base_url, recorder), **BIDS_KWARGS
+        )
+        recorder.close()
+
+    records = load_cassette(cassette)
+    assert len(records) == 5
+    assert all(r["status"] == 200 and r["latency"] >= 0 for r in records)
+    assert "secret-token" not in str(records)
+
+    replayed = fetch_all_pages(
+        get_balancing_energy_bids.sync_detailed,
+        client=_client("http://offline.invalid", ReplayTransport(cassette)),
+        **BIDS_KWARGS,
+    )
+    assert flatten_response(replayed, ENERGY_BIDS) == flatten_response(recorded, ENERGY_BIDS)
+
+
+def test_replay_miss(tmp_path):
+    cassette = str(tmp_path / "empty.jsonl.gz")
+    RecordingTransport(cassette).close()
+    client = _client("http://offline.invalid", ReplayTransport(cassette))
+    with pytest.raises(CassetteMissError):
+        get_imbalance_prices.sync_detailed(client=client, area=Area.EE, period_start_at=START, period_end_at=END)
+
+
+def test_replay_scaled_latency(tmp_path):
+    cassette = str(tmp_path / "slow.jsonl.gz")
+    with running_server(MockServerConfig(latency=LatencyModel(ms=100))) as server:
+        recorder = RecordingTransport(cassette)
+        get_imbalance_prices.sync_detailed(
+            client=_client(server.base_url, recorder), area=Area.EE, period_start_at=START, period_end_at=END
+        )
+        recorder.close()
+    assert load_cassette(cassette)[0]["latency"] >= 0.1
+
+    def replay(scale: float) -> float:
+        client = _client("http://offline.invalid", ReplayTransport(cassette, latency_scale=scale))
+        t0 = time.perf_counter()
+        get_imbalance_prices.sync_detailed(client=client, area=Area.EE, period_start_at=START, period_end_at=END)
+        return time.perf_counter() - t0
+
+    assert replay(0.0) < 0.1
+    assert replay(0.5) >= 0.05
+
+
+def test_async_record_and_replay(tmp_path):
+    cassette = str(tmp_path / "async.jsonl.gz")
+
+    async def fetch(base_url: str, transport):
+        async with _client(base_url, transport) as client:
+            response = await get_imbalance_prices.asyncio_detailed(
+                client=client, area=Area.EE, period_start_at=START, period_end_at=END
+            )
+        return flatten_response(response.parsed.data, IMBALANCE_PRICES)
+
+    with running_server(MockServerConfig(groups=2)) as server:
+        recorded = asyncio.run(fetch(server.base_url, RecordingTransport(cassette)))
+    assert asyncio.run(fetch("http://offline.invalid", ReplayTransport(cassette))) == recorded
+
+
+def test_cli_record_and_replay(tmp_path):
+    cassette = str(tmp_path / "cli.jsonl.gz")
+    args = ["imbalance-prices", "--area", "EE", "--start", "2025-01-01T00:00:00Z", "--end", "2025-01-01T06:00:00Z"]
+    runner = CliRunner()
+    with running_server(MockServerConfig(groups=2)) as server:
+        recorded = runner.invoke(cli, ["--token", "t", "--base-url", server.base_url, "--record", cassette, *args])
+    assert recorded.exit_code == 0, recorded.output
+
+    replayed = runner.invoke(cli, ["--base-url", "http://offline.invalid", "--replay", cassette, *args])
+    assert replayed.exit_code == 0, replayed.output
+    assert replayed.output == recorded.output
+    assert len(replayed.output.splitlines()) == 1 + 2 * 24
+
+
+def test_cli_record_and_replay_exclusive(tmp_path):
+    result = CliRunner().invoke(cli, ["--record", "a.gz", "--replay", "b.gz", "imbalance-prices", "--help"])
+    assert result.exit_code != 0
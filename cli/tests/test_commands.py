@@ -148,6 +148,35 @@ def test_imbalance_prices_csv_output():
     assert "45.5" in result.output
 
 
+def test_imbalance_prices_jsonl_output():
+    runner = CliRunner()
+    with patch(
+        "balancing_services_cli.commands.imbalance.get_imbalance_prices.sync_detailed",
+        return_value=_make_imbalance_prices_response(),
+    ):
+        result = runner.invoke(
+            cli,
+            [
+                "--token",
+                "test-token",
+                "--format",
+                "jsonl",
+                "imbalance-prices",
+                "--area",
+                "EE",
+                "--start",
+                "2025-01-01",
+                "--end",
+                "2025-01-02",
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    row = json.loads(result.output)
+    assert row["area"] == "EE"
+    assert row["price"] == 45.5
+    assert row["periodStartAt"] == "2025-01-01T00:00:00+00:00"
+
+
 def test_missing_token():
     runner = CliRunner()
     with patch(
@@ -295,6 +324,23 @@ def test_energy_bids_first_page_flag():
     assert result.exit_code == 0, result.output
 
 
+def test_bids_resume_writes_and_removes_checkpoint(tmp_path):
+    output = tmp_path / "bids.jsonl"
+    runner = CliRunner()
+    for cmd, module in (
+        ("energy-bids", "energy.get_balancing_energy_bids"),
+        ("capacity-bids", "capacity.get_balancing_capacity_bids"),
+    ):
+        with patch(f"balancing_services_cli.commands.{module}.sync_detailed", return_value=_make_bids_response()):
+            args = ["--token", "test-token", "-o", str(output), cmd, "--all", "--resume", *COMMON_BID_ARGS]
+            result = runner.invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert output.exists() and not (tmp_path / "bids.jsonl.checkpoint.json").exists()
+
+        result = runner.invoke(cli, ["--token", "test-token", cmd, "--first-page", "--resume", *COMMON_BID_ARGS])
+        assert result.exit_code != 0 and "--resume requires --all" in result.output
+
+
 def test_capacity_bids_all_flag():
     runner = CliRunner()
     with patch(
@@ -0,0 +1,82 @@
+"""Tests for conditional requests against the mock server."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_imbalance_prices
+from balancing_services.models import Area
+
+from balancing_services_cli.conditional import ConditionalTransport
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+
+KWARGS = dict(
+    area=Area.EE,
+    period_start_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    period_end_at=datetime(2025, 1, 2, tzinfo=timezone.utc),
+)
+
+
+def _client(server, transport: ConditionalTransport) -> AuthenticatedClient:
+    return AuthenticatedClient(base_url=server.base_url, token="t", httpx_args={"transport": transport})
+
+
+def test_mock_server_answers_conditional_requests():
+    with running_server() as server:
+        url = f"{server.base_url}/imbalance/prices"
+        params = {"area": "EE", "period-start-at": "2025-01-01T00:00:00Z", "period-end-at": "2025-01-02T00:00:00Z"}
+        first = httpx.get(url, params=params)
+        etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+        assert httpx.get(url, params=params, headers={"If-None-Match": etag}).status_code == 304
+        assert httpx.get(url, params=params, headers={"If-None-Match": '"other"'}).status_code == 200
+        assert httpx.get(url, params=params, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_not_modified_served_from_store():
+    transport = ConditionalTransport()
+    with running_server() as server:
+        client = _client(server, transport)
+        first = get_imbalance_prices.sync_detailed(client=client, **KWARGS)
+        second = get_imbalance_prices.sync_detailed(client=client, **KWARGS)
+        statuses = dict(server.stats)
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.parsed.data[0].prices[0].price == first.parsed.data[0].prices[0].price
+    assert statuses == {("/imbalance/prices", 200): 1, ("/imbalance/prices", 304): 1}
+    assert transport.stats == {"stored": 1, "conditional": 1, "not_modified": 1}
+
+
+def test_without_validators_requests_are_unconditional():
+    transport = ConditionalTransport()
+    with running_server(MockServerConfig(validators=False)) as server:
+        client = _client(server, transport)
+        for _ in range(2):
+            assert get_imbalance_prices.sync_detailed(client=client, **KWARGS).status_code == 200
+        assert server.stats == {("/imbalance/prices", 200): 2}
+    assert transport.stats == {}
+
+
+def test_store_is_bounded():
+    transport = ConditionalTransport(max_bytes=1)
+    with running_server() as server:
+        client = _client(server, transport)
+        for _ in range(2):
+            get_imbalance_prices.sync_detailed(client=client, **KWARGS)
+        assert server.stats == {("/imbalance/prices", 200): 2}
+
+
+def test_async_client():
+    transport = ConditionalTransport()
+
+    async def fetch(server):
+        async with _client(server, transport) as client:
+            responses = [await get_imbalance_prices.asyncio_detailed(client=client, **KWARGS) for _ in range(3)]
+        return [r.status_code for r in responses]
+
+    with running_server() as server:
+        assert asyncio.run(fetch(server)) == [200, 200, 200]
+        assert server.stats[("/imbalance/prices", 304)] == 2
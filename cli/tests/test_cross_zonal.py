@@ -0,0 +1,107 @@
+"""Tests for the cross-zonal allocation matrix."""
+
+from __future__ import annotations
+
+import csv
+import io
+
+from balancing_services.models import CrossZonalVolumes, EicCode
+from click.testing import CliRunner
+
+from balancing_services_cli.cross_zonal import CrossZonalMatrix, deduplicate
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+
+EIC = next(iter(EicCode)).value
+
+
+def _group(from_area: str, to_area: str, volumes: list[float], first_hour: int = 0) -> CrossZonalVolumes:
+    return CrossZonalVolumes.from_dict(
+        {
+            "fromArea": from_area,
+            "fromEicCode": EIC,
+            "toArea": to_area,
+            "toEicCode": EIC,
+            "reserveType": "aFRR",
+            "volumes": [
+                {
+                    "period": {
+                        "startAt": f"2025-01-01T{first_hour + i:02d}:00:00Z",
+                        "endAt": f"2025-01-01T{first_hour + i + 1:02d}:00:00Z",
+                    },
+                    "volume": volume,
+                }
+                for i, volume in enumerate(volumes)
+            ],
+        }
+    )
+
+
+GROUPS = [
+    _group("EE", "LV", [10.0, 20.0]),
+    _group("EE", "FI", [5.0]),
+    # The same border reported by LV: the first period is a duplicate, the second is new.
+    _group("EE", "LV", [99.0, 30.0], first_hour=1),
+    _group("LV", "EE", [4.0, 0.0]),
+    _group("EE", "LV", [99.0]),
+]
+
+
+def test_deduplicate_keeps_first_report():
+    unique = deduplicate(GROUPS)
+    assert [(g.from_area.value, g.to_area.value, [v.volume for v in g.volumes]) for g in unique] == [
+        ("EE", "LV", [10.0, 20.0]),
+        ("EE", "FI", [5.0]),
+        ("EE", "LV", [30.0]),
+        ("LV", "EE", [4.0, 0.0]),
+    ]
+    assert unique[0] is GROUPS[0]
+
+
+def test_matrix_dense_sparse_and_net_positions():
+    matrix = CrossZonalMatrix.from_groups(GROUPS, areas=["EE", "LV", "FI"])
+    assert matrix.shape == (3, 3, 3)
+    assert [start.hour for start, _ in matrix.periods] == [0, 1, 2]
+    assert len(matrix) == 6
+    assert list(matrix.period_index) == [0, 0, 0, 1, 1, 2]
+
+    dense = matrix.dense
+    assert dense.shape == (3, 3, 3)
+    assert [dense[p, 0, 1] for p in range(3)] == [10.0, 20.0, 30.0]
+    assert (dense[0, 1, 0], dense[0, 0, 2]) == (4.0, 5.0)
+    assert dense[2, 1, 0] == 0.0
+    assert matrix.between("EE", "LV") == [10.0, 20.0, 30.0]
+
+    net = matrix.net_positions()
+    assert net.tolist() == [[11.0, -6.0, -5.0], [20.0, -20.0, 0.0], [30.0, -30.0, 0.0]]
+    assert sum(net[1, i] for i in range(3)) == 0.0
+
+
+def test_areas_outside_the_matrix_are_ignored():
+    matrix = CrossZonalMatrix.from_groups(GROUPS, areas=["EE", "LV"])
+    assert len(matrix) == 5
+    assert matrix.net_positions()[0, 0] == 6.0
+    empty = CrossZonalMatrix.from_groups([], areas=["EE"])
+    assert empty.shape == (0, 1, 1) and len(empty.dense) == 0
+
+
+def test_cli_all_areas_net_positions():
+    args = ["--start", "2025-01-01T00:00:00Z", "--end", "2025-01-01T01:00:00Z", "--reserve-type", "aFRR"]
+    with running_server(MockServerConfig(groups=2)) as server:
+        base = ["--token", "t", "--base-url", server.base_url, "capacity-cross-zonal", *args]
+        borders = CliRunner().invoke(cli, [*base, "--all-areas"])
+        net = CliRunner().invoke(cli, [*base, "--all-areas", "--net-positions"])
+        both = CliRunner().invoke(cli, [*base, "--all-areas", "--area", "EE"])
+    assert borders.exit_code == 0, borders.output
+    border_rows = list(csv.DictReader(io.StringIO(borders.output)))
+    keys = [(r["from_area"], r["to_area"], r["periodStartAt"]) for r in border_rows]
+    assert len(keys) == len(set(keys)) > 0
+    assert net.exit_code == 0, net.output
+    net_rows = list(csv.DictReader(io.StringIO(net.output)))
+    assert set(net_rows[0]) == {"area", "reserve_type", "periodStartAt", "periodEndAt", "net_position"}
+    by_period: dict[str, float] = {}
+    for row in net_rows:
+        by_period[row["periodStartAt"]] = by_period.get(row["periodStartAt"], 0.0) + float(row["net_position"])
+    assert all(abs(total) < 1e-6 for total in by_period.values())
+    assert both.exit_code != 0
+    assert "exactly one of --area and --all-areas" in both.output
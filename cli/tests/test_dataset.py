@@ -0,0 +1,80 @@
+"""Tests for the Hive-partitioned Parquet dataset writer."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from balancing_services_cli.dataset import parse_partition_by, write_dataset
+
+
+def _rows() -> list[dict]:
+    return [
+        {"area": area, "periodStartAt": f"2025-01-0{day}T00:00:00+00:00", "price": float(day)}
+        for area in ("EE", "LV")
+        for day in (1, 2)
+    ]
+
+
+def test_parse_partition_by():
+    assert parse_partition_by(None) == ()
+    assert parse_partition_by("area, date") == ("area", "date")
+
+
+def test_write_dataset_layout_and_metadata():
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    with tempfile.TemporaryDirectory() as tmp:
+        count = write_dataset(_rows(), tmp, ("area", "date"))
+        assert count == 4
+        assert os.path.exists(os.path.join(tmp, "area=EE", "date=2025-01-02", "part-0.parquet"))
+
+        part = pq.read_table(os.path.join(tmp, "area=LV", "date=2025-01-01", "part-0.parquet"))
+        assert part.column_names == ["periodStartAt", "price"]
+
+        metadata = pq.read_metadata(os.path.join(tmp, "_metadata"))
+        assert metadata.num_rows == 4
+        assert metadata.num_row_groups == 4
+
+        table = ds.dataset(tmp, format="parquet", partitioning="hive", exclude_invalid_files=True).to_table()
+        assert sorted(table.column("price").to_pylist()) == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_write_dataset_streams_row_groups_per_partition():
+    import pyarrow.parquet as pq
+
+    rows = [{"area": "EE", "periodStartAt": "2025-01-01T00:00:00+00:00", "price": float(i)} for i in range(5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("balancing_services_cli.dataset.ARROW_BATCH_SIZE", 2):
+            write_dataset(iter(rows), tmp, ("area",))
+        metadata = pq.read_metadata(os.path.join(tmp, "area=EE", "part-0.parquet"))
+        assert metadata.num_row_groups == 3
+        assert metadata.num_rows == 5
+
+
+def test_write_dataset_unknown_column():
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.raises(SystemExit, match="Unknown partition column"):
+            write_dataset(_rows(), tmp, ("nope",))
+
+
+def test_write_dataset_requires_output():
+    with pytest.raises(SystemExit, match="requires a directory"):
+        write_dataset(_rows(), None, ("area",))
+
+
+def test_write_dataset_types_columns_null_in_first_chunk():
+    import pyarrow.parquet as pq
+
+    rows = [{"area": "EE", "periodStartAt": "2025-01-01T00:00:00+00:00", "procured_at": None, "price": None}] * 2
+    rows.append({"area": "EE", "periodStartAt": "2025-01-02T00:00:00+00:00", "procured_at": "2024-12-31", "price": 3})
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("balancing_services_cli.dataset.ARROW_BATCH_SIZE", 2):
+            write_dataset(iter(rows), tmp, ("area",))
+        table = pq.read_table(os.path.join(tmp, "area=EE", "part-0.parquet"))
+        assert [str(t) for t in table.schema.types] == ["string", "string", "double"]
+        assert table.column("price").to_pylist() == [None, None, 3.0]
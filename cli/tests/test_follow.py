@@ -0,0 +1,153 @@
+"""Tests for following endpoints as new periods are published."""
+
+from __future__ import annotations
+
+import csv
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from balancing_services.models import ImbalancePricesResponse
+from click.testing import CliRunner
+
+from balancing_services_cli.flatten import IMBALANCE_PRICES
+from balancing_services_cli.follow import FollowPolicy, floor_boundary, follow_rows
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import running_server
+from balancing_services_cli.output import write_batches
+from balancing_services_cli.synthetic import ENDPOINTS, generate_groups
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+UNTIL = T0 + timedelta(hours=2)
+POLICY = FollowPolicy()
+
+
+class FakeFeed:
+    """Imbalance prices for two groups, each period published two minutes after it ends."""
+
+    def __init__(self, now: datetime, failures: int = 0) -> None:
+        self.now = now
+        self.failures = failures
+        self.groups = generate_groups(ENDPOINTS["imbalance_prices"], start=T0, end=UNTIL, n_groups=2, seed=1)
+        self.windows: list[tuple[datetime, datetime]] = []
+        self.sleeps: list[float] = []
+
+    def clock(self) -> datetime:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += timedelta(seconds=seconds)
+
+    def sync_detailed(self, *, client, period_start_at, period_end_at, **kwargs):
+        self.windows.append((period_start_at, period_end_at))
+        if self.failures:
+            self.failures -= 1
+            return SimpleNamespace(status_code=503, parsed=None)
+        published = self.now - timedelta(minutes=2)
+
+        def visible(item) -> bool:
+            start, end = (datetime.fromisoformat(item["period"][k]) for k in ("startAt", "endAt"))
+            return start >= period_start_at and end <= min(period_end_at, published)
+
+        data = [{**g, "prices": [i for i in g["prices"] if visible(i)]} for g in self.groups]
+        payload = {
+            "queriedPeriod": {"startAt": period_start_at.isoformat(), "endAt": period_end_at.isoformat()},
+            "data": data,
+            "hasMore": False,
+        }
+        return SimpleNamespace(status_code=200, parsed=ImbalancePricesResponse.from_dict(payload))
+
+    def follow(self, **kwargs):
+        return follow_rows(
+            self,
+            IMBALANCE_PRICES,
+            client=None,
+            start=T0,
+            until=UNTIL,
+            now=self.clock,
+            sleep=self.sleep,
+            rng=random.Random(0),
+            **kwargs,
+        )
+
+
+def test_floor_boundary():
+    assert floor_boundary(T0 + timedelta(minutes=29, seconds=59), POLICY.interval) == T0 + timedelta(minutes=15)
+
+
+def test_emits_each_period_once_and_stops_at_until():
+    feed = FakeFeed(now=T0 + timedelta(hours=1, minutes=7))
+    batches = list(feed.follow())
+
+    rows = [row for batch in batches for row in batch]
+    keys = [(row["eic_code"], row["periodStartAt"]) for row in rows]
+    assert len(keys) == len(set(keys)) == 2 * 8
+    assert len(batches[0]) == 2 * 4  # everything published before the first poll
+    # Later polls only re-request the revision window before the last period seen.
+    for (start, _), (previous_start, _) in zip(feed.windows[2:], feed.windows[1:]):
+        assert start >= previous_start
+    assert feed.windows[-1][0] == UNTIL - POLICY.revision_window - POLICY.interval
+    # Aligned waits land just after a boundary, backoff waits stay short.
+    assert len(feed.sleeps) < 20
+    assert feed.now < UNTIL + timedelta(minutes=10)
+
+
+def test_revised_rows_are_emitted_again():
+    feed = FakeFeed(now=T0 + timedelta(minutes=32))
+    batches = feed.follow()
+    assert len(next(batches)) == 2 * 2
+    feed.groups[0]["prices"][0]["price"] += 1.0
+    revised = next(batches)
+    assert [(r["eic_code"], r["periodStartAt"], r["price"]) for r in revised] == [
+        (feed.groups[0]["eicCode"], T0.isoformat(), feed.groups[0]["prices"][0]["price"])
+    ]
+
+
+def test_past_until_with_empty_response_stops():
+    feed = FakeFeed(now=UNTIL + timedelta(days=1))
+    feed.groups = []
+    assert list(feed.follow()) == []
+    assert feed.windows == [(T0, UNTIL)] and feed.sleeps == []
+
+
+def test_stalled_group_neither_blocks_nor_widens_the_window():
+    feed = FakeFeed(now=T0 + timedelta(hours=1, minutes=7))
+    del feed.groups[1]["prices"][2:]  # the second group stops after 30 minutes
+    policy = FollowPolicy(max_lag=timedelta(minutes=30))
+    rows = [row for batch in feed.follow(policy=policy) for row in batch]
+    assert len(rows) == 8 + 2
+    assert feed.now < UNTIL + POLICY.publication_delay + POLICY.settle_timeout + POLICY.max_backoff
+    latest_start = max(start for start, _ in feed.windows)
+    assert latest_start == UNTIL - policy.max_lag - POLICY.revision_window
+
+
+def test_backoff_on_server_errors():
+    feed = FakeFeed(now=T0 + timedelta(hours=3), failures=3)
+    batches = list(feed.follow())
+    assert sum(len(b) for b in batches) == 2 * 8
+    assert feed.sleeps == pytest.approx([30, 60, 120], rel=POLICY.jitter)
+
+
+def test_write_batches_appends_csv(tmp_path):
+    output = tmp_path / "prices.csv"
+    options = {"output": str(output), "fmt": None}
+    batches = [[{"area": "EE", "price": 1.0}], [], [{"area": "EE", "price": 2.0}]]
+    write_batches(iter(batches), IMBALANCE_PRICES, options)
+    with open(output) as f:
+        assert list(csv.DictReader(f)) == [{"area": "EE", "price": "1.0"}, {"area": "EE", "price": "2.0"}]
+
+    with pytest.raises(SystemExit, match="output formats"):
+        write_batches(iter(batches), IMBALANCE_PRICES, {"output": str(tmp_path / "p.parquet"), "fmt": None})
+
+
+def test_cli_follow_until_past_end():
+    args = ["imbalance-prices", "--follow", "--area", "EE", "--start", "2025-01-01T00:00:00Z"]
+    with running_server() as server:
+        base = ["--token", "t", "--base-url", server.base_url, "-f", "jsonl"]
+        result = CliRunner().invoke(cli, [*base, *args, "--end", "2025-01-01T01:00:00Z"])
+        missing_end = CliRunner().invoke(cli, [*base, *args[:1], *args[2:]])
+    assert result.exit_code == 0, result.output
+    assert len(result.output.splitlines()) > 0
+    assert missing_end.exit_code != 0 and "--end" in missing_end.output
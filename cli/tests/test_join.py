@@ -0,0 +1,90 @@
+"""Tests for the sort-merge join of endpoints."""
+
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from balancing_services.models import ImbalancePrices
+from click.testing import CliRunner
+
+from balancing_services_cli.flatten import IMBALANCE_PRICES
+from balancing_services_cli.join import merge_join, sorted_rows
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+from balancing_services_cli.synthetic import ENDPOINTS, generate_groups
+
+
+def _rows(area: str, periods: list[str], **values) -> list[dict]:
+    return [{"area": area, "periodStartAt": p, **values} for p in periods]
+
+
+COLUMNS = {"a": ("area", "periodStartAt", "x"), "b": ("area", "periodStartAt", "y")}
+
+
+def _join(a: list[dict], b: list[dict], how: str) -> list[tuple]:
+    rows = merge_join({"a": iter(a), "b": iter(b)}, COLUMNS, ("area",), how)
+    return [(r["area"], r["periodStartAt"], r["a.x"], r["b.y"]) for r in rows]
+
+
+def test_join_types():
+    a = _rows("EE", ["00", "01"], x=1) + _rows("LV", ["00"], x=2)
+    b = _rows("EE", ["01", "02"], y=3) + _rows("LV", ["00"], y=4)
+    assert _join(a, b, "inner") == [("EE", "01", 1, 3), ("LV", "00", 2, 4)]
+    assert _join(a, b, "left") == [("EE", "00", 1, None), ("EE", "01", 1, 3), ("LV", "00", 2, 4)]
+    assert _join(a, b, "outer") == [
+        ("EE", "00", 1, None),
+        ("EE", "01", 1, 3),
+        ("EE", "02", None, 3),
+        ("LV", "00", 2, 4),
+    ]
+    with pytest.raises(ValueError):
+        _join(a, b, "cross")
+
+
+def test_repeated_keys_form_all_combinations():
+    a = _rows("EE", ["00"], x=1) + _rows("EE", ["00"], x=2)
+    b = _rows("EE", ["00"], y=3) + _rows("EE", ["00"], y=4)
+    assert [(x, y) for *_, x, y in _join(a, b, "inner")] == [(1, 3), (1, 4), (2, 3), (2, 4)]
+
+
+def test_sorted_rows_merges_groups_by_key():
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    groups = generate_groups(ENDPOINTS["imbalance_prices"], start=start, end=start + timedelta(hours=2), n_groups=4)
+    data = [ImbalancePrices.from_dict(group) for group in groups]
+    for group in data:
+        group.prices.reverse()
+    rows = list(sorted_rows(data, IMBALANCE_PRICES, ("area",)))
+    keys = [(r["area"], r["periodStartAt"]) for r in rows]
+    assert keys == sorted(keys) and len(rows) == sum(len(g.prices) for g in data)
+    assert all(a.period.start_at > b.period.start_at for a, b in zip(data[0].prices, data[0].prices[1:]))
+
+
+def test_cli_join():
+    args = [
+        "join",
+        "imbalance-prices",
+        "energy-prices",
+        "--area",
+        "EE",
+        "--reserve-type",
+        "aFRR",
+        "--start",
+        "2025-01-01T00:00:00Z",
+        "--end",
+        "2025-01-01T02:00:00Z",
+    ]
+    with running_server(MockServerConfig(groups=2)) as server:
+        base = ["--token", "t", "--base-url", server.base_url]
+        result = CliRunner().invoke(cli, [*base, *args])
+        no_reserve_type = CliRunner().invoke(cli, [*base, *args[:5], *args[7:]])
+        bad_key = CliRunner().invoke(cli, [*base, *args, "--on", "reserve_type"])
+    assert result.exit_code == 0, result.output
+    rows = list(csv.DictReader(io.StringIO(result.output)))
+    assert len(rows) == 8 * 2 * 2
+    assert {"area", "periodStartAt", "imbalance_prices.price", "energy_prices.price"} <= set(rows[0])
+    assert [r["periodStartAt"] for r in rows] == sorted(r["periodStartAt"] for r in rows)
+    assert no_reserve_type.exit_code != 0 and "--reserve-type is required" in no_reserve_type.output
+    assert bad_key.exit_code != 0 and "not one of its group fields" in bad_key.output
@@ -0,0 +1,162 @@
+"""Tests for merit-order curves of bids."""
+
+from __future__ import annotations
+
+import json
+
+import pyarrow as pa
+import pytest
+from click.testing import CliRunner
+
+from balancing_services_cli.flatten import CAPACITY_BIDS, ENERGY_BIDS
+from balancing_services_cli.main import cli
+from balancing_services_cli.merit_order import MeritOrder, MeritOrderQuery, merit_order_table, parse_merit_order
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+
+
+def _bid(
+    direction: str,
+    hour: int,
+    volume: float | None,
+    price: float | None,
+    area: str = "EE",
+    standard_product: bool = True,
+) -> dict:
+    return {
+        "area": area,
+        "eic_code": area,
+        "reserve_type": "mFRR",
+        "direction": direction,
+        "currency": "EUR",
+        "standard_product": standard_product,
+        "periodStartAt": f"2025-01-01T{hour:02d}:00:00+00:00",
+        "periodEndAt": f"2025-01-01T{hour:02d}:15:00+00:00",
+        "volume": volume,
+        "price": price,
+    }
+
+
+BIDS = [
+    _bid("up", 0, 10.0, 50.0),
+    _bid("up", 0, 5.0, 20.0),
+    _bid("up", 0, 20.0, 80.0),
+    _bid("up", 1, 8.0, 30.0),
+    _bid("up", 0, 100.0, None),
+    _bid("down", 0, 4.0, 10.0),
+    _bid("down", 0, 6.0, 40.0),
+    _bid("up", 0, 7.0, 60.0, area="LV"),
+]
+
+
+def test_parse_merit_order():
+    assert parse_merit_order(None) is None
+    assert parse_merit_order("curve") == MeritOrderQuery("curve")
+    assert parse_merit_order("price-at:10, 25") == MeritOrderQuery("price-at", (10.0, 25.0))
+    assert parse_merit_order("top:3") == MeritOrderQuery("top", (3.0,))
+    for bad in ("curves", "curve:1", "price-at", "volume-at:cheap", "top:0", "top:1.5", "top:1,2"):
+        with pytest.raises(SystemExit, match="Invalid --merit-order"):
+            parse_merit_order(bad)
+
+
+def test_curves_are_ranked_per_direction():
+    curves = MeritOrder(pa.Table.from_pylist(list(reversed(BIDS))))
+    rows = curves.bids.to_pylist()
+
+    assert len(curves) == 4
+    assert [(r["area"], r["direction"], r["periodStartAt"][11:16]) for r in curves.curves.to_pylist()] == [
+        ("EE", "down", "00:00"),
+        ("EE", "up", "00:00"),
+        ("EE", "up", "01:00"),
+        ("LV", "up", "00:00"),
+    ]
+    # Downward bids run from the highest price; null prices are dropped.
+    assert [(r["price"], r["rank"], r["cumulative_volume"]) for r in rows] == [
+        (40.0, 1, 6.0),
+        (10.0, 2, 10.0),
+        (20.0, 1, 5.0),
+        (50.0, 2, 15.0),
+        (80.0, 3, 35.0),
+        (30.0, 1, 8.0),
+        (60.0, 1, 7.0),
+    ]
+
+
+def test_products_form_separate_curves():
+    bids = [_bid("up", 0, 10.0, 50.0), _bid("up", 0, 5.0, 20.0, standard_product=False), _bid("up", 0, 8.0, 30.0)]
+    curves = MeritOrder(pa.Table.from_pylist(bids))
+    assert [r["standard_product"] for r in curves.curves.to_pylist()] == [False, True]
+    assert [(r["price"], r["rank"], r["cumulative_volume"]) for r in curves.bids.to_pylist()] == [
+        (20.0, 1, 5.0),
+        (30.0, 1, 8.0),
+        (50.0, 2, 18.0),
+    ]
+
+
+def test_clearing_prices():
+    result = MeritOrder(pa.Table.from_pylist(BIDS)).clearing_prices([15.0, 5.0, 36.0])
+    rows = result.to_pylist()
+    ee_up = [r for r in rows if (r["area"], r["direction"], r["periodStartAt"][11:13]) == ("EE", "up", "00")]
+    assert [(r["requested_volume"], r["clearing_price"], r["available_volume"]) for r in ee_up] == [
+        (5.0, 20.0, 35.0),
+        (15.0, 50.0, 35.0),
+        (36.0, None, 35.0),
+    ]
+    down = [r for r in rows if r["direction"] == "down"]
+    assert [r["clearing_price"] for r in down] == [40.0, None, None]
+
+
+def test_volumes_at_prices():
+    result = MeritOrder(pa.Table.from_pylist(BIDS)).volumes_at_prices([50.0, 0.0]).to_pylist()
+    assert [(r["direction"], r["periodStartAt"][11:13], r["area"], r["price_limit"], r["volume"]) for r in result] == [
+        ("down", "00", "EE", 0.0, 10.0),
+        ("down", "00", "EE", 50.0, 0.0),
+        ("up", "00", "EE", 0.0, 0.0),
+        ("up", "00", "EE", 50.0, 15.0),
+        ("up", "01", "EE", 0.0, 0.0),
+        ("up", "01", "EE", 50.0, 8.0),
+        ("up", "00", "LV", 0.0, 0.0),
+        ("up", "00", "LV", 50.0, 0.0),
+    ]
+
+
+def test_top_and_capacity_bids_ascend_in_both_directions():
+    bid = {
+        "area": "EE",
+        "direction": "down",
+        "currency": "EUR",
+        "periodStartAt": "2025-01-01T00:00:00+00:00",
+        "periodEndAt": "2025-01-02T00:00:00+00:00",
+        "status": "accepted",
+    }
+    rows = [{**bid, "capacity": capacity, "price": price} for capacity, price in ((5.0, 9.0), (3.0, 2.0), (1.0, 4.0))]
+    top = merit_order_table(pa.Table.from_pylist(rows), CAPACITY_BIDS, MeritOrderQuery("top", (2.0,))).to_pylist()
+    assert [(r["price"], r["cumulative_capacity"], r["rank"]) for r in top] == [(2.0, 3.0, 1), (4.0, 4.0, 2)]
+
+
+def test_empty_table():
+    curves = MeritOrder(pa.table({}))
+    assert len(curves) == 0
+    assert curves.clearing_prices([1.0]).num_rows == 0
+    assert merit_order_table(pa.table({}), ENERGY_BIDS, MeritOrderQuery("curve")).num_rows == 0
+
+
+def test_cli_merit_order():
+    args = ["energy-bids", "--all", "--area", "EE", "--reserve-type", "mFRR"]
+    args += ["--start", "2025-01-01T00:00:00Z", "--end", "2025-01-01T02:00:00Z"]
+    with running_server(MockServerConfig(groups=2)) as server:
+        base = ["--token", "t", "--base-url", server.base_url, "-f", "jsonl"]
+        raw = CliRunner().invoke(cli, [*base, *args])
+        result = CliRunner().invoke(cli, [*base, *args, "--merit-order", "price-at:1,1000000"])
+        parallel = CliRunner().invoke(cli, [*base, *args, "--merit-order", "price-at:1,1000000", "--workers", "2"])
+        resume = CliRunner().invoke(cli, [*base, *args, "--merit-order", "curve", "--resume"])
+    assert result.exit_code == 0, result.output
+    bids = [json.loads(line) for line in raw.output.splitlines()]
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    curves = {(b["direction"], b["currency"], b["standard_product"], b["periodStartAt"]) for b in bids}
+    assert len(rows) == 2 * len(curves)
+    assert {r["requested_volume"] for r in rows} == {1.0, 1000000.0}
+    assert all(r["clearing_price"] is None for r in rows if r["requested_volume"] == 1000000.0)
+    assert parallel.exit_code == 0, parallel.output
+    assert parallel.output == result.output
+    assert resume.exit_code != 0
+    assert "--merit-order" in resume.output
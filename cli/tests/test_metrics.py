@@ -0,0 +1,74 @@
+"""Tests for the client request metrics."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_imbalance_prices
+from balancing_services.models import Area
+
+from balancing_services_cli.metrics import ClientMetrics, Histogram
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 1, 2, tzinfo=timezone.utc)
+KWARGS = dict(area=Area.EE, period_start_at=START, period_end_at=END)
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(value)
+    assert list(histogram.cumulative()) == [("1", 2), ("2", 3), ("+Inf", 4)]
+    assert histogram.sum == 6.0
+
+
+def test_statuses_sizes_and_callback():
+    observations = []
+    metrics = ClientMetrics(on_observe=observations.append)
+    with running_server(MockServerConfig(rate_429=0.5, seed=3)) as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t", httpx_args=metrics.httpx_args())
+        statuses = [get_imbalance_prices.sync_detailed(client=client, **KWARGS).status_code for _ in range(10)]
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == {
+        ("/imbalance/prices", "GET", "200"): statuses.count(200),
+        ("/imbalance/prices", "GET", "429"): statuses.count(429),
+    }
+    assert snapshot["in_flight"] == {}
+    assert [o.status for o in observations] == statuses
+    ok = next(o for o in observations if o.status == 200)
+    assert ok.bytes > 1000 and ok.seconds > 0
+
+    text = metrics.to_openmetrics()
+    assert text.endswith("# EOF\n")
+    labels = 'endpoint="/imbalance/prices",method="GET",status="429"'
+    assert f"bs_client_requests_total{{{labels}}} {statuses.count(429)}" in text
+    assert 'bs_client_request_duration_seconds_bucket{endpoint="/imbalance/prices",le="+Inf"} 10' in text
+
+
+def test_connection_errors_are_counted():
+    metrics = ClientMetrics()
+    client = AuthenticatedClient(base_url="http://127.0.0.1:1", token="t", httpx_args=metrics.httpx_args())
+    with pytest.raises(httpx.ConnectError):
+        get_imbalance_prices.sync_detailed(client=client, **KWARGS)
+    snapshot = metrics.snapshot()
+    assert snapshot["errors"] == {("/imbalance/prices", "ConnectError"): 1}
+    assert snapshot["in_flight"] == {}
+
+
+def test_async_client():
+    metrics = ClientMetrics()
+
+    async def fetch(base_url: str) -> None:
+        async with AuthenticatedClient(base_url=base_url, token="t", httpx_args=metrics.httpx_args()) as client:
+            await asyncio.gather(*(get_imbalance_prices.asyncio_detailed(client=client, **KWARGS) for _ in range(4)))
+
+    with running_server() as server:
+        asyncio.run(fetch(server.base_url))
+    assert metrics.snapshot()["requests"] == {("/imbalance/prices", "GET", "200"): 4}
+    assert metrics.snapshot()["size"]["/imbalance/prices"][0] == 4
@@ -0,0 +1,83 @@
+"""Tests for the mock API server, exercised through the generated client."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import httpx
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_balancing_energy_bids, get_imbalance_prices
+from balancing_services.models import Area, ReserveType
+
+from balancing_services_cli.flatten import ENERGY_BIDS, flatten_response
+from balancing_services_cli.mock_server import LatencyModel, MockServerConfig, running_server
+from balancing_services_cli.pagination import fetch_all_pages
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 1, 1, 6, tzinfo=timezone.utc)
+
+
+def _client(server) -> AuthenticatedClient:
+    return AuthenticatedClient(base_url=server.base_url, token="test-token")
+
+
+def test_imbalance_prices_schema_valid():
+    with running_server(MockServerConfig(groups=2)) as server:
+        response = get_imbalance_prices.sync_detailed(
+            client=_client(server), area=Area.EE, period_start_at=START, period_end_at=END
+        )
+    assert response.status_code == 200
+    assert len(response.parsed.data) == 2
+    assert all(group.area == Area.EE for group in response.parsed.data)
+    assert len(response.parsed.data[0].prices) == 24
+
+
+def test_bids_cursor_pagination_is_consistent():
+    with running_server(MockServerConfig(groups=3)) as server:
+        kwargs = dict(area=Area.LV, period_start_at=START, period_end_at=END, reserve_type=ReserveType.MFRR)
+        client = _client(server)
+        full = get_balancing_energy_bids.sync_detailed(client=client, limit=1000, **kwargs)
+        paged = fetch_all_pages(get_balancing_energy_bids.sync_detailed, client=client, limit=100, **kwargs)
+        pages = sum(n for (path, status), n in server.stats.items() if path.endswith("/balancing/energy/bids"))
+
+    assert not full.parsed.has_more
+    expected = flatten_response(full.parsed.data, ENERGY_BIDS)
+    assert len(expected) == 3 * 24 * 10
+    assert flatten_response(paged, ENERGY_BIDS) == expected
+    assert pages == 1 + 8
+    assert {row["reserve_type"] for row in expected} == {"mFRR"}
+
+
+def test_missing_parameter():
+    with running_server() as server:
+        response = httpx.get(f"{server.base_url}/imbalance/prices", params={"area": "EE"})
+    assert response.status_code == 400
+    assert response.json()["type"] == "missing-parameter"
+
+
+def test_injected_rate_limit():
+    with running_server(MockServerConfig(rate_429=1.0, retry_after=7)) as server:
+        response = get_imbalance_prices.sync_detailed(
+            client=_client(server), area=Area.EE, period_start_at=START, period_end_at=END
+        )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert response.parsed.title == "Rate Limited"
+
+
+def test_required_token():
+    with running_server(MockServerConfig(token="secret")) as server:
+        response = get_imbalance_prices.sync_detailed(
+            client=_client(server), area=Area.EE, period_start_at=START, period_end_at=END
+        )
+    assert response.status_code == 401
+
+
+def test_latency_model_samples():
+    import random
+
+    rng = random.Random(0)
+    assert LatencyModel("fixed", 20).sample(rng) == 0.02
+    assert 0.01 <= LatencyModel("uniform", 20, 10).sample(rng) <= 0.03
+    assert LatencyModel("lognormal", 20, 10).sample(rng) > 0
+    assert LatencyModel().sample(rng) == 0.0
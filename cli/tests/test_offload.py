@@ -0,0 +1,107 @@
+"""Tests for process-pool decoding of paginated responses."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pyarrow as pa
+import pyarrow.parquet as pq
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_balancing_energy_bids
+from balancing_services.models import Area, BalancingEnergyBidsResponse, ReserveType
+from click.testing import CliRunner
+
+from balancing_services_cli.flatten import ENERGY_BIDS, flatten_response
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+from balancing_services_cli.offload import decode_page, fetch_all_pages_to_arrow, read_pagination
+from balancing_services_cli.synthetic import generate_payload
+
+BID_ARGS = [
+    "energy-bids",
+    "--all",
+    "--area",
+    "EE",
+    "--reserve-type",
+    "mFRR",
+    "--start",
+    "2025-01-01T00:00:00Z",
+    "--end",
+    "2025-01-01T06:00:00Z",
+]
+
+
+def test_read_pagination():
+    assert read_pagination(b'{"data": [], "hasMore": true, "nextCursor": "ab\\"c"}') == (True, 'ab"c')
+    assert read_pagination(b'{"hasMore":false,"nextCursor":null,"data":[]}') == (False, None)
+    # Falls back to a full decode when a field is missing.
+    assert read_pagination(b'{"data": [], "hasMore": false}') == (False, None)
+
+
+def test_decode_page_matches_in_process_flattening():
+    with running_server(MockServerConfig(groups=2)) as server:
+        body = httpx.get(
+            f"{server.base_url}/balancing/energy/bids",
+            params={
+                "area": "EE",
+                "reserve-type": "mFRR",
+                "period-start-at": "2025-01-01T00:00:00Z",
+                "period-end-at": "2025-01-01T06:00:00Z",
+            },
+        ).content
+
+    buffer, n_rows = decode_page(body, BalancingEnergyBidsResponse, ENERGY_BIDS)
+    expected = flatten_response(BalancingEnergyBidsResponse.from_dict(json.loads(body)).data, ENERGY_BIDS)
+    assert n_rows == len(expected) > 0
+    assert pa.ipc.open_stream(buffer).read_all().to_pylist() == expected
+
+
+def test_cli_workers_output_matches_sequential(tmp_path):
+    sequential, parallel = tmp_path / "seq.parquet", tmp_path / "par.parquet"
+    with running_server(MockServerConfig(groups=2)) as server:
+        base = ["--token", "t", "--base-url", server.base_url]
+        runner = CliRunner()
+        first = runner.invoke(cli, [*base, "-o", str(sequential), *BID_ARGS])
+        second = runner.invoke(cli, [*base, "-o", str(parallel), *BID_ARGS, "--workers", "2"])
+        csv = runner.invoke(cli, [*base, "-f", "csv", *BID_ARGS, "--workers", "2"])
+        requests = server.stats
+    assert first.exit_code == 0, first.output
+    assert second.exit_code == 0, second.output
+    assert csv.exit_code == 0, csv.output
+    assert pq.read_table(parallel).to_pylist() == pq.read_table(sequential).to_pylist()
+    assert len(csv.output.splitlines()) == pq.read_table(sequential).num_rows + 1
+    assert sum(requests.values()) == 15
+
+
+def test_pages_with_whole_and_fractional_numbers_share_types():
+    whole = generate_payload("energy_bids", 4)
+    for bid in whole["data"][0]["bids"]:
+        bid["volume"], bid["price"] = round(bid["volume"]), round(bid["price"])
+    pages = {None: {**whole, "hasMore": True, "nextCursor": "2"}, "2": generate_payload("energy_bids", 4, seed=1)}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=pages[request.url.params.get("cursor")])
+
+    transport = httpx.MockTransport(handler)
+    client = AuthenticatedClient(base_url="http://api", token="t", httpx_args={"transport": transport})
+    table = fetch_all_pages_to_arrow(
+        get_balancing_energy_bids,
+        BalancingEnergyBidsResponse,
+        ENERGY_BIDS,
+        2,
+        client=client,
+        area=Area.EE,
+        period_start_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        period_end_at=datetime(2025, 1, 2, tzinfo=timezone.utc),
+        reserve_type=ReserveType.MFRR,
+    )
+    assert table.num_rows == 8
+    assert table.schema.field("volume").type == table.schema.field("price").type == pa.float64()
+
+
+def test_workers_requires_all():
+    result = CliRunner().invoke(cli, ["--token", "t", *BID_ARGS[:1], "--first-page", *BID_ARGS[2:], "--workers", "2"])
+    assert result.exit_code != 0
+    assert "--workers requires --all" in result.output
@@ -16,6 +16,14 @@ def test_detect_format_explicit():
 def test_detect_format_by_extension():
     assert detect_format("output.parquet", None) == "parquet"
     assert detect_format("output.csv", None) == "csv"
+    assert detect_format("output.json", None) == "json"
+    assert detect_format("output.jsonl", None) == "jsonl"
+    assert detect_format("output.ndjson", None) == "jsonl"
+    assert detect_format("output.arrow", None) == "arrow"
+    assert detect_format("output.feather", None) == "arrow"
+    assert detect_format("output.arrows", None) == "arrow-stream"
+    assert detect_format("output.sqlite", None) == "sqlite"
+    assert detect_format("output.duckdb", None) == "duckdb"
 
 
 def test_detect_format_defaults_csv():
@@ -94,3 +102,273 @@ def test_write_parquet_missing_pyarrow_raises():
         msg = str(exc_info.value)
         assert "pip install balancing-services-cli[parquet]" in msg
         assert "uv add balancing-services-cli[parquet]" in msg
+
+
+def test_write_arrow_file_in_batches():
+    from unittest.mock import patch
+
+    import pyarrow as pa
+
+    rows = [{"a": i, "b": str(i)} for i in range(5)]
+    with tempfile.NamedTemporaryFile(suffix=".arrow", delete=False) as f:
+        path = f.name
+    try:
+        with patch("balancing_services_cli.output.ARROW_BATCH_SIZE", 2):
+            write_rows(iter(rows), path, None)
+        with pa.ipc.open_file(path) as reader:
+            assert reader.num_record_batches == 3
+            assert reader.read_all().to_pylist() == rows
+    finally:
+        os.unlink(path)
+
+
+def test_write_arrow_types_columns_null_in_first_batch(tmp_path):
+    from unittest.mock import patch
+
+    import pyarrow as pa
+
+    rows = [{"procured_at": None, "price": None, "price_2": None}] * 2
+    rows.append({"procured_at": "2025-01-01T00:00:00+00:00", "price": 1, "price_2": 2.5})
+    path = str(tmp_path / "prices.arrow")
+    with patch("balancing_services_cli.output.ARROW_BATCH_SIZE", 2):
+        write_rows(iter(rows), path, None)
+    with pa.ipc.open_file(path) as reader:
+        table = reader.read_all()
+    assert table.schema == pa.schema([("procured_at", pa.string()), ("price", pa.float64()), ("price_2", pa.float64())])
+    assert table.to_pylist()[2] == {**rows[2], "price": 1.0}
+
+
+def test_write_arrow_stream_to_stdout(capsysbinary):
+    import pyarrow as pa
+
+    rows = [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}]
+    write_rows(rows, None, "arrow-stream")
+    table = pa.ipc.open_stream(capsysbinary.readouterr().out).read_all()
+    assert table.to_pylist() == rows
+
+
+def test_write_arrow_file_no_output_raises():
+    import pytest
+
+    with pytest.raises(SystemExit, match="requires a file path"):
+        write_rows([{"a": 1}], None, "arrow")
+
+
+# ── JSON / JSON Lines ────────────────────────────────────────────────────
+
+
+def _imbalance_prices_group():
+    from balancing_services.models import ImbalancePrices
+
+    return ImbalancePrices.from_dict(
+        {
+            "area": "EE",
+            "eicCode": "10Y1001A1001A39I",
+            "currency": "EUR",
+            "direction": "positive",
+            "prices": [
+                {"period": {"startAt": "2025-01-01T00:00:00Z", "endAt": "2025-01-01T00:15:00Z"}, "price": 45.5},
+            ],
+        }
+    )
+
+
+def test_write_jsonl_to_file():
+    import json
+
+    rows = [{"a": 1, "b": "x"}, {"a": 2, "b": None}]
+    with tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False) as f:
+        path = f.name
+    try:
+        write_rows(rows, path, None)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert [json.loads(line) for line in lines] == rows
+    finally:
+        os.unlink(path)
+
+
+def test_write_json_array_to_stdout(capsys):
+    import json
+
+    rows = [{"a": 1}, {"a": 2}]
+    write_rows(rows, None, "json")
+    assert json.loads(capsys.readouterr().out) == rows
+
+
+def test_write_empty_json_array(capsys):
+    import json
+
+    write_rows([], None, "json")
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_write_json_consumes_rows_lazily(capsys):
+    """Rows are pulled from the iterable one at a time rather than materialized first."""
+    import json
+
+    seen = []
+
+    def generate():
+        for i in range(3):
+            seen.append(i)
+            yield {"i": i}
+
+    write_rows(generate(), None, "jsonl")
+    assert seen == [0, 1, 2]
+    assert [json.loads(line)["i"] for line in capsys.readouterr().out.splitlines()] == [0, 1, 2]
+
+
+def test_write_json_without_orjson(capsys):
+    import json
+    from unittest.mock import patch
+
+    with patch("balancing_services_cli.output.orjson", None):
+        write_rows([{"name": "Ä", "v": 1.5}], None, "jsonl")
+    assert json.loads(capsys.readouterr().out) == {"name": "Ä", "v": 1.5}
+
+
+def test_write_nested_groups(capsys):
+    import json
+
+    from balancing_services_cli.output import write_groups
+
+    write_groups([_imbalance_prices_group()], None, "jsonl")
+    group = json.loads(capsys.readouterr().out)
+    assert group["eicCode"] == "10Y1001A1001A39I"
+    assert group["prices"][0]["price"] == 45.5
+
+
+def test_write_nested_groups_rejects_csv():
+    import pytest
+
+    from balancing_services_cli.output import write_groups
+
+    with pytest.raises(SystemExit, match="JSON formats"):
+        write_groups([_imbalance_prices_group()], None, "csv")
+
+
+# ── Database sinks ───────────────────────────────────────────────────────
+
+
+def _capacity_price_rows(price: float | None, procured_at: str | None = None) -> list[dict]:
+    return [
+        {
+            "area": "EE",
+            "eic_code": "10Y1001A1001A39I",
+            "reserve_type": "aFRR",
+            "direction": "up",
+            "currency": "EUR",
+            "procured_at": procured_at,
+            "periodStartAt": f"2025-01-01T0{hour}:00:00+00:00",
+            "periodEndAt": f"2025-01-01T0{hour + 1}:00:00+00:00",
+            "price": price,
+        }
+        for hour in range(2)
+    ]
+
+
+def test_write_sqlite_upserts_on_natural_key():
+    import sqlite3
+
+    from balancing_services_cli.flatten import CAPACITY_PRICES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.sqlite")
+        write_rows(_capacity_price_rows(10.0), path, None, CAPACITY_PRICES)
+        write_rows(_capacity_price_rows(12.5)[:1], path, None, CAPACITY_PRICES)
+        con = sqlite3.connect(path)
+        prices = con.execute('SELECT price FROM capacity_prices ORDER BY "periodStartAt"').fetchall()
+        con.close()
+    assert prices == [(12.5,), (10.0,)]
+
+
+def test_write_sqlite_types_columns_from_config():
+    import sqlite3
+
+    from balancing_services_cli.flatten import CAPACITY_PRICES
+
+    rows = _capacity_price_rows(None) + _capacity_price_rows(10.0, "2024-12-31T12:00:00+00:00")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.sqlite")
+        write_rows(rows, path, None, CAPACITY_PRICES)
+        con = sqlite3.connect(path)
+        types = {name: kind for _, name, kind, *_ in con.execute("PRAGMA table_info(capacity_prices)")}
+        con.close()
+    assert types["price"] == "DOUBLE"
+    assert types["procured_at"] == types["periodStartAt"] == "VARCHAR"
+
+
+def test_write_sqlite_upserts_large_overlap_in_linear_time():
+    import sqlite3
+    import time
+
+    from balancing_services_cli.flatten import CAPACITY_PRICES
+
+    def load(first: int, price: float) -> list[dict]:
+        row = _capacity_price_rows(price)[0]
+        return [{**row, "periodStartAt": f"2025-01-01T00:00:00.{i:06d}+00:00"} for i in range(first, first + 20_000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.sqlite")
+        write_rows(load(0, 1.0), path, None, CAPACITY_PRICES)
+        started = time.perf_counter()
+        write_rows(load(10_000, 2.0), path, None, CAPACITY_PRICES)
+        elapsed = time.perf_counter() - started
+        con = sqlite3.connect(path)
+        counts = con.execute("SELECT price, count(*) FROM capacity_prices GROUP BY price ORDER BY price").fetchall()
+        con.close()
+    assert counts == [(1.0, 10_000), (2.0, 20_000)]
+    assert elapsed < 10  # a quadratic key match took over a minute here
+
+
+def test_write_sqlite_keeps_all_bids_of_a_period():
+    import sqlite3
+
+    from balancing_services_cli.flatten import ENERGY_BIDS
+
+    bid = {
+        "area": "EE",
+        "eic_code": "10Y1001A1001A39I",
+        "reserve_type": "mFRR",
+        "direction": "up",
+        "currency": "EUR",
+        "standard_product": True,
+        "periodStartAt": "2025-01-01T00:00:00+00:00",
+        "periodEndAt": "2025-01-01T00:15:00+00:00",
+    }
+    bids = [{**bid, "volume": 5.0, "price": 50.0}, {**bid, "volume": 7.0, "price": 60.0}]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.db")
+        write_rows(bids, path, None, ENERGY_BIDS)
+        write_rows(bids, path, None, ENERGY_BIDS)
+        con = sqlite3.connect(path)
+        (count,) = con.execute("SELECT count(*) FROM energy_bids").fetchone()
+        con.close()
+    assert count == 2
+
+
+def test_write_duckdb_upserts_with_null_keys():
+    import pytest
+
+    duckdb = pytest.importorskip("duckdb")
+
+    from balancing_services_cli.flatten import CAPACITY_PRICES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.duckdb")
+        write_rows(_capacity_price_rows(10.0), path, None, CAPACITY_PRICES)
+        write_rows(_capacity_price_rows(11.0), path, None, CAPACITY_PRICES)
+        con = duckdb.connect(path)
+        prices = con.execute("SELECT price FROM capacity_prices").fetchall()
+        con.close()
+    assert prices == [(11.0,), (11.0,)]
+
+
+def test_write_database_requires_file_path():
+    import pytest
+
+    from balancing_services_cli.flatten import CAPACITY_PRICES
+
+    with pytest.raises(SystemExit, match="requires a file path"):
+        write_rows(_capacity_price_rows(1.0), None, "sqlite", CAPACITY_PRICES)
@@ -2,10 +2,21 @@
 
 from __future__ import annotations
 
+import json
+import os
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Any
 
-from balancing_services_cli.pagination import fetch_all_pages, fetch_first_page
+import httpx
+import pytest
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_balancing_energy_bids
+from balancing_services.models import Area, ReserveType
+
+from balancing_services_cli.flatten import ENERGY_BIDS
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+from balancing_services_cli.pagination import checkpoint_path, export_all_pages, fetch_all_pages, fetch_first_page
 
 
 @dataclass
@@ -101,3 +112,82 @@ def test_first_page_api_error():
 
     with pytest.raises(SystemExit, match="API error"):
         fetch_first_page(fetch_fn)
+
+
+# ── export_all_pages tests ───────────────────────────────────────────────
+
+BIDS_QUERY = {
+    "area": Area.EE,
+    "reserve_type": ReserveType.MFRR,
+    "period_start_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+    "period_end_at": datetime(2025, 1, 1, 6, tzinfo=timezone.utc),
+}
+
+
+def _failing_at(call: int):
+    calls = 0
+
+    def fetch_fn(**kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == call:
+            raise httpx.ConnectError("connection reset")
+        return get_balancing_energy_bids.sync_detailed(**kwargs)
+
+    return fetch_fn
+
+
+def test_export_resumes_exactly_once(tmp_path):
+    complete, resumed = tmp_path / "complete.csv", tmp_path / "resumed.csv"
+    with running_server(MockServerConfig(groups=2)) as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        pages = export_all_pages(
+            get_balancing_energy_bids.sync_detailed, ENERGY_BIDS, str(complete), None, client=client, **BIDS_QUERY
+        )
+        assert pages == 5
+
+        with pytest.raises(httpx.ConnectError):
+            export_all_pages(_failing_at(3), ENERGY_BIDS, str(resumed), None, client=client, **BIDS_QUERY)
+        with open(checkpoint_path(str(resumed))) as f:
+            assert json.load(f)["page"] == 2
+        with open(resumed, "a") as f:
+            f.write("EE,partially written page\n")
+
+        pages = export_all_pages(
+            get_balancing_energy_bids.sync_detailed,
+            ENERGY_BIDS,
+            str(resumed),
+            None,
+            resume=True,
+            client=client,
+            **BIDS_QUERY,
+        )
+
+    assert pages == 3
+    assert resumed.read_text() == complete.read_text()
+    assert not os.path.exists(checkpoint_path(str(resumed)))
+
+
+def test_export_rejects_checkpoint_of_other_request(tmp_path):
+    output = tmp_path / "bids.jsonl"
+    with running_server(MockServerConfig(groups=2)) as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        with pytest.raises(httpx.ConnectError):
+            export_all_pages(_failing_at(2), ENERGY_BIDS, str(output), None, client=client, **BIDS_QUERY)
+        with pytest.raises(SystemExit, match="different export"):
+            export_all_pages(
+                get_balancing_energy_bids.sync_detailed,
+                ENERGY_BIDS,
+                str(output),
+                None,
+                resume=True,
+                client=client,
+                **{**BIDS_QUERY, "area": Area.LV},
+            )
+
+
+def test_export_requires_appendable_file(tmp_path):
+    with pytest.raises(SystemExit, match="--resume requires --output"):
+        export_all_pages(lambda **kwargs: None, ENERGY_BIDS, str(tmp_path / "bids.parquet"), None)
+    with pytest.raises(SystemExit, match="--resume requires --output"):
+        export_all_pages(lambda **kwargs: None, ENERGY_BIDS, None, "csv")
@@ -0,0 +1,82 @@
+"""Tests for the period index of response groups."""
+
+from __future__ import annotations
+
+import gc
+from datetime import datetime, timedelta, timezone
+
+from balancing_services.models import ImbalancePrices
+
+from balancing_services_cli.period_index import PeriodIndex, period_index
+from balancing_services_cli.synthetic import ENDPOINTS, generate_groups
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+Q = timedelta(minutes=15)
+
+
+class Period:
+    def __init__(self, start: datetime, end: datetime) -> None:
+        self.start_at, self.end_at = start, end
+
+
+class Item:
+    def __init__(self, name: str, start: datetime, end: datetime) -> None:
+        self.name, self.period = name, Period(start, end)
+
+
+def _names(items) -> list[str]:
+    return [item.name for item in items]
+
+
+def _group(hours: int = 24) -> ImbalancePrices:
+    [group] = generate_groups(ENDPOINTS["imbalance_prices"], start=T0, end=T0 + timedelta(hours=hours), n_groups=1)
+    return ImbalancePrices.from_dict(group)
+
+
+def test_lookups_on_a_day_of_periods():
+    group = _group()
+    group.prices.reverse()
+    index = PeriodIndex(group.prices)
+
+    [item] = index.at(T0 + 5 * Q + timedelta(minutes=3))
+    assert item.period.start_at == T0 + 5 * Q
+    assert index.at(T0 - timedelta(seconds=1)) == [] and index.at(T0 + timedelta(days=1)) == []
+    assert [i.period.start_at for i in index.slice(T0 + 4 * Q, T0 + 8 * Q)] == [T0 + k * Q for k in range(4, 8)]
+    assert len(index.overlapping(T0 + 4 * Q + timedelta(minutes=1), T0 + 8 * Q)) == 4
+    assert not index.has_overlaps()
+    assert index.covers(T0, T0 + timedelta(days=1))
+    assert index.gaps(T0 - Q, T0 + timedelta(days=1)) == [(T0 - Q, T0)]
+
+
+def test_repeated_and_overlapping_periods_and_gaps():
+    items = [
+        Item("hour", T0, T0 + 4 * Q),
+        Item("bid-a", T0 + Q, T0 + 2 * Q),
+        Item("bid-b", T0 + Q, T0 + 2 * Q),
+        Item("late", T0 + 6 * Q, T0 + 7 * Q),
+    ]
+    index = PeriodIndex(items)
+    assert _names(index.at(T0 + Q)) == ["hour", "bid-a", "bid-b"]
+    assert _names(index.at(T0 + 3 * Q)) == ["hour"]
+    assert _names(index.overlapping(T0 + 3 * Q, T0 + 7 * Q)) == ["hour", "late"]
+    assert index.has_overlaps()
+    assert not PeriodIndex(items[1:]).has_overlaps()
+    assert index.gaps() == [(T0 + 4 * Q, T0 + 6 * Q)]
+    assert index.gaps(T0 + 2 * Q, T0 + 5 * Q) == [(T0 + 4 * Q, T0 + 5 * Q)]
+    assert PeriodIndex([]).gaps(T0, T0 + Q) == [(T0, T0 + Q)]
+
+
+def test_period_index_is_cached_per_group():
+    group = _group(hours=2)
+    index = period_index(group, "prices")
+    assert period_index(group, "prices") is index
+    group.prices = group.prices[:4]
+    rebuilt = period_index(group, "prices")
+    assert rebuilt is not index and len(rebuilt) == 4
+
+    from balancing_services_cli import period_index as module
+
+    size = len(module._INDEXES)
+    del group, index, rebuilt
+    gc.collect()
+    assert len(module._INDEXES) == size - 1
@@ -0,0 +1,113 @@
+"""Tests for reducing capacity data to one procurement per period."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from balancing_services.models import BalancingCapacityPrices
+from click.testing import CliRunner
+
+from balancing_services_cli.flatten import CAPACITY_PRICES, flatten_response
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+from balancing_services_cli.procurement import procurement_rows, reduce_procurements
+
+
+def _prices(procured_at: str | None, prices: list[float], first_hour: int = 0, **extra) -> BalancingCapacityPrices:
+    group = {
+        "area": "EE",
+        "eicCode": "10Y1001A1001A39I",
+        "reserveType": "aFRR",
+        "direction": "up",
+        "currency": "EUR",
+        "prices": [
+            {
+                "period": {
+                    "startAt": f"2025-01-01T{first_hour + i:02d}:00:00Z",
+                    "endAt": f"2025-01-01T{first_hour + i + 1:02d}:00:00Z",
+                },
+                "price": price,
+            }
+            for i, price in enumerate(prices)
+        ],
+        **extra,
+    }
+    if procured_at != "unset":
+        group["procuredAt"] = procured_at
+    return BalancingCapacityPrices.from_dict(group)
+
+
+DATA = [
+    _prices("2024-12-30T10:00:00Z", [1.0, 2.0, 3.0]),
+    _prices("2024-12-31T10:00:00Z", [20.0, 30.0], first_hour=1),
+    _prices(None, [100.0, 200.0, 300.0, 400.0]),
+    _prices("2024-12-29T10:00:00Z", [5.0], direction="down"),
+]
+
+
+def _prices_by_period(data: list) -> dict:
+    return {(r["direction"], r["periodStartAt"][11:13]): r["price"] for r in flatten_response(data, CAPACITY_PRICES)}
+
+
+def test_latest_procurement():
+    reduced = reduce_procurements(DATA, CAPACITY_PRICES, "latest")
+    assert _prices_by_period(reduced) == {
+        ("up", "00"): 1.0,
+        ("up", "01"): 20.0,
+        ("up", "02"): 30.0,
+        ("up", "03"): 400.0,
+        ("down", "00"): 5.0,
+    }
+    assert reduced[1] is DATA[1] and reduced[3] is DATA[3]
+    assert [len(group.prices) for group in reduced] == [1, 2, 1, 1]
+
+
+def test_earliest_procurement_and_unknown_times():
+    reduced = reduce_procurements(DATA, CAPACITY_PRICES, "earliest")
+    assert _prices_by_period(reduced)[("up", "02")] == 3.0
+    assert reduced[0] is DATA[0]
+    unknown = [_prices("unset", [1.0]), _prices(None, [2.0])]
+    assert _prices_by_period(reduce_procurements(unknown, CAPACITY_PRICES, "latest")) == {("up", "00"): 1.0}
+    with pytest.raises(ValueError):
+        reduce_procurements(DATA, CAPACITY_PRICES, "columns")
+
+
+def test_procurements_as_columns():
+    rows = list(procurement_rows(DATA, CAPACITY_PRICES))
+    assert len(rows) == 5
+    assert "procured_at" not in rows[0]
+    first = rows[0]
+    assert (first["procured_at_1"], first["price_1"]) == ("2024-12-30T10:00:00+00:00", 1.0)
+    assert (first["procured_at_2"], first["price_2"]) == (None, 100.0)
+    second = rows[1]
+    assert [second[f"price_{n}"] for n in (1, 2, 3)] == [20.0, 2.0, 200.0]
+    assert second["procured_at_1"] == "2024-12-31T10:00:00+00:00"
+    assert all(set(row) == set(rows[0]) for row in rows)
+    assert rows[-1]["direction"] == "down" and rows[-1]["price_2"] is None
+
+
+def test_cli_procurement():
+    args = [
+        "capacity-prices",
+        "--area",
+        "EE",
+        "--reserve-type",
+        "aFRR",
+        "--start",
+        "2025-01-01T00:00:00Z",
+        "--end",
+        "2025-01-01T02:00:00Z",
+    ]
+    with running_server(MockServerConfig(groups=3)) as server:
+        base = ["--token", "t", "--base-url", server.base_url, "-f", "jsonl"]
+        raw = CliRunner().invoke(cli, [*base, *args])
+        latest = CliRunner().invoke(cli, [*base, *args, "--procurement", "latest"])
+        columns = CliRunner().invoke(cli, [*base, *args, "--procurement", "columns"])
+    assert latest.exit_code == 0, latest.output
+    raw_rows = [json.loads(line) for line in raw.output.splitlines()]
+    latest_rows = [json.loads(line) for line in latest.output.splitlines()]
+    series = ("area", "eic_code", "reserve_type", "direction", "currency", "periodStartAt")
+    assert len({tuple(r[k] for k in series) for r in raw_rows}) == len(latest_rows)
+    assert columns.exit_code == 0, columns.output
+    assert len(columns.output.splitlines()) == len(latest_rows)
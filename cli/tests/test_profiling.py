@@ -0,0 +1,55 @@
+"""Tests for the --profile stage report."""
+
+from __future__ import annotations
+
+import pstats
+
+from click.testing import CliRunner
+
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+from balancing_services_cli.profiling import Profiler
+
+
+def test_profile_report_covers_all_stages(tmp_path):
+    output = tmp_path / "bids.jsonl"
+    stats = tmp_path / "run.pstats"
+    args = [
+        "energy-bids",
+        "--all",
+        "--area",
+        "EE",
+        "--reserve-type",
+        "mFRR",
+        "--start",
+        "2025-01-01T00:00:00Z",
+        "--end",
+        "2025-01-01T06:00:00Z",
+    ]
+    with running_server(MockServerConfig(groups=2)) as server:
+        result = CliRunner().invoke(
+            cli,
+            ["--token", "t", "--base-url", server.base_url, "--profile-output", str(stats), "-o", str(output), *args],
+        )
+    assert result.exit_code == 0, result.output
+    lines = {line.split()[0]: line.split() for line in result.output.splitlines() if line.strip()}
+    for stage in Profiler.STAGES + ("total",):
+        assert stage in lines, result.output
+    assert lines["http"][1] == "5"
+    assert lines["flatten"][1] == f"{2 * 24 * 10:,}"
+    assert "GET" in lines
+    assert pstats.Stats(str(stats)).total_calls > 0
+
+
+def test_timed_excludes_inner_stage_from_outer():
+    profiler = Profiler(trace_memory=False)
+    profiler.start()
+    profiler.finish_fetch()
+    with profiler.stage("write"):
+        rows = list(profiler.timed(range(1000), "flatten"))
+    profiler.stop()
+    assert rows == list(range(1000))
+    assert profiler.stages["flatten"].count == 1000
+    assert profiler.stages["write"].count == 1
+    assert profiler.stages["write"].peak is None
+    assert "total" in profiler.report()
@@ -0,0 +1,131 @@
+"""Tests for the local caching proxy."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import httpx
+import pytest
+from balancing_services import AuthenticatedClient
+from click.testing import CliRunner
+
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import LatencyModel, MockApiServer, MockServerConfig, running_server
+from balancing_services_cli.proxy import FairScheduler, ProxyServer, running_proxy
+
+PATH = "/imbalance/prices"
+QUERY = {"area": "EE", "period-start-at": "2025-01-01T00:00:00Z", "period-end-at": "2025-01-02T00:00:00Z"}
+
+
+def _requests(server) -> int:
+    return sum(server.stats.values())
+
+
+@contextmanager
+def _proxied(config: MockServerConfig | None = None, **kwargs) -> Iterator[tuple[MockApiServer, ProxyServer]]:
+    with running_server(config) as upstream:
+        with running_proxy(AuthenticatedClient(base_url=upstream.base_url, token="t"), **kwargs) as proxy:
+            yield upstream, proxy
+
+
+def test_cache_hit_after_miss():
+    with _proxied() as (upstream, proxy):
+        first = httpx.get(proxy.base_url + PATH, params=QUERY)
+        second = httpx.get(proxy.base_url + PATH, params=dict(reversed(QUERY.items())))
+        assert _requests(upstream) == 1
+    assert first.status_code == second.status_code == 200
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert first.content == second.content and first.headers["Content-Type"] == "application/json"
+    assert proxy.stats == {"misses": 1, "hits": 1}
+
+
+def test_concurrent_requests_coalesce():
+    slow = MockServerConfig(latency=LatencyModel(ms=200))
+    with _proxied(slow) as (upstream, proxy):
+        with ThreadPoolExecutor(6) as pool:
+            responses = list(pool.map(lambda _: httpx.get(proxy.base_url + PATH, params=QUERY), range(6)))
+        assert _requests(upstream) == 1
+    assert {r.status_code for r in responses} == {200}
+    assert sorted(r.headers["X-Cache"] for r in responses).count("MISS") == 1
+    assert proxy.stats["misses"] == 1 and proxy.stats["hits"] + proxy.stats["coalesced"] == 5
+
+
+def test_errors():
+    with _proxied(token="secret") as (upstream, proxy):
+        auth = {"Authorization": "Bearer secret"}
+        assert httpx.get(proxy.base_url + PATH, params=QUERY).status_code == 401
+        assert httpx.get(proxy.base_url + "/nope", headers=auth).status_code == 404
+        bad = httpx.get(proxy.base_url + PATH, params={**QUERY, "area": "XX"}, headers=auth)
+        missing = httpx.get(proxy.base_url + PATH, params={"area": "EE"}, headers=auth)
+        unknown = httpx.get(proxy.base_url + PATH, params={**QUERY, "reserve-type": "aFRR"}, headers=auth)
+        header = httpx.get(proxy.base_url + PATH, params=QUERY, headers={**auth, "X-Client-Class": "vip"})
+        assert _requests(upstream) == 0
+    assert [r.status_code for r in (bad, missing, unknown, header)] == [400] * 4
+    assert bad.json()["detail"] == "The area parameter value is not valid"
+    assert missing.headers["Content-Type"] == "application/problem+json"
+
+    with running_proxy(AuthenticatedClient(base_url="http://127.0.0.1:1", token="t")) as proxy:
+        assert httpx.get(proxy.base_url + PATH, params=QUERY).status_code == 502
+    assert proxy.stats["errors"] == 1
+
+
+def test_malformed_upstream_body_is_bad_gateway():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"{not json"))
+    client = AuthenticatedClient(base_url="http://upstream", token="t", httpx_args={"transport": transport})
+    with running_proxy(client) as proxy:
+        responses = [httpx.get(proxy.base_url + PATH, params=QUERY) for _ in range(2)]
+    assert [r.status_code for r in responses] == [502, 502]
+    assert responses[0].json()["type"] == "bad-gateway"
+    assert proxy.stats["errors"] == 2
+
+
+def test_upstream_errors_are_not_cached():
+    failing = MockServerConfig(rate_5xx=1.0)
+    with _proxied(failing) as (upstream, proxy):
+        statuses = [httpx.get(proxy.base_url + PATH, params=QUERY).status_code for _ in range(2)]
+        assert _requests(upstream) == 2
+    assert statuses == [500, 500]
+
+
+def test_fair_scheduler_prefers_weighted_class():
+    scheduler = FairScheduler(slots=1, weights={"interactive": 4, "backfill": 1})
+    granted: list[str] = []
+
+    def wait(client_class: str) -> None:
+        with scheduler.slot(client_class):
+            granted.append(client_class)
+
+    threads = []
+    with scheduler.slot("interactive"):
+        # Backfill queues first; FIFO would serve all of it before any interactive request.
+        for client_class in ["backfill"] * 8 + ["interactive"] * 8:
+            thread = threading.Thread(target=wait, args=(client_class,))
+            thread.start()
+            threads.append(thread)
+            while sum(len(queue) for queue in scheduler._queues.values()) < len(threads):
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+    assert granted[:5].count("interactive") == 4
+    assert sorted(granted) == sorted(["backfill"] * 8 + ["interactive"] * 8)
+    assert scheduler.stats == {"interactive": 9, "backfill": 8}
+    with pytest.raises(ValueError):
+        FairScheduler(slots=0)
+
+
+def test_cli_through_proxy():
+    args = ["imbalance-prices", "--area", "EE", "--start", "2025-01-01T00:00:00Z", "--end", "2025-01-02T00:00:00Z"]
+    with _proxied() as (upstream, proxy):
+        base = ["--token", "ignored", "--base-url", proxy.base_url, "-f", "jsonl"]
+        direct = CliRunner().invoke(cli, ["--token", "t", "--base-url", upstream.base_url, "-f", "jsonl", *args])
+        first = CliRunner().invoke(cli, [*base, *args])
+        second = CliRunner().invoke(cli, [*base, *args])
+        assert _requests(upstream) == 2
+    assert first.exit_code == 0, first.output
+    assert first.output == second.output == direct.output
+    assert [json.loads(line) for line in first.output.splitlines()]
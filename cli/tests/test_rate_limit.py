@@ -0,0 +1,127 @@
+"""Tests for the rate limit shared between processes."""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+
+import httpx
+import pytest
+from click.testing import CliRunner
+
+from balancing_services_cli.main import cli
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+from balancing_services_cli.rate_limit import RateLimitedTransport, SharedRateLimiter, retry_after
+
+ARGS = ["imbalance-prices", "--area", "EE", "--start", "2025-01-01T00:00:00Z", "--end", "2025-01-02T00:00:00Z"]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _limiter(path, clock: FakeClock, **kwargs) -> SharedRateLimiter:
+    return SharedRateLimiter(str(path), clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_bucket_rate_and_burst(tmp_path):
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.sqlite", clock, rate=10, burst=2)
+    waits = [limiter.acquire() for _ in range(5)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.1] * 3)
+    assert limiter.stats["acquired"] == 5
+
+    # A second limiter on the same file shares the (now empty) bucket.
+    other = _limiter(tmp_path / "rl.sqlite", clock, rate=10, burst=2, owner="other")
+    assert other.acquire() == pytest.approx(0.1)
+    with pytest.raises(ValueError):
+        _limiter(tmp_path / "rl.sqlite", clock, rate=0)
+
+
+def test_owners_are_served_fairly(tmp_path):
+    clock = FakeClock()
+    busy = _limiter(tmp_path / "rl.sqlite", clock, rate=1, owner="busy")
+    quiet = _limiter(tmp_path / "rl.sqlite", clock, rate=1, owner="quiet")
+    busy.acquire()  # empty the bucket
+    pending = [(busy, *busy._enqueue()) for _ in range(4)] + [(quiet, *quiet._enqueue())]
+    order = []
+    while pending:
+        clock.sleep(1.0)
+        for entry in pending:
+            limiter, ticket, tag = entry
+            if limiter._try_acquire(ticket, tag) is None:
+                order.append(limiter.owner)
+                pending.remove(entry)
+                break
+    # The quiet owner does not wait behind the busy owner's whole queue.
+    assert order == ["busy", "quiet", "busy", "busy", "busy"]
+
+
+def test_pause_and_stale_waiters(tmp_path):
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.sqlite", clock, rate=100, stale_after=5)
+    limiter.pause(2.0)
+    assert limiter.acquire() == pytest.approx(2.0)
+    assert limiter.stats["pauses"] == 1
+
+    crashed = _limiter(tmp_path / "rl.sqlite", clock, rate=100, owner="crashed")
+    crashed._enqueue()  # never polls again
+    assert limiter.acquire() == pytest.approx(5.0, abs=1.5)
+
+
+def test_transport_pauses_on_429(tmp_path):
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.sqlite", clock, rate=100)
+    params = {"area": "EE", "period-start-at": "2025-01-01T00:00:00Z", "period-end-at": "2025-01-02T00:00:00Z"}
+    with running_server(MockServerConfig(rate_429=1.0, retry_after=3)) as server:
+        with httpx.Client(transport=RateLimitedTransport(limiter)) as client:
+            response = client.get(server.base_url + "/imbalance/prices", params=params)
+    assert response.status_code == 429
+    assert limiter.stats["pauses"] == 1
+    # Every process sharing the bucket now waits out the Retry-After period.
+    assert limiter.acquire() == pytest.approx(3.0)
+
+
+def test_retry_after():
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 1.0
+    assert retry_after(httpx.Response(429)) == 1.0
+
+
+def _acquire_many(path: str, count: int) -> None:
+    limiter = SharedRateLimiter(path, rate=40)
+    for _ in range(count):
+        limiter.acquire()
+
+
+def test_processes_share_one_budget(tmp_path):
+    path = str(tmp_path / "rl.sqlite")
+    SharedRateLimiter(path, rate=40).acquire()  # start from an empty bucket
+    start = time.monotonic()
+    processes = [multiprocessing.Process(target=_acquire_many, args=(path, 4)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+    assert [process.exitcode for process in processes] == [0, 0, 0]
+    # 12 tokens at 40/s take at least 0.3s together; independent buckets would take 0.1s.
+    assert time.monotonic() - start >= 0.28
+
+
+def test_cli_rate_limit(tmp_path):
+    path = tmp_path / "rl.sqlite"
+    with running_server() as server:
+        base = ["--token", "t", "--base-url", server.base_url, "-f", "jsonl"]
+        result = CliRunner().invoke(cli, [*base, "--rate-limit", "100", "--rate-limit-file", str(path), *ARGS])
+        invalid = CliRunner().invoke(cli, [*base, "--rate-limit", "0", *ARGS])
+    assert result.exit_code == 0, result.output
+    assert result.output and path.exists()
+    assert invalid.exit_code != 0
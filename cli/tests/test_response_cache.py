@@ -0,0 +1,97 @@
+"""Tests for the in-memory parsed-response cache."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_imbalance_prices
+from balancing_services.models import Area
+
+from balancing_services_cli.mock_server import MockServerConfig, running_server
+from balancing_services_cli.response_cache import ResponseCache, TtlPolicy, estimate_size
+
+NOW = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+JAN_1 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+SETTLED = dict(period_start_at=JAN_1, period_end_at=JAN_1 + timedelta(days=1))
+TODAY = dict(period_start_at=NOW.replace(hour=0), period_end_at=NOW + timedelta(hours=12))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def _cache(**kwargs) -> tuple[ResponseCache, FakeClock]:
+    clock = FakeClock()
+    return ResponseCache(clock=clock, now=lambda: NOW, **kwargs), clock
+
+
+def test_ttl_policy():
+    policy = TtlPolicy(recent=timedelta(seconds=30), settle_after=timedelta(days=1))
+    assert policy.ttl(NOW - timedelta(days=2), NOW) is None
+    assert policy.ttl(NOW - timedelta(hours=2), NOW) == 30
+    assert TtlPolicy(settled=timedelta(hours=1)).ttl(NOW - timedelta(days=2), NOW) == 3600
+
+
+def test_estimate_size_scales_with_content():
+    small, large = [{"price": float(i)} for i in range(10)], [{"price": float(i)} for i in range(10_000)]
+    assert estimate_size(large) > 500 * estimate_size(small) > 0
+
+
+def test_hits_and_expiry():
+    cache, clock = _cache(default_ttl=TtlPolicy(recent=timedelta(seconds=60)))
+    with running_server() as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        first = cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED)
+        assert cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED) is first
+        recent = cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **TODAY)
+        clock.t += 61
+        assert cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **TODAY) is not recent
+        # Settled windows never expire.
+        assert cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED) is first
+        requests = sum(server.stats.values())
+
+    assert requests == 3
+    assert cache.stats == {"hits": 2, "misses": 3, "expired": 1}
+    assert len(cache) == 2 and cache.size > 0
+
+
+def test_errors_are_not_cached():
+    cache, _ = _cache()
+    with running_server(MockServerConfig(rate_5xx=1.0)) as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        for _ in range(2):
+            assert cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED).status_code == 500
+    assert len(cache) == 0
+    assert cache.stats["misses"] == 2
+
+
+def test_size_bound_evicts_least_recently_used():
+    cache, _ = _cache()
+    with running_server() as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        one = cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED)
+        cache.max_bytes = int(cache.size * 2.5)
+        cache.sync_detailed(get_imbalance_prices, client=client, area=Area.LV, **SETTLED)
+        cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED)  # EE becomes most recent
+        cache.sync_detailed(get_imbalance_prices, client=client, area=Area.LT, **SETTLED)
+        assert cache.stats["evictions"] == 1
+        assert cache.size <= cache.max_bytes
+        assert cache.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED) is one
+
+
+def test_async_shares_entries_across_clients():
+    cache, _ = _cache()
+
+    async def fetch(base_url: str, token: str):
+        async with AuthenticatedClient(base_url=base_url, token=token) as client:
+            return await cache.asyncio_detailed(get_imbalance_prices, client=client, area=Area.EE, **SETTLED)
+
+    with running_server() as server:
+        assert asyncio.run(fetch(server.base_url, "a")) is asyncio.run(fetch(server.base_url, "b"))
+        assert sum(server.stats.values()) == 1
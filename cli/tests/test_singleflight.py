@@ -0,0 +1,83 @@
+"""Tests for single-flight request coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from balancing_services import AuthenticatedClient
+from balancing_services.api.default import get_imbalance_prices
+from balancing_services.models import Area
+
+from balancing_services_cli.mock_server import LatencyModel, MockServerConfig, running_server
+from balancing_services_cli.singleflight import SingleFlight, request_key
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 1, 2, tzinfo=timezone.utc)
+WINDOW = dict(period_start_at=START, period_end_at=END)
+SLOW = MockServerConfig(latency=LatencyModel(ms=200))
+
+
+def _requests(server) -> int:
+    return sum(server.stats.values())
+
+
+def test_request_key_ignores_argument_order():
+    client = object()
+    a = request_key(get_imbalance_prices, client, area=Area.EE, period_start_at=START, period_end_at=END)
+    b = request_key(get_imbalance_prices, client, period_end_at=END, area=Area.EE, period_start_at=START)
+    c = request_key(get_imbalance_prices, client, area=Area.LV, period_start_at=START, period_end_at=END)
+    assert a == b != c
+
+
+def test_threads_share_one_request():
+    flight = SingleFlight()
+    with running_server(SLOW) as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+
+        def fetch(area: Area):
+            return flight.sync_detailed(get_imbalance_prices, client=client, area=area, **WINDOW)
+
+        with ThreadPoolExecutor(8) as pool:
+            responses = list(pool.map(fetch, [Area.EE] * 6 + [Area.LV] * 2))
+        assert _requests(server) == 2
+
+    assert all(r is responses[0] for r in responses[:6])
+    assert responses[6] is responses[7] is not responses[0]
+    assert flight.stats == {"requests": 2, "coalesced": 6}
+
+    # Finished requests are not cached.
+    with running_server() as server:
+        client = AuthenticatedClient(base_url=server.base_url, token="t")
+        flight.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **WINDOW)
+        assert _requests(server) == 1
+
+
+def test_error_propagates_and_clears_entry():
+    flight = SingleFlight()
+    client = AuthenticatedClient(base_url="http://127.0.0.1:1", token="t")
+    with pytest.raises(httpx.ConnectError):
+        flight.sync_detailed(get_imbalance_prices, client=client, area=Area.EE, **WINDOW)
+    assert not flight._calls
+
+
+def test_coroutines_share_one_request():
+    flight = SingleFlight()
+
+    async def run(base_url: str):
+        async with AuthenticatedClient(base_url=base_url, token="t") as client:
+            kwargs = dict(client=client, area=Area.EE, **WINDOW)
+            first = asyncio.ensure_future(flight.asyncio_detailed(get_imbalance_prices, **kwargs))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await asyncio.gather(*(flight.asyncio_detailed(get_imbalance_prices, **kwargs) for _ in range(5)))
+
+    with running_server(SLOW) as server:
+        responses = asyncio.run(run(server.base_url))
+        assert _requests(server) == 1
+    assert all(r is responses[0] and r.status_code == 200 for r in responses)
+    assert flight.stats == {"requests": 1, "coalesced": 5}
+    assert not flight._tasks
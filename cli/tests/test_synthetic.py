@@ -0,0 +1,26 @@
+"""Tests for the synthetic payload generator."""
+
+from __future__ import annotations
+
+import pytest
+
+from balancing_services_cli.flatten import flatten_response
+from balancing_services_cli.synthetic import ENDPOINTS, generate_payload
+
+
+@pytest.mark.parametrize("name", sorted(ENDPOINTS))
+def test_payload_parses_and_flattens(name):
+    endpoint = ENDPOINTS[name]
+    payload = generate_payload(endpoint, 250)
+    parsed = endpoint.response_model.from_dict(payload)
+    rows = flatten_response(parsed.data, endpoint.config)
+    assert len(rows) == 250
+    assert tuple(rows[0]) == endpoint.config.columns
+
+
+def test_payload_is_deterministic():
+    assert generate_payload("energy_bids", 50, seed=1) == generate_payload("energy_bids", 50, seed=1)
+
+
+def test_empty_payload():
+    assert generate_payload("imbalance_prices", 0)["data"] == []